@@ -1 +1 @@
-from . import users, stories, chapters, scenes, achievements, debug, audio
+from . import users, stories, chapters, scenes, achievements, debug, audio, jobs, leaderboard
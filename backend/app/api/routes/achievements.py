@@ -13,17 +13,18 @@ def get_achievements(user_id: int, session: Session = Depends(get_session)):
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    # earned badges
+    # earned badges: the whole catalog is small, so one query serves both lists
+    all_badges = session.exec(select(Badge)).all()
+    badges_by_id = {badge.id: badge for badge in all_badges}
     stmt = select(UserBadge).where(UserBadge.user_id == user_id)
     ub = session.exec(stmt).all()
     earned = []
     earned_codes = set()
     for ub_item in ub:
-        badge = session.get(Badge, ub_item.badge_id)
+        badge = badges_by_id[ub_item.badge_id]
         earned.append(BadgeOut(code=badge.code, name=badge.name, description=badge.description, icon_url=badge.icon_url, earned_at=ub_item.earned_at))
         earned_codes.add(badge.code)
     # locked badges
-    all_badges = session.exec(select(Badge)).all()
     locked = []
     for badge in all_badges:
         if badge.code not in earned_codes:
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
-from app.services.rishi_service import chat_with_rishi, explain_term_glossary, generate_dharma_dilemma
+import json
+import logging
+from app.services.rishi_service import chat_with_rishi, stream_chat_with_rishi, explain_term_glossary, generate_dharma_dilemma
 
+logger = logging.getLogger("katha.rishi")
 router = APIRouter()
 
 class ChatRequest(BaseModel):
@@ -20,6 +24,38 @@ async def rishi_chat(req: ChatRequest):
     response = await chat_with_rishi(req.query, req.context)
     return {"response": response}
 
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/chat/stream")
+async def rishi_chat_stream(req: ChatRequest, request: Request):
+    """
+    Server-Sent Events variant of /chat.
+    Emits `data: {"delta": ...}` per token chunk, then `event: done`.
+    If the client disconnects, the upstream LLM request is closed.
+    """
+    async def events():
+        deltas = stream_chat_with_rishi(req.query, req.context)
+        try:
+            async for delta in deltas:
+                if await request.is_disconnected():
+                    break
+                yield _sse({"delta": delta})
+            else:
+                yield _sse({}, event="done")
+        except Exception as e:
+            logger.error(f"Rishi stream failed: {e}")
+            yield _sse({"error": "The sage has fallen silent. Please try again."}, event="error")
+        finally:
+            await deltas.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/explain")
 async def glossary_explain(req: GlossaryRequest):
     terms = await explain_term_glossary(req.text)
@@ -5,12 +5,14 @@ Endpoints for generating podcast-style audio narration for story scenes.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import Optional
 from sqlmodel import Session, select
 from app.db import engine
 from app.models import Scene
-from app.services.enhanced_audio_service import get_enhanced_audio_service
+from app.services.job_service import job_queue, narrate_scene, FINAL_STATUSES
 
 router = APIRouter(prefix="/audio", tags=["audio"])
 
@@ -36,98 +38,63 @@ async def generate_scene_audio(request: AudioGenerateRequest):
     
     Uses Edge TTS with SSML emotion mapping based on the scene's rasa.
     """
-    try:
-        # Get scene from database
-        with Session(engine) as session:
-            scene = session.get(Scene, request.scene_id)
-            
-            if not scene:
-                raise HTTPException(status_code=404, detail="Scene not found")
-            
-            # Check if audio already exists
-            if scene.ai_audio_url and not request.regenerate:
-                return AudioGenerateResponse(
-                    success=True,
-                    audio_url=scene.ai_audio_url,
-                    message="Using existing audio"
-                )
-            
-            # Generate audio
-            audio_service = get_enhanced_audio_service()
-            audio_path = await audio_service.generate_audio_for_scene(
-                scene_text=scene.raw_text,
-                scene_id=scene.id,
-                scene_emotion=scene.ai_emotion
-            )
-            
-            # Update scene with audio URL
-            scene.ai_audio_url = audio_path
-            session.add(scene)
-            session.commit()
-            
+    with Session(engine) as session:
+        scene = session.get(Scene, request.scene_id)
+        
+        if not scene:
+            raise HTTPException(status_code=404, detail="Scene not found")
+        
+        # Check if audio already exists
+        if scene.ai_audio_url and not request.regenerate:
             return AudioGenerateResponse(
                 success=True,
-                audio_url=audio_path,
-                message="Audio generated successfully"
+                audio_url=scene.ai_audio_url,
+                message="Using existing audio"
             )
     
+    try:
+        # Concurrent requests for this scene share one synthesis
+        audio_path = await narrate_scene(request.scene_id, regenerate=request.regenerate)
+        
+        return AudioGenerateResponse(
+            success=True,
+            audio_url=audio_path,
+            message="Audio generated successfully"
+        )
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audio generation failed: {str(e)}")
 
 
 @router.post("/generate-chapter/{chapter_id}")
-async def generate_chapter_audio(chapter_id: int, voice: str = "female"):
+async def generate_chapter_audio(chapter_id: int, voice: str = "female", background: bool = False):
     """
     Generate audio for all scenes in a chapter
     
     Useful for batch generation of podcast episodes.
+    Runs as a background job (see /api/jobs): with background=true the job
+    is returned immediately (202), otherwise the summary is returned once
+    the job finishes (or the job with 202 if it is still running after
+    JOB_WAIT_SECONDS). Repeated requests for the same chapter share one job.
     """
-    try:
-        with Session(engine) as session:
-            from app.models import Chapter
-            
-            chapter = session.get(Chapter, chapter_id)
-            if not chapter:
-                raise HTTPException(status_code=404, detail="Chapter not found")
-            
-            # Get all scenes for this chapter
-            scenes = session.exec(
-                select(Scene).where(Scene.chapter_id == chapter_id).order_by(Scene.index)
-            ).all()
-            
-            if not scenes:
-                return {
-                    "success": False,
-                    "message": "No scenes found in chapter"
-                }
-            
-            audio_service = get_enhanced_audio_service()
-            generated_count = 0
-            
-            # Generate audio for each scene
-            for scene in scenes:
-                if not scene.ai_audio_url:  # Only generate if doesn't exist
-                    audio_path = await audio_service.generate_audio_for_scene(
-                        scene_text=scene.raw_text,
-                        scene_id=scene.id,
-                        scene_emotion=scene.ai_emotion
-                    )
-                    scene.ai_audio_url = audio_path
-                    session.add(scene)
-                    generated_count += 1
-            
-            session.commit()
-            
-            return {
-                "success": True,
-                "message": f"Generated audio for {generated_count}/{len(scenes)} scenes",
-                "chapter_title": chapter.title,
-                "total_scenes": len(scenes),
-                "generated": generated_count
-            }
+    with Session(engine) as session:
+        from app.models import Chapter
+        
+        chapter = session.get(Chapter, chapter_id)
+        if not chapter:
+            raise HTTPException(status_code=404, detail="Chapter not found")
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chapter audio generation failed: {str(e)}")
+    job = await job_queue.enqueue("chapter_audio", chapter_id)
+    
+    if not background:
+        job = await job_queue.wait(job.id, timeout=job_queue.request_wait_seconds)
+    if job.status not in FINAL_STATUSES:
+        return JSONResponse(status_code=202, content=jsonable_encoder(job_queue.to_out(job)))
+    
+    if job.status != "succeeded":
+        raise HTTPException(status_code=500, detail=f"Chapter audio generation failed: {job.error or job.status}")
+    
+    return job_queue.to_out(job).result
 
 
 @router.get("/voices")
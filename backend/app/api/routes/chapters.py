@@ -4,24 +4,22 @@ Provides endpoints for chapter details and fetching scenes within a chapter
 Directly uses Pydantic validation for cleaner code.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Optional
 from sqlmodel import Session, select
 from app.db import get_session
 from app.models import Chapter, Scene
 from app.schemas import ChapterOut, SceneOut
+from app.services.story_cache import story_cache
+from app.http_cache import to_cached_json, cached_json_response
 
 router = APIRouter()
 
 
-@router.get("/{chapter_id}", response_model=ChapterOut)
-def get_chapter(chapter_id: int, session: Session = Depends(get_session)):
-    """
-    Get detailed information about a single chapter.
-    """
+def _build_chapter_out(session: Session, chapter_id: int) -> Optional[ChapterOut]:
     chapter = session.get(Chapter, chapter_id)
     if not chapter:
-        raise HTTPException(status_code=404, detail="Chapter not found")
+        return None
     
     # Fetch scenes for this chapter
     scenes_db = session.exec(
@@ -51,6 +49,23 @@ def get_chapter(chapter_id: int, session: Session = Depends(get_session)):
     )
 
 
+@router.get("/{chapter_id}", response_model=ChapterOut)
+def get_chapter(chapter_id: int, request: Request, session: Session = Depends(get_session)):
+    """
+    Get detailed information about a single chapter.
+    Served from the story cache; the DB is only hit on a miss.
+    Supports If-None-Match: an unchanged chapter returns 304 Not Modified.
+    """
+    cached = story_cache.get_or_load(
+        ("chapter", chapter_id),
+        lambda: to_cached_json(_build_chapter_out(session, chapter_id))
+    )
+    if not cached:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    
+    return cached_json_response(request, cached)
+
+
 @router.get("/{chapter_id}/scenes", response_model=List[SceneOut])
 def get_scenes_for_chapter(chapter_id: int, session: Session = Depends(get_session)):
     """
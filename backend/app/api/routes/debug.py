@@ -3,8 +3,15 @@ Debug API Routes
 Utility endpoints for development and seeding data
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.services.seed_service import seed_all, reset_and_seed
+from app.services.story_cache import story_cache
+from app.services.tts_cache import get_tts_cache
+from app.services.llm_cache import llm_cache
+from app.services.single_flight import single_flight
+from app.services.leaderboard_service import leaderboards
+from app.services.media_gc import media_gc, MODES, MODE_DRY_RUN
+from app.jwt_auth import token_cache
 from app.db import get_session
 from sqlmodel import Session
 import logging
@@ -34,3 +41,43 @@ def health_check():
     Simple health check for the backend API.
     """
     return {"status": "ok", "service": "katha-backend"}
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    """
+    Hit/miss counters for the story tree, TTS segment and LLM response caches,
+    plus how many generation calls were coalesced, JWT verification reuse and
+    leaderboard index sizes.
+    """
+    return {
+        "story_tree": story_cache.stats(),
+        "tts": get_tts_cache().stats(),
+        "llm": llm_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "jwt": token_cache.stats(),
+        "leaderboards": leaderboards.stats()
+    }
+
+
+@router.post("/cache/invalidate")
+def cache_invalidate():
+    """
+    Drop the story tree cache, e.g. after an offline script wrote asset URLs.
+    """
+    version = story_cache.invalidate()
+    return {"status": "ok", "version": version}
+
+
+@router.post("/media-gc")
+def collect_media(
+    mode: str = Query(MODE_DRY_RUN, description="dry-run, quarantine or delete"),
+    session: Session = Depends(get_session)
+):
+    """
+    Find generated media no scene/story references, plus stale temp files,
+    and report (dry-run) or remove them. See app/services/media_gc.py.
+    """
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(MODES)}")
+    return media_gc.collect(session, mode=mode).as_dict()
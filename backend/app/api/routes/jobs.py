@@ -0,0 +1,82 @@
+"""
+Background Jobs API Routes
+Enqueue, inspect, cancel and collect results of generation jobs
+"""
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from typing import List, Optional
+from app.schemas import JobCreate, JobOut
+from app.services.job_service import job_queue, FINAL_STATUSES
+
+router = APIRouter()
+
+
+@router.post("/", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_job(payload: JobCreate):
+    """
+    Queue a generation job (scene_audio, scene_video, chapter_audio).
+    Submitting a job identical to one still queued or running returns that job.
+    """
+    try:
+        job = await job_queue.enqueue(payload.kind, payload.target_id, payload.params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{e}. Available kinds: {', '.join(job_queue.kinds)}"
+        )
+    return job_queue.to_out(job)
+
+
+@router.get("/", response_model=List[JobOut])
+async def list_jobs(
+    status: Optional[str] = Query(None, description="Filter by job status"),
+    limit: int = Query(50, ge=1, le=200)
+):
+    """List recent jobs, newest first."""
+    jobs = await job_queue.list_jobs(status=status, limit=limit)
+    return [job_queue.to_out(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(job_id: int):
+    """Get a job's status."""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_queue.to_out(job)
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: int,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for the job to finish")
+):
+    """
+    Get a finished job's result.
+    Returns 202 while the job is still queued or running,
+    and 409 if it failed or was cancelled.
+    """
+    job = await job_queue.wait(job_id, timeout=wait) if wait else await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status not in FINAL_STATUSES:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(job_queue.to_out(job))
+        )
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job.status}: {job.error}")
+    
+    return job_queue.to_out(job).result
+
+
+@router.post("/{job_id}/cancel", response_model=JobOut)
+async def cancel_job(job_id: int):
+    """Cancel a queued job or interrupt a running one."""
+    job = await job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_queue.to_out(job)
@@ -0,0 +1,123 @@
+"""
+Leaderboard API Routes
+Top-N and "my rank" for the global XP and streak boards and per-story XP
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select
+from typing import Hashable
+from app.db import get_session
+from app.jwt_auth import get_current_user_id
+from app.models import User, Story, UserStoryProgress
+from app.schemas import LeaderboardEntry, LeaderboardOut, LeaderboardRankOut
+from app.services.gamification_service import SCENE_XP
+from app.services.leaderboard_service import leaderboards, story_board, BOARD_XP, BOARD_STREAK
+
+router = APIRouter()
+
+
+def _top(session: Session, board: Hashable, name: str, limit: int, offset: int) -> LeaderboardOut:
+    top, total = leaderboards.top(board, limit, offset)
+    users = {
+        user.id: user
+        for user in session.exec(
+            select(User.id, User.name, User.username, User.profile_image_url)
+            .where(User.id.in_([user_id for user_id, _ in top]))
+        ).all()
+    } if top else {}
+    entries = [
+        LeaderboardEntry(
+            rank=offset + position,
+            user_id=user_id,
+            name=users[user_id].name,
+            username=users[user_id].username,
+            profile_image_url=users[user_id].profile_image_url,
+            score=score
+        )
+        for position, (user_id, score) in enumerate(top, start=1)
+        if user_id in users
+    ]
+    return LeaderboardOut(board=name, total_ranked=total, entries=entries)
+
+
+def _rank(board: Hashable, name: str, user_id: int, score: int) -> LeaderboardRankOut:
+    rank, total = leaderboards.rank(board, user_id, score)
+    return LeaderboardRankOut(board=name, user_id=user_id, rank=rank, score=score, total_ranked=total)
+
+
+def _get_user(session: Session, user_id: int) -> User:
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.get("/xp", response_model=LeaderboardOut)
+def get_xp_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session)
+):
+    """Users with the most total XP."""
+    return _top(session, BOARD_XP, BOARD_XP, limit, offset)
+
+
+@router.get("/xp/me", response_model=LeaderboardRankOut)
+def get_my_xp_rank(
+    session: Session = Depends(get_session),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Current user's XP rank. Requires valid JWT token."""
+    user = _get_user(session, user_id)
+    return _rank(BOARD_XP, BOARD_XP, user_id, user.total_xp)
+
+
+@router.get("/streak", response_model=LeaderboardOut)
+def get_streak_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session)
+):
+    """Users with the longest current reading streak."""
+    return _top(session, BOARD_STREAK, BOARD_STREAK, limit, offset)
+
+
+@router.get("/streak/me", response_model=LeaderboardRankOut)
+def get_my_streak_rank(
+    session: Session = Depends(get_session),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Current user's streak rank. Requires valid JWT token."""
+    user = _get_user(session, user_id)
+    return _rank(BOARD_STREAK, BOARD_STREAK, user_id, user.current_streak_days)
+
+
+@router.get("/stories/{story_id}", response_model=LeaderboardOut)
+def get_story_leaderboard(
+    story_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session)
+):
+    """Users with the most XP earned in one story."""
+    if not session.get(Story, story_id):
+        raise HTTPException(status_code=404, detail="Story not found")
+    return _top(session, story_board(story_id), f"story:{story_id}", limit, offset)
+
+
+@router.get("/stories/{story_id}/me", response_model=LeaderboardRankOut)
+def get_my_story_rank(
+    story_id: int,
+    session: Session = Depends(get_session),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Current user's XP rank in one story. Requires valid JWT token."""
+    if not session.get(Story, story_id):
+        raise HTTPException(status_code=404, detail="Story not found")
+    scenes_completed = session.exec(
+        select(UserStoryProgress.scenes_completed).where(
+            UserStoryProgress.user_id == user_id,
+            UserStoryProgress.story_id == story_id
+        )
+    ).first() or 0
+    return _rank(story_board(story_id), f"story:{story_id}", user_id, scenes_completed * SCENE_XP)
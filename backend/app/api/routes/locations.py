@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlmodel import Session, select
 from app.db import get_session, engine
 from app.models import Location
 from app.schemas import LocationOut
+from app.services.story_cache import story_cache
+from app.http_cache import to_cached_json, cached_json_response, LOCATIONS_CACHE_CONTROL
 from typing import List
 
 router = APIRouter()
@@ -22,6 +24,9 @@ def on_startup():
             session.commit()
 
 @router.get("/", response_model=List[LocationOut])
-def get_locations(session: Session = Depends(get_session)):
-    locations = session.exec(select(Location)).all()
-    return locations
+def get_locations(request: Request, session: Session = Depends(get_session)):
+    cached = story_cache.get_or_load(
+        ("locations",),
+        lambda: to_cached_json([LocationOut.model_validate(l) for l in session.exec(select(Location)).all()])
+    )
+    return cached_json_response(request, cached, LOCATIONS_CACHE_CONTROL)
@@ -3,16 +3,21 @@ Scenes API Routes
 Provides endpoints for individual scene details and completion tracking
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 from typing import List, Optional
 from app.db import get_session
 from app.models import Scene
-from app.schemas import SceneOut
+from app.schemas import SceneOut, ProgressSyncRequest
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, set_next_cursor
 # Old AI service imports removed - functionality moved to new audio routes
 # from app.services.ai_service import generate_scene_ai_metadata
 # from app.services.image_service import generate_image_from_prompt
-from app.services.gamification_service import complete_scene
+from app.services.gamification_service import complete_scene, sync_scene_progress
+from app.services.job_service import job_queue, FINAL_STATUSES
 # from app.services.voice_service import generate_voice, generate_movie_dialogue
 # from app.services.video_service import generate_single_scene_video
 from datetime import datetime
@@ -22,23 +27,91 @@ logger = logging.getLogger("katha.scenes")
 router = APIRouter()
 
 
+def _reel_page(session: Session, limit: int, key: Optional[dict]) -> List[Scene]:
+    """
+    One page of the reel feed: newest first by (generated_at, id), then reels
+    without a generated_at by id. Each part is a range scan of
+    ix_scene_video_feed starting at the cursor.
+    """
+    reels = select(Scene).where(Scene.ai_video_url != None)
+    dated = reels.where(Scene.generated_at != None).order_by(Scene.generated_at.desc(), Scene.id.desc())
+    undated = reels.where(Scene.generated_at == None).order_by(Scene.id.desc())
+    if key is not None:
+        if key["g"] is None:
+            dated = None
+            undated = undated.where(Scene.id < key["i"])
+        else:
+            dated = dated.where(tuple_(Scene.generated_at, Scene.id) < tuple_(key["g"], key["i"]))
+
+    scenes = list(session.exec(dated.limit(limit)).all()) if dated is not None else []
+    if len(scenes) < limit:
+        scenes += session.exec(undated.limit(limit - len(scenes))).all()
+    return scenes
+
+
 @router.get("/", response_model=List[SceneOut])
 def get_scenes(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     has_video: bool = False,
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the previous page's {NEXT_CURSOR_HEADER} header"),
     session: Session = Depends(get_session)
 ):
-    """Get all scenes, optionally filtering for those with video reels"""
-    query = select(Scene)
-    if has_video:
-        query = query.where(Scene.ai_video_url != None)
-    
-    # Sort by most recently generated if filtering by video
-    if has_video:
-        query = query.order_by(Scene.generated_at.desc())
-        
-    return session.exec(query.offset(skip).limit(limit)).all()
+    """
+    Get all scenes, optionally filtering for those with video reels.
+
+    Pages by cursor: pass the previous page's X-Next-Cursor header (absent on
+    the last page) as `cursor`. Reels are newest first by (generated_at, id),
+    other scenes by id. `skip` (OFFSET paging) is still honoured without a
+    cursor, but costs a scan of every skipped row.
+    """
+    key = None
+    if cursor:
+        key = decode_cursor(cursor, datetime_fields=("g",))
+        if not isinstance(key.get("i"), int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        key.setdefault("g", None)
+
+    if has_video and (key is not None or not skip):
+        scenes = _reel_page(session, limit, key)
+    else:
+        query = select(Scene)
+        if has_video:
+            # Sort by most recently generated (legacy OFFSET paging)
+            query = query.where(Scene.ai_video_url != None).order_by(
+                Scene.generated_at.desc(), Scene.id.desc()
+            ).offset(skip)
+        elif key is not None:
+            query = query.where(Scene.id > key["i"]).order_by(Scene.id)
+        else:
+            query = query.order_by(Scene.id).offset(skip)
+        scenes = session.exec(query.limit(limit)).all()
+
+    if len(scenes) == limit:
+        last = scenes[-1]
+        set_next_cursor(response, encode_cursor(g=last.generated_at, i=last.id) if has_video else encode_cursor(i=last.id))
+    return scenes
+
+
+@router.post("/sync")
+def sync_progress(
+    payload: ProgressSyncRequest,
+    user_id: int = Query(...),
+    session: Session = Depends(get_session)
+):
+    """
+    Replay scenes completed offline in one transaction.
+    Already-completed and unknown scenes are reported rather than failing the batch.
+    """
+    try:
+        return sync_scene_progress(
+            session=session,
+            user_id=user_id,
+            events=[(event.scene_id, event.completed_at) for event in payload.events]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.get("/{scene_id}", response_model=SceneOut)
@@ -55,6 +128,7 @@ def get_scene(scene_id: int, session: Session = Depends(get_session)):
 async def generate_scene_assets(
     scene_id: int, 
     fast_mode: bool = Query(default=True, description="Use fast animated video (5-10s) instead of SVD (1-3min)"),
+    background: bool = Query(default=False, description="Return 202 with a job instead of waiting for the video"),
     session: Session = Depends(get_session)
 ):
     """
@@ -68,46 +142,34 @@ async def generate_scene_assets(
     1. Generate cinematic image with Pollinations
     2. Fast mode: Apply Ken Burns animation
     3. SVD mode: Animate with Stable Video Diffusion
+    
+    Generation runs as a background job (see /api/jobs); concurrent requests
+    for the same scene share one job. With background=true the job is
+    returned immediately (202), otherwise the updated scene is returned
+    once the job finishes. A job still running after JOB_WAIT_SECONDS is
+    returned with 202 as well, to poll at /api/jobs/{id}.
     """
     scene = session.get(Scene, scene_id)
     if not scene:
         raise HTTPException(status_code=404, detail="Scene not found")
     
-    logger.info(f"Generating {'fast' if fast_mode else 'SVD'} video for scene {scene_id}...")
+    logger.info(f"Queueing {'fast' if fast_mode else 'SVD'} video for scene {scene_id}...")
+    job = await job_queue.enqueue("scene_video", scene_id, {"fast_mode": fast_mode})
     
-    try:
-        if fast_mode:
-            # FAST MODE: Animated image with Ken Burns (5-10 seconds)
-            from app.services.fast_video_service import fast_video_service
-            video_url = fast_video_service.generate_fast_video(
-                scene_text=scene.raw_text,
-                emotion=scene.ai_emotion,
-                scene_id=scene.id
-            )
-            logger.info(f"✅ Fast video generated: {video_url}")
-        else:
-            # SVD MODE: Full video generation (1-3 minutes)
-            from app.services.svd_video_service import svd_video_service
-            video_url = svd_video_service.generate_scene_video(
-                scene_text=scene.raw_text,
-                emotion=scene.ai_emotion,
-                scene_id=scene.id
-            )
-            logger.info(f"✅ SVD video generated: {video_url}")
-        
-        # Update scene with video URL
-        scene.ai_video_url = video_url
-        scene.generated_at = datetime.utcnow()
-        
-        session.add(scene)
-        session.commit()
-        session.refresh(scene)
-        
-        return SceneOut.model_validate(scene)
-        
-    except Exception as e:
-        logger.error(f"Video generation error: {e}")
-        raise HTTPException(status_code=500, detail=f"Video generation failed: {str(e)}")
+    if not background:
+        job = await job_queue.wait(job.id, timeout=job_queue.request_wait_seconds)
+    if job.status not in FINAL_STATUSES:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(job_queue.to_out(job))
+        )
+    
+    if job.status != "succeeded":
+        logger.error(f"Video generation error: {job.error}")
+        raise HTTPException(status_code=500, detail=f"Video generation failed: {job.error or job.status}")
+    
+    session.refresh(scene)
+    return SceneOut.model_validate(scene)
 
 
 @router.post("/{scene_id}/complete")
@@ -3,50 +3,63 @@ Stories API Routes
 Provides endpoints for listing stories, getting story details with chapters and scenes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List, Optional
 from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
 from app.db import get_session
 from app.models import Story, Chapter, Scene
-from app.schemas import StoryOut, ChapterOut, SceneOut
+from app.schemas import StoryOut, ChapterOut, SceneOut, SearchHit
+from app.services.search_service import search, search_story_ids
+from app.services.story_cache import story_cache
+from app.http_cache import to_cached_json, cached_json_response
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[StoryOut])
-def list_stories(
-    session: Session = Depends(get_session),
-    q: Optional[str] = Query(None, description="Search query for story title"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    limit: int = Query(50, ge=1, le=100, description="Maximum number of stories to return"),
-    include_chapters: bool = Query(False, description="Include chapter details in response")
-):
-    """
-    List all stories with optional filtering.
-    For performance, chapters are not included by default.
-    """
+def _build_story_list(
+    session: Session,
+    q: Optional[str],
+    category: Optional[str],
+    limit: int,
+    include_chapters: bool
+) -> List[StoryOut]:
     query = select(Story)
     
+    ranked_ids = None
     if q:
-        query = query.where(Story.title.ilike(f"%{q}%"))
+        # Full-text match on story, chapter and scene text, best match first
+        ranked_ids = search_story_ids(session, q)
+        if not ranked_ids:
+            return []
+        query = query.where(Story.id.in_(ranked_ids))
     if category and category.lower() != "all":
         query = query.where(Story.category.ilike(category))
     
-    query = query.limit(limit)
+    if ranked_ids is None:
+        query = query.limit(limit)
     stories = session.exec(query).all()
+    if ranked_ids is not None:
+        position = {story_id: i for i, story_id in enumerate(ranked_ids)}
+        stories = sorted(stories, key=lambda story: position[story.id])[:limit]
+    
+    # All stories' chapters in one query, not one per story
+    chapters_by_story = {story.id: [] for story in stories}
+    if include_chapters and stories:
+        chapters = session.exec(
+            select(Chapter)
+            .where(Chapter.story_id.in_(list(chapters_by_story)))
+            .order_by(Chapter.story_id, Chapter.index)
+        ).all()
+        for chapter in chapters:
+            chapters_by_story[chapter.story_id].append(chapter)
     
     result = []
     for story in stories:
         chapters_out = []
         
         if include_chapters:
-            chapters = session.exec(
-                select(Chapter)
-                .where(Chapter.story_id == story.id)
-                .order_by(Chapter.index)
-            ).all()
-            
-            for chapter in chapters:
+            for chapter in chapters_by_story[story.id]:
                 chapters_out.append(ChapterOut(
                     id=chapter.id,
                     story_id=chapter.story_id,
@@ -71,63 +84,79 @@ def list_stories(
     return result
 
 
-@router.get("/{story_id}", response_model=StoryOut)
-def get_story(
-    story_id: int, 
+@router.get("/", response_model=List[StoryOut])
+def list_stories(
+    request: Request,
     session: Session = Depends(get_session),
-    include_scenes: bool = Query(True, description="Include scene details in chapters")
+    q: Optional[str] = Query(None, description="Full-text search over story, chapter and scene text"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of stories to return"),
+    include_chapters: bool = Query(False, description="Include chapter details in response")
 ):
     """
-    Get a single story with all chapters and optionally scenes.
+    List all stories with optional filtering.
+    For performance, chapters are not included by default.
+    Supports If-None-Match: an unchanged catalog returns 304 Not Modified.
     """
-    story = session.get(Story, story_id)
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    if q is not None:
+        # Free-text queries are unbounded: caching them would evict the shared
+        # catalog payloads. The body is still hashed, so If-None-Match works.
+        return cached_json_response(
+            request, to_cached_json(_build_story_list(session, q, category, limit, include_chapters))
+        )
+    cached = story_cache.get_or_load(
+        ("story_list", category, limit, include_chapters),
+        lambda: to_cached_json(_build_story_list(session, None, category, limit, include_chapters))
+    )
+    return cached_json_response(request, cached)
+
+
+@router.get("/search", response_model=List[SearchHit])
+def search_catalog(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Search terms (each matched as a word prefix)"),
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session)
+):
+    """
+    Ranked full-text search across stories, chapters and scenes.
+    Matches in titles and snippets are wrapped in <mark>...</mark>.
+    Not cached (an FTS query takes a few ms, and arbitrary search strings
+    would evict catalog payloads), but If-None-Match still returns 304.
+    """
+    hits = [SearchHit(**hit) for hit in search(session, q, limit)]
+    return cached_json_response(request, to_cached_json(hits))
+
+
+def _build_story_out(session: Session, story_id: int, include_scenes: bool) -> Optional[StoryOut]:
+    """
+    Load a story tree with one query per level (story, chapters, scenes),
+    so the query count does not grow with the number of chapters.
+    """
+    loader = selectinload(Story.chapters)
+    if include_scenes:
+        loader = loader.selectinload(Chapter.scenes)
     
-    # Get chapters
-    chapters_db = session.exec(
-        select(Chapter)
-        .where(Chapter.story_id == story.id)
-        .order_by(Chapter.index)
-    ).all()
+    story = session.exec(
+        select(Story)
+        .where(Story.id == story_id)
+        .options(loader)
+    ).first()
+    if not story:
+        return None
     
-    chapters_out = []
-    for chapter in chapters_db:
-        scenes_out = []
-        
-        if include_scenes:
-            scenes_db = session.exec(
-                select(Scene)
-                .where(Scene.chapter_id == chapter.id)
-                .order_by(Scene.index)
-            ).all()
-            
-            for scene in scenes_db:
-                scenes_out.append(SceneOut(
-                    id=scene.id,
-                    chapter_id=scene.chapter_id,
-                    index=scene.index,
-                    raw_text=scene.raw_text,
-                    caption=scene.ai_caption,
-                    symbolism=scene.ai_symbolism,
-                    emotion=scene.ai_emotion,
-                    music_tag=scene.ai_background_music_tag,
-                    image_prompt=scene.ai_image_prompt,
-                    image_url=scene.ai_image_url,
-                    ai_image_url=scene.ai_image_url,
-                    ai_video_url=scene.ai_video_url,
-                    ai_audio_url=scene.ai_audio_url,
-                    audio_url=scene.ai_audio_url
-                ))
-        
-        chapters_out.append(ChapterOut(
+    chapters_out = [
+        ChapterOut(
             id=chapter.id,
             story_id=chapter.story_id,
             index=chapter.index,
             title=chapter.title,
             short_summary=chapter.short_summary,
-            scenes=scenes_out
-        ))
+            cover_image_url=chapter.cover_image_url,
+            scenes=[SceneOut.model_validate(s) for s in chapter.scenes] if include_scenes else []
+        )
+        for chapter in story.chapters
+    ]
     
     return StoryOut(
         id=story.id,
@@ -142,30 +171,49 @@ def get_story(
     )
 
 
+@router.get("/{story_id}", response_model=StoryOut)
+def get_story(
+    story_id: int, 
+    request: Request,
+    session: Session = Depends(get_session),
+    include_scenes: bool = Query(True, description="Include scene details in chapters")
+):
+    """
+    Get a single story with all chapters and optionally scenes.
+    Served from the story cache; the DB is only hit on a miss.
+    Supports If-None-Match: an unchanged story returns 304 Not Modified.
+    """
+    cached = story_cache.get_or_load(
+        ("story", story_id, include_scenes),
+        lambda: to_cached_json(_build_story_out(session, story_id, include_scenes))
+    )
+    if not cached:
+        raise HTTPException(status_code=404, detail="Story not found")
+    
+    return cached_json_response(request, cached)
+
+
 @router.get("/slug/{slug}", response_model=StoryOut)
-def get_story_by_slug(slug: str, session: Session = Depends(get_session)):
+def get_story_by_slug(slug: str, request: Request, session: Session = Depends(get_session)):
     """
     Get a story by its slug (URL-friendly identifier).
     """
-    story = session.exec(
-        select(Story).where(Story.slug == slug)
-    ).first()
+    story_id = story_cache.get_or_load(
+        ("story_slug", slug),
+        lambda: session.exec(select(Story.id).where(Story.slug == slug)).first()
+    )
     
-    if not story:
+    if not story_id:
         raise HTTPException(status_code=404, detail="Story not found")
     
     # Reuse the get_story logic
-    return get_story(story.id, session)
+    return get_story(story_id, request, session, include_scenes=True)
 
 
-@router.get("/{story_id}/chapters", response_model=List[ChapterOut])
-def get_story_chapters(story_id: int, session: Session = Depends(get_session)):
-    """
-    Get all chapters for a story (without scenes for lighter response).
-    """
+def _build_story_chapters(session: Session, story_id: int) -> Optional[List[ChapterOut]]:
     story = session.get(Story, story_id)
     if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+        return None
     
     chapters = session.exec(
         select(Chapter)
@@ -186,6 +234,21 @@ def get_story_chapters(story_id: int, session: Session = Depends(get_session)):
     ]
 
 
+@router.get("/{story_id}/chapters", response_model=List[ChapterOut])
+def get_story_chapters(story_id: int, request: Request, session: Session = Depends(get_session)):
+    """
+    Get all chapters for a story (without scenes for lighter response).
+    """
+    cached = story_cache.get_or_load(
+        ("story_chapters", story_id),
+        lambda: to_cached_json(_build_story_chapters(session, story_id))
+    )
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Story not found")
+    
+    return cached_json_response(request, cached)
+
+
 @router.get("/categories/list")
 def list_categories(session: Session = Depends(get_session)):
     """
@@ -5,13 +5,15 @@ Includes JWT token-based authentication
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlmodel import Session, select
-from app.db import get_session
+from app.db import engine, get_session
 from app.models import User
 from app.schemas import UserCreate, UserLogin, UserOut, UserUpdate
-from app.auth import hash_password, verify_password
-from app.jwt_auth import create_access_token, get_current_user_id, get_optional_user_id
+from app.auth import hash_password_async, verify_password_async, needs_rehash
+from app.jwt_auth import create_access_token, get_current_user_id, get_optional_user_id, revoke_token, security
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 
 router = APIRouter()
 
@@ -31,15 +33,37 @@ class ProfileUpdateResponse(BaseModel):
     message: str
 
 
+# Login/register await bcrypt, so they use short sessions in worker threads
+# rather than holding a pooled connection open across the hash.
+def _find_user_by_email(email: str) -> Optional[User]:
+    with Session(engine) as session:
+        return session.exec(select(User).where(User.email == email)).first()
+
+
+def _create_user(user: User) -> User:
+    with Session(engine) as session:
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user
+
+
+def _save_password_hash(user_id: int, password_hash: str) -> None:
+    with Session(engine) as session:
+        user = session.get(User, user_id)
+        user.password_hash = password_hash
+        session.add(user)
+        session.commit()
+
+
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, session: Session = Depends(get_session)):
+async def register(payload: UserCreate):
     """
     Register a new user.
     Returns user data and JWT token for immediate authentication.
     """
     # Check if email already exists
-    stmt = select(User).where(User.email == payload.email)
-    existing_user = session.exec(stmt).first()
+    existing_user = await asyncio.to_thread(_find_user_by_email, payload.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
@@ -47,16 +71,14 @@ def register(payload: UserCreate, session: Session = Depends(get_session)):
         )
     
     # Create user with hashed password
-    hashed = hash_password(payload.password)
+    hashed = await hash_password_async(payload.password)
     user = User(
         name=payload.name, 
         email=payload.email, 
         password_hash=hashed,
         username=payload.email.split("@")[0]  # Default username from email
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    user = await asyncio.to_thread(_create_user, user)
     
     # Generate JWT token
     token_response = create_access_token(user.id, user.email)
@@ -72,12 +94,11 @@ def register(payload: UserCreate, session: Session = Depends(get_session)):
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(payload: UserLogin, session: Session = Depends(get_session)):
+async def login(payload: UserLogin):
     """
     Authenticate user and return JWT token.
     """
-    stmt = select(User).where(User.email == payload.email)
-    user = session.exec(stmt).first()
+    user = await asyncio.to_thread(_find_user_by_email, payload.email)
     
     if not user:
         raise HTTPException(
@@ -85,12 +106,17 @@ def login(payload: UserLogin, session: Session = Depends(get_session)):
             detail="Invalid email or password"
         )
     
-    if not user.password_hash or not verify_password(payload.password, user.password_hash):
+    if not user.password_hash or not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid email or password"
         )
     
+    # Upgrade hashes made with an older/different BCRYPT_ROUNDS
+    if needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(payload.password)
+        await asyncio.to_thread(_save_password_hash, user.id, user.password_hash)
+    
     # Generate JWT token
     token_response = create_access_token(user.id, user.email)
     user_out = UserOut.model_validate(user)
@@ -104,6 +130,18 @@ def login(payload: UserLogin, session: Session = Depends(get_session)):
     )
 
 
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Revoke the presented JWT token.
+    """
+    revoke_token(credentials.credentials)
+    return {"message": "Logged out"}
+
+
 @router.get("/me", response_model=UserOut)
 def get_current_user_profile(
     session: Session = Depends(get_session),
@@ -257,32 +295,10 @@ def get_user_completed_stories(user_id: int, session: Session = Depends(get_sess
     """
     Return stories where all scenes are completed by the user.
     """
-    from app.models import Story, Chapter, Scene, UserSceneProgress
-    from sqlalchemy import func
-    
-    # Get all stories with completed scene counts
-    stories_with_progress = session.exec(
-        select(Story)
-    ).all()
+    from app.models import Story, UserStoryProgress
     
-    completed_stories = []
-    for story in stories_with_progress:
-        total_scenes = story.total_scenes
-        if total_scenes == 0:
-            continue
-            
-        # Count completed scenes for this story
-        completed_count = session.exec(
-            select(func.count(UserSceneProgress.id))
-            .join(Scene).join(Chapter)
-            .where(
-                Chapter.story_id == story.id,
-                UserSceneProgress.user_id == user_id,
-                UserSceneProgress.completed == True
-            )
-        ).one()
-        
-        if completed_count >= total_scenes:
-            completed_stories.append(story)
-    
-    return completed_stories
+    stmt = select(Story).join(UserStoryProgress).where(
+        UserStoryProgress.user_id == user_id,
+        UserStoryProgress.completed == True
+    )
+    return session.exec(stmt).all()
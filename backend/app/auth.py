@@ -1,8 +1,58 @@
+"""
+Password hashing
+
+bcrypt costs ~2^BCRYPT_ROUNDS work per call (~250 ms at 12 rounds), so the
+async helpers run it in a dedicated, bounded thread pool: bcrypt releases
+the GIL, so BCRYPT_WORKERS threads hash in parallel on that many cores while
+the event loop and the request threadpool stay free. Hashes made with a
+different cost are upgraded on the next successful login (see needs_rehash).
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS") or os.cpu_count() or 1)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, BCRYPT_WORKERS), thread_name_prefix="bcrypt")
+    return _executor
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+def hash_cost(hashed: str) -> Optional[int]:
+    """Work factor stored in a bcrypt hash ("$2b$12$..." -> 12)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed: str) -> bool:
+    """True when the hash was made with a cost other than BCRYPT_ROUNDS"""
+    return hash_cost(hashed) != BCRYPT_ROUNDS
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password on the bcrypt pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), verify_password, password, hashed)
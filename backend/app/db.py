@@ -1,15 +1,65 @@
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
+from typing import Generator, List
+import logging
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = logging.getLogger("katha.db")
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./katha.db")
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
 
+# Which duplicate survives when a unique index is added to an existing table
+_DEDUPE_ORDER = {
+    "usersceneprogress": "completed DESC, id",
+}
+
 def create_db_and_tables():
+    from app.services.search_service import ensure_search_index
     SQLModel.metadata.create_all(engine)
+    ensure_indexes(engine)
+    ensure_search_index(engine)
+
+def ensure_indexes(bind=engine) -> List[str]:
+    """
+    Create indexes declared in models.py that an existing database lacks.
+    create_all() only builds indexes together with new tables, so databases
+    created before an index was added are migrated here. Duplicate rows are
+    removed before a unique index is built. Returns the created index names.
+    """
+    inspector = inspect(bind)
+    created = []
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing:
+                continue
+            with bind.begin() as conn:
+                if index.unique:
+                    removed = _delete_duplicates(conn, table, index)
+                    if removed:
+                        logger.warning(f"Removed {removed} duplicate {table.name} rows before adding {index.name}")
+                index.create(conn)
+            created.append(index.name)
+            logger.info(f"Created index {index.name}")
+    return created
+
+def _delete_duplicates(conn, table, index) -> int:
+    quote = conn.dialect.identifier_preparer.quote
+    name = quote(table.name)
+    columns = ", ".join(quote(column.name) for column in index.columns)
+    order = _DEDUPE_ORDER.get(table.name, "id")
+    result = conn.execute(text(
+        f"DELETE FROM {name} WHERE id NOT IN ("
+        f"SELECT id FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY {columns} ORDER BY {order}) AS rn "
+        f"FROM {name}) ranked WHERE rn = 1)"
+    ))
+    return result.rowcount
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
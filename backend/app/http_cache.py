@@ -0,0 +1,75 @@
+"""
+HTTP Caching Helpers
+Strong ETags, If-None-Match handling and Cache-Control policies for
+read-mostly catalog endpoints.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Catalog content only changes on reseed or asset generation: let clients and
+# CDNs reuse a copy briefly, then revalidate cheaply with If-None-Match.
+CATALOG_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+# Map locations are seeded once and practically never change.
+LOCATIONS_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+
+
+@dataclass(frozen=True)
+class CachedJSON:
+    """A response body serialized once, with its strong ETag"""
+    body: bytes
+    etag: str
+
+
+def to_cached_json(payload: Any) -> Optional[CachedJSON]:
+    """
+    Serialize a payload (Pydantic models, lists, dicts) to JSON bytes and
+    derive a strong ETag from the content hash. Returns None for None so it
+    can wrap loaders that signal "not found".
+    """
+    if payload is None:
+        return None
+    body = json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CachedJSON(body=body, etag=etag)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against etag, as RFC 9110 requires"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_json_response(
+    request: Request,
+    cached: CachedJSON,
+    cache_control: str = CATALOG_CACHE_CONTROL
+) -> Response:
+    """
+    Return 304 Not Modified if the client already has this version,
+    otherwise the pre-serialized body.
+    """
+    headers = {"ETag": cached.etag, "Cache-Control": cache_control}
+    if etag_matches(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -3,9 +3,13 @@ JWT Authentication Module for Katha
 Secure token-based authentication with proper error handling
 """
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -17,6 +21,8 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "katha-secret-key-change-in-production-
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", "10000"))
+
 security = HTTPBearer(auto_error=False)
 
 
@@ -57,11 +63,92 @@ def create_access_token(user_id: int, email: str = None) -> TokenResponse:
     )
 
 
-def verify_token(token: str) -> Optional[TokenData]:
+class VerifiedTokenCache:
     """
-    Verify and decode a JWT token.
-    Returns TokenData if valid, None otherwise.
+    LRU of tokens that already passed signature verification, keyed by the
+    token's SHA-256 and holding the decoded (user_id, email, exp). A hit skips
+    the HMAC and JSON work; expiry is still checked on every lookup, and
+    revoked tokens are refused even while cached.
+
+    The revocation list is per process and only kept until each revoked token
+    would have expired anyway.
     """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, TokenData]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}  # digest -> exp timestamp
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, digest: str) -> Optional[TokenData]:
+        with self._lock:
+            token_data = self._entries.get(digest)
+            if token_data is None:
+                self.misses += 1
+                return None
+            if token_data.exp.timestamp() <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return token_data
+
+    def set(self, digest: str, token_data: TokenData) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if digest in self._revoked:
+                return
+            self._entries[digest] = token_data
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._revoked
+
+    def revoke(self, digest: str, exp: Optional[datetime] = None) -> None:
+        """Refuse this token from now on, cached or not"""
+        expires = exp.timestamp() if exp else time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        now = time.time()
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = expires
+            # Forget revocations whose tokens have expired on their own
+            for key in [key for key, until in self._revoked.items() if until <= now]:
+                del self._revoked[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# Singleton instance
+token_cache = VerifiedTokenCache(max_entries=TOKEN_CACHE_SIZE)
+
+
+def _decode_token(token: str) -> Optional[TokenData]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = int(payload.get("sub"))
@@ -76,6 +163,34 @@ def verify_token(token: str) -> Optional[TokenData]:
         return None
 
 
+def verify_token(token: str) -> Optional[TokenData]:
+    """
+    Verify and decode a JWT token.
+    Returns TokenData if valid, None otherwise.
+    Verified tokens are served from token_cache until they expire.
+    """
+    digest = token_cache.digest(token)
+    token_data = token_cache.get(digest)
+    if token_data is not None:
+        return token_data
+
+    if token_cache.is_revoked(digest):
+        return None
+
+    token_data = _decode_token(token)
+    if token_data is not None:
+        token_cache.set(digest, token_data)
+    return token_data
+
+
+def revoke_token(token: str) -> None:
+    """
+    Revoke a token (e.g. on logout) in this process.
+    """
+    token_data = _decode_token(token)
+    token_cache.revoke(token_cache.digest(token), token_data.exp if token_data else None)
+
+
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> int:
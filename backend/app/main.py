@@ -4,19 +4,27 @@ FastAPI Backend with JWT Authentication
 """
 
 import os
-import time
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from app.db import create_db_and_tables
-from app.api.routes import users, stories, chapters, scenes, achievements, debug, locations, audio
+from app.db import create_db_and_tables, engine
+from app.jwt_auth import token_cache
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, register_cache, render
+from app.media import MediaFiles
+from app.api.routes import users, stories, chapters, scenes, achievements, debug, locations, audio, jobs, leaderboard
 from app.api.routes import reel
 from app.api.routes.ai import rishi
+from app.services.job_service import job_queue
+from app.services.leaderboard_service import leaderboards
+from app.services.media_gc import media_gc
+from app.services.llm_cache import llm_cache
+from app.services.story_cache import story_cache
+from app.services.tts_cache import get_tts_cache
+from app.services.rishi_service import start_llm_client, close_llm_client
 
 # Configure logging
 logging.basicConfig(
@@ -31,18 +39,27 @@ logger = logging.getLogger("katha")
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager.
-    Startup: Initialize database
+    Startup: Initialize database, open the shared LLM client, start background job workers,
+    the leaderboard refresh and the orphaned media collector
     Shutdown: Cleanup resources
     """
     # Startup
     logger.info("🚀 Starting Katha API...")
     create_db_and_tables()
     logger.info("✅ Database tables initialized")
+    await start_llm_client()
+    await job_queue.start()
+    await leaderboards.start()
+    await media_gc.start(str(static_dir))
     
     yield  # Application runs here
     
     # Shutdown
     logger.info("👋 Shutting down Katha API...")
+    await media_gc.stop()
+    await leaderboards.stop()
+    await job_queue.stop()
+    await close_llm_client()
 
 
 # Create FastAPI app with lifespan
@@ -77,26 +94,13 @@ app.add_middleware(
 )
 
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all API requests with timing"""
-    start_time = time.time()
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate duration
-    duration = time.time() - start_time
-    
-    # Log request
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Duration: {duration:.3f}s"
-    )
-    
-    return response
+# Request metrics (route latency, sizes, query counts) and the request log line
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+register_cache("story_tree", story_cache.stats)
+register_cache("tts", lambda: get_tts_cache().stats())
+register_cache("llm", llm_cache.stats)
+register_cache("jwt", token_cache.stats)
 
 
 # Static files setup
@@ -124,7 +128,8 @@ def setup_static_files():
 
 
 static_dir = setup_static_files()
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+# Generated media: immutable caching for uniquely named files, byte ranges for seeking
+app.mount("/static", MediaFiles(directory=str(static_dir)), name="static")
 
 
 # API Routes
@@ -139,6 +144,12 @@ app.include_router(locations.router, prefix="/api/locations", tags=["locations"]
 # Audio Generation (NEW)
 app.include_router(audio.router, prefix="/api", tags=["audio"])
 
+# Background generation jobs
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+
+# XP and streak leaderboards
+app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["leaderboard"])
+
 # AI Routes (Only Rishi chat and reel remaining)
 app.include_router(reel.router, prefix="/api/ai/reel", tags=["ai-reel"])
 app.include_router(rishi.router, prefix="/api/ai/rishi", tags=["ai-rishi"])
@@ -163,3 +174,9 @@ def health_check():
         "database": "connected",
         "static_files": str(static_dir.absolute())
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,179 @@
+"""
+Generated Media Serving
+StaticFiles for /static with long-lived caching of uniquely named files,
+byte-range requests (audio/video seeking) and precompressed text assets.
+
+Generators write each result under a fresh name (a uuid/hash or millisecond
+timestamp suffix, e.g. scene_100_14a12b0a.mp3), so those files never change
+and are served as immutable. Fixed names that are regenerated in place get
+a short max-age and revalidate by ETag.
+
+Bodies are streamed in large chunks, or handed to the server as a path via
+the ASGI `http.response.pathsend` extension (zero-copy sendfile) when the
+server supports it.
+"""
+
+import os
+import re
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# Unique per generation: uuid/hash hex or epoch-millisecond suffix before the extension
+UNIQUE_NAME = re.compile(r"_(?:[0-9a-f]{8,}|\d{13})\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+
+# Text assets that may have .br/.gz siblings (see scripts/precompress_static.py)
+COMPRESSIBLE_SUFFIXES = {".json", ".txt", ".vtt", ".srt", ".svg", ".css", ".js", ".html", ".xml"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into inclusive (start, end) offsets.
+    Returns None when the whole file should be sent (no header, malformed or
+    multi-range); raises RangeNotSatisfiable when it starts past the end.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, end
+
+
+def accepted_encodings(request_headers: Headers) -> set:
+    encodings = set()
+    for item in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse that sends one byte range and can hand the file to the server"""
+    chunk_size = 256 * 1024
+
+    def __init__(self, *args, byte_range: Optional[Tuple[int, int]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.byte_range = byte_range
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif self.byte_range is None and "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+        else:
+            start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+            remaining = end - start + 1
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                while True:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining -= len(chunk)
+                    more_body = remaining > 0 and len(chunk) > 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                    if not more_body:
+                        break
+        if self.background is not None:
+            await self.background()
+
+
+class MediaFiles(StaticFiles):
+    """StaticFiles with immutable caching, Range requests and precompressed variants"""
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = os.fspath(full_path)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if UNIQUE_NAME.search(path) else MEDIA_CACHE_CONTROL
+        }
+
+        send_path, send_stat = path, stat_result
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix in COMPRESSIBLE_SUFFIXES:
+            headers["Vary"] = "Accept-Encoding"
+            send_path, send_stat, encoding = self._precompressed(path, stat_result, request_headers)
+            if encoding:
+                headers["Content-Encoding"] = encoding
+
+        response = MediaFileResponse(
+            send_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=self._media_type(path),
+            stat_result=send_stat,
+            method=scope["method"]
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        size = send_stat.st_size
+        if status_code != 200 or not self._range_applies(request_headers, response.headers):
+            return response
+        try:
+            byte_range = parse_range(request_headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is None:
+            return response
+        start, end = byte_range
+        response.status_code = 206
+        response.byte_range = byte_range
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.headers["Content-Length"] = str(end - start + 1)
+        return response
+
+    @staticmethod
+    def _media_type(path: str) -> str:
+        # Typed by the original name, also when a .br/.gz sibling is sent
+        return guess_type(path)[0] or "application/octet-stream"
+
+    @staticmethod
+    def _range_applies(request_headers: Headers, response_headers: Headers) -> bool:
+        """If-Range: only honour Range when the client's copy is still current"""
+        if_range = request_headers.get("if-range")
+        if not if_range:
+            return True
+        return if_range in (response_headers.get("etag"), response_headers.get("last-modified"))
+
+    @staticmethod
+    def _precompressed(path: str, stat_result: os.stat_result, request_headers: Headers):
+        """Best .br/.gz sibling the client accepts that is not older than the file"""
+        accepted = accepted_encodings(request_headers)
+        for encoding, extension in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                compressed = os.stat(path + extension)
+            except OSError:
+                continue
+            if compressed.st_mtime >= stat_result.st_mtime:
+                return path + extension, compressed, encoding
+        return path, stat_result, None
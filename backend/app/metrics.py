@@ -0,0 +1,390 @@
+"""
+Prometheus Metrics
+In-process counters, gauges and histograms rendered in the Prometheus text
+exposition format at /metrics, without a client library dependency.
+
+MetricsMiddleware (plain ASGI, no BaseHTTPMiddleware overhead) records per
+route template latency, request/response bytes, status codes, requests in
+flight and the number and time of SQL statements each request ran, which
+it also reports in a Server-Timing header; statements slower than
+SLOW_QUERY_MS are logged with their route. Slow external work (TTS, LLM,
+image/video generation) is timed with external_call(), and cache hit/miss
+figures are collected from the caches' stats() at scrape time via
+register_collector().
+
+Each process keeps its own figures; with several workers, scrape each one
+(or label by instance) as usual for multi-process Prometheus setups.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger("katha")
+sql_logger = logging.getLogger("katha.sql")
+
+# Statements at least this slow are logged with their route
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Send a Server-Timing header (db time, query count, app time) with every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+# Starlette appends "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXTERNAL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._values.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {int(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {int(cumulative)}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+# Called at scrape time to refresh gauges mirrored from other components
+_collectors: List[Callable[[], None]] = []
+
+
+def register_collector(collector: Callable[[], None]) -> None:
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    for collector in _collectors:
+        try:
+            collector()
+        except Exception as e:
+            logger.warning(f"Metrics collector failed: {e}")
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Metric definitions
+# ----------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter("katha_http_requests_total", "HTTP requests by route template, method and status",
+                        ("method", "route", "status"))
+HTTP_LATENCY = Histogram("katha_http_request_duration_seconds", "HTTP request latency by route template",
+                         ("method", "route"))
+HTTP_REQUEST_BYTES = Histogram("katha_http_request_size_bytes", "HTTP request body size",
+                               ("method", "route"), buckets=SIZE_BUCKETS)
+HTTP_RESPONSE_BYTES = Histogram("katha_http_response_size_bytes", "HTTP response body size",
+                                ("method", "route"), buckets=SIZE_BUCKETS)
+HTTP_IN_PROGRESS = Gauge("katha_http_requests_in_progress", "HTTP requests being served")
+DB_QUERIES = Counter("katha_db_queries_total", "SQL statements executed")
+DB_QUERY_SECONDS = Histogram("katha_db_query_duration_seconds", "SQL statement latency",
+                             buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+HTTP_DB_QUERIES = Histogram("katha_http_request_db_queries", "SQL statements per HTTP request by route template",
+                            ("method", "route"), buckets=QUERY_COUNT_BUCKETS)
+EXTERNAL_CALLS = Histogram("katha_external_call_duration_seconds",
+                           "Latency of TTS, LLM and image/video generation calls",
+                           ("service", "outcome"), buckets=EXTERNAL_BUCKETS)
+JOBS_IN_PROGRESS = Gauge("katha_jobs_in_progress", "Background generation jobs running", ("kind",))
+JOB_DURATION = Histogram("katha_job_duration_seconds", "Background generation job duration",
+                         ("kind", "status"), buckets=EXTERNAL_BUCKETS)
+CACHE_HITS = Gauge("katha_cache_hits", "Cache hits since start", ("cache",))
+CACHE_MISSES = Gauge("katha_cache_misses", "Cache misses since start", ("cache",))
+CACHE_HIT_RATIO = Gauge("katha_cache_hit_ratio", "Cache hit ratio since start", ("cache",))
+
+
+def register_cache(name: str, stats: Callable[[], dict]) -> None:
+    """Mirror a cache's stats() hits/misses/hit_ratio into the cache gauges at scrape time"""
+    def collect() -> None:
+        figures = stats()
+        CACHE_HITS.set(figures.get("hits", 0), cache=name)
+        CACHE_MISSES.set(figures.get("misses", 0), cache=name)
+        CACHE_HIT_RATIO.set(figures.get("hit_ratio", 0.0), cache=name)
+    register_collector(collect)
+
+
+@contextmanager
+def external_call(service: str):
+    """Time a TTS/LLM/image/video call: `with external_call("tts"): ...`"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except (GeneratorExit, asyncio.CancelledError):
+        # Caller went away (client disconnect, job cancel)
+        outcome = "cancelled"
+        raise
+    finally:
+        EXTERNAL_CALLS.observe(time.perf_counter() - start, service=service, outcome=outcome)
+
+
+# ----------------------------------------------------------------------
+# Per-request accounting
+# ----------------------------------------------------------------------
+
+class RequestStats:
+    """Figures gathered while serving one request"""
+    __slots__ = ("scope", "db_queries", "db_seconds")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by MetricsMiddleware; copied into threadpool workers running sync endpoints
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("katha_request_stats", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    return _current_request.get()
+
+
+def instrument_engine(engine) -> None:
+    """
+    Count and time SQL statements globally and against the request being
+    served, and log statements slower than SLOW_QUERY_MS with their route.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def finish_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        _record_query(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def failed_query(exception_context):
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            _record_query(exception_context.statement or "", time.perf_counter() - started.pop())
+
+
+def _record_query(statement: str, elapsed: float) -> None:
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        scope = stats.scope if stats is not None else None
+        where = f"{scope['method']} {route_label(scope)}" if scope else "outside a request"
+        sql_logger.warning(f"Slow query ({elapsed * 1000:.1f} ms, {where}): {' '.join(statement.split())[:1000]}")
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    """Server-Timing header value: database time and statement count, plus total app time"""
+    return (f'db;desc="{stats.db_queries} queries";dur={stats.db_seconds * 1000:.1f}, '
+            f"app;dur={elapsed * 1000:.1f}")
+
+
+_SERVER_TIMING_QUERIES = re.compile(r'db;desc="(\d+) queries"')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def response_query_count(response) -> Optional[int]:
+    """SQL statements a response took, from its Server-Timing header"""
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+def assert_query_budget(response, max_queries: int):
+    """
+    For checks and tests: fail if the request behind `response` (e.g. from
+    TestClient) ran more than max_queries SQL statements. Returns the response.
+    """
+    count = response_query_count(response)
+    if count is None:
+        raise QueryBudgetExceeded("Response has no Server-Timing query count (is SERVER_TIMING enabled?)")
+    if count > max_queries:
+        request = response.request
+        raise QueryBudgetExceeded(f"{request.method} {request.url.path} ran {count} queries, budget is {max_queries}")
+    return response
+
+
+def route_label(scope: dict) -> str:
+    """Route template (/api/stories/{story_id}), never the raw path, to bound label cardinality"""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    if scope.get("endpoint") is not None:
+        # Mounted app such as /static
+        return f"{scope.get('root_path', '')}/{{path}}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Per-request latency, size, status and query-count metrics, plus the request log line"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    timing = server_timing(stats, time.perf_counter() - start)
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", timing.encode())]}
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec()
+            _current_request.reset(token)
+            method = scope["method"]
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_LATENCY.observe(duration, method=method, route=route)
+            HTTP_REQUEST_BYTES.observe(request_bytes, method=method, route=route)
+            HTTP_RESPONSE_BYTES.observe(response_bytes, method=method, route=route)
+            HTTP_DB_QUERIES.observe(stats.db_queries, method=method, route=route)
+            logger.info(
+                f"{method} {scope['path']} - "
+                f"Status: {status} - "
+                f"Duration: {duration:.3f}s"
+            )
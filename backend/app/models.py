@@ -1,5 +1,6 @@
 from typing import Optional, List
 from datetime import datetime, date
+from sqlalchemy import Index, UniqueConstraint, text
 from sqlmodel import SQLModel, Field, Relationship
 
 class User(SQLModel, table=True):
@@ -23,6 +24,10 @@ class User(SQLModel, table=True):
     favorites: List["UserFavoriteStory"] = Relationship(back_populates="user")
 
 class UserFavoriteStory(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_userfavoritestory_user_story", "user_id", "story_id", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     story_id: int = Field(foreign_key="story.id")
@@ -40,9 +45,17 @@ class Story(SQLModel, table=True):
     total_chapters: int = 0
     total_scenes: int = 0
 
-    chapters: List["Chapter"] = Relationship(back_populates="story")
+    chapters: List["Chapter"] = Relationship(
+        back_populates="story",
+        sa_relationship_kwargs={"order_by": "Chapter.index"}
+    )
 
 class Chapter(SQLModel, table=True):
+    __table_args__ = (
+        # Story.chapters / chapter navigation: WHERE story_id = ? ORDER BY index
+        Index("ix_chapter_story_index", "story_id", "index"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     story_id: int = Field(foreign_key="story.id")
     index: int
@@ -51,9 +64,25 @@ class Chapter(SQLModel, table=True):
     cover_image_url: Optional[str] = None
 
     story: Optional[Story] = Relationship(back_populates="chapters")
-    scenes: List["Scene"] = Relationship(back_populates="chapter")
+    scenes: List["Scene"] = Relationship(
+        back_populates="chapter",
+        sa_relationship_kwargs={"order_by": "Scene.index"}
+    )
 
 class Scene(SQLModel, table=True):
+    __table_args__ = (
+        # Chapter.scenes: WHERE chapter_id = ? ORDER BY index
+        Index("ix_scene_chapter_index", "chapter_id", "index"),
+        # Reel feed: scenes with video, keyset-paged by (generated_at, id)
+        Index(
+            "ix_scene_video_feed",
+            "generated_at",
+            "id",
+            sqlite_where=text("ai_video_url IS NOT NULL"),
+            postgresql_where=text("ai_video_url IS NOT NULL"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     chapter_id: int = Field(foreign_key="chapter.id")
     index: int
@@ -75,6 +104,11 @@ class Scene(SQLModel, table=True):
     progress: List["UserSceneProgress"] = Relationship(back_populates="scene")
 
 class UserSceneProgress(SQLModel, table=True):
+    __table_args__ = (
+        # One progress row per (user, scene)
+        Index("ix_usersceneprogress_user_scene", "user_id", "scene_id", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     scene_id: int = Field(foreign_key="scene.id")
@@ -85,6 +119,17 @@ class UserSceneProgress(SQLModel, table=True):
     user: Optional[User] = Relationship(back_populates="progress")
     scene: Optional[Scene] = Relationship(back_populates="progress")
 
+class UserStoryProgress(SQLModel, table=True):
+    """Per-user completed-scene count for a story, kept in step with UserSceneProgress"""
+    __table_args__ = (UniqueConstraint("user_id", "story_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    story_id: int = Field(foreign_key="story.id")
+    scenes_completed: int = 0
+    completed: bool = False  # scenes_completed reached Story.total_scenes
+    completed_at: Optional[datetime] = None
+
 class Badge(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     code: str = Field(unique=True, index=True)
@@ -96,6 +141,10 @@ class Badge(SQLModel, table=True):
     users: List["UserBadge"] = Relationship(back_populates="badge")
 
 class UserBadge(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_userbadge_user_badge", "user_id", "badge_id", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     badge_id: int = Field(foreign_key="badge.id")
@@ -113,3 +162,47 @@ class Location(SQLModel, table=True):
     epoch: Optional[str] = None
     region: Optional[str] = None
     era: Optional[str] = None
+
+class GenerationJob(SQLModel, table=True):
+    """Persistent background job for slow audio/video generation"""
+    __table_args__ = (
+        # At most one active job per dedupe key: duplicate submissions share it
+        Index(
+            "ix_generationjob_active_dedupe",
+            "dedupe_key",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)  # scene_audio, scene_video, chapter_audio
+    target_id: int
+    params_json: str = "{}"
+    dedupe_key: str
+    status: str = Field(default="queued", index=True)  # queued, running, succeeded, failed, cancelled
+    cancel_requested: bool = False
+    attempts: int = 0
+    result_json: Optional[str] = None
+    error: Optional[str] = None
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class LLMCacheEntry(SQLModel, table=True):
+    """Cached LLM response keyed by (function, prompt version, input hash)"""
+    key: str = Field(primary_key=True)
+    function: str = Field(index=True)
+    prompt_version: str
+    response_json: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class FlightLease(SQLModel, table=True):
+    """Cross-process lease held while one worker computes a single-flight key"""
+    key: str = Field(primary_key=True)  # "{operation}:{key}"
+    owner: str
+    expires_at: datetime
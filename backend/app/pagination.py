@@ -0,0 +1,46 @@
+"""
+Keyset Pagination Helpers
+Opaque cursors for list endpoints ordered by a stable key. The next page
+continues from the last row's key instead of an OFFSET, so deep pages cost
+the same as the first and rows added meanwhile don't shift later pages.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**key: Any) -> str:
+    """Pack a row's sort key (datetimes as ISO strings) into an opaque cursor"""
+    payload = {
+        name: value.isoformat() if isinstance(value, datetime) else value
+        for name, value in key.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, datetime_fields: tuple = ()) -> Dict[str, Any]:
+    """Unpack a cursor from encode_cursor; malformed cursors are a 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+        if not isinstance(key, dict):
+            raise ValueError("cursor is not an object")
+        for name in datetime_fields:
+            if key.get(name) is not None:
+                key[name] = datetime.fromisoformat(key[name])
+        return key
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Expose the next page's cursor; absent on the last page"""
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Optional, List, Any, Dict
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 # User
 class UserCreate(BaseModel):
@@ -124,6 +124,24 @@ class StoryOut(BaseModel):
     total_scenes: int
     chapters: List[ChapterOut] = []
 
+# Offline progress sync
+class SceneCompletionEvent(BaseModel):
+    scene_id: int
+    completed_at: Optional[datetime] = None  # defaults to the time of sync
+
+class ProgressSyncRequest(BaseModel):
+    events: List[SceneCompletionEvent] = Field(..., max_length=500)
+
+# Search
+class SearchHit(BaseModel):
+    kind: str  # story, chapter or scene
+    id: int
+    story_id: int
+    chapter_id: Optional[int] = None
+    title: Optional[str] = None  # matches wrapped in <mark>...</mark>
+    snippet: Optional[str] = None
+    score: float
+
 # Achievements
 class BadgeOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -143,6 +161,27 @@ class AchievementOut(BaseModel):
     earned_badges: List[BadgeOut] = []
     locked_badges: List[BadgeOut] = []
 
+# Leaderboards
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    name: str
+    username: Optional[str] = None
+    profile_image_url: Optional[str] = None
+    score: int
+
+class LeaderboardOut(BaseModel):
+    board: str
+    total_ranked: int
+    entries: List[LeaderboardEntry] = []
+
+class LeaderboardRankOut(BaseModel):
+    board: str
+    user_id: int
+    rank: Optional[int] = None  # None until the user has a non-zero score
+    score: int
+    total_ranked: int
+
 # Map
 class LocationOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -155,3 +194,23 @@ class LocationOut(BaseModel):
     epoch: Optional[str] = None
     region: Optional[str] = None
     era: Optional[str] = None
+
+# Background jobs
+class JobCreate(BaseModel):
+    kind: str
+    target_id: int
+    params: Dict[str, Any] = {}
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    target_id: int
+    params: Dict[str, Any] = {}
+    status: str
+    cancel_requested: bool = False
+    attempts: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -13,6 +13,9 @@ import uuid
 from pydub import AudioSegment
 import math
 
+from app.services.tts_cache import TTSCache, get_tts_cache
+from app.metrics import external_call
+
 
 class AudioService:
     """Service for generating audio using Edge TTS with emotion mapping"""
@@ -94,10 +97,11 @@ class AudioService:
         'narrative': 1.00   # Baseline
     }
     
-    def __init__(self, output_dir: str = "static/audio"):
+    def __init__(self, output_dir: str = "static/audio", tts_cache: Optional[TTSCache] = None):
         """Initialize audio service"""
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.tts_cache = tts_cache or get_tts_cache()
     
     async def generate_audio(
         self,
@@ -133,6 +137,12 @@ class AudioService:
         filename = f"scene_{scene_id}_{uuid.uuid4().hex[:8]}.mp3"
         filepath = self.output_dir / filename
         
+        # Reuse identical audio synthesized before (volume is part of the key)
+        volume_multiplier = self.VOLUME_MAPPING.get(emotion.lower(), 1.0)
+        cache_key = TTSCache.make_key(text, voice_name, rate_value, pitch_value, volume_multiplier)
+        if await asyncio.to_thread(self.tts_cache.fetch, cache_key, filepath):
+            return f"/static/audio/{filename}"
+        
         # Create communicate object with rate and pitch
         communicate = edge_tts.Communicate(
             text,
@@ -142,10 +152,11 @@ class AudioService:
         )
         
         # Generate and save audio
-        await communicate.save(str(filepath))
+        with external_call("tts"):
+            await communicate.save(str(filepath))
         
         # Apply volume adjustment based on emotion
-        volume_multiplier = self.VOLUME_MAPPING.get(emotion.lower(), 1.0)
+        volume_applied = True
         if volume_multiplier != 1.0:
             try:
                 audio = AudioSegment.from_mp3(str(filepath))
@@ -153,7 +164,11 @@ class AudioService:
                 adjusted_audio = audio + db_change
                 adjusted_audio.export(str(filepath), format="mp3", bitrate="128k")
             except Exception as e:
-                pass  # Silently continue if volume adjustment fails
+                volume_applied = False  # Silently continue if volume adjustment fails
+        
+        # Don't cache audio at the wrong loudness
+        if volume_applied:
+            await asyncio.to_thread(self.tts_cache.store, cache_key, filepath)
         
         # Return relative path for database storage
         return f"/static/audio/{filename}"
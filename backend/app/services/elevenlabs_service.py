@@ -10,6 +10,8 @@ from typing import Optional
 from elevenlabs.client import ElevenLabs
 from elevenlabs import VoiceSettings
 
+from app.metrics import external_call
+
 logger = logging.getLogger(__name__)
 
 class ElevenLabsAudioService:
@@ -59,22 +61,23 @@ class ElevenLabsAudioService:
             # Get emotion-based voice settings
             settings = self._get_voice_settings(emotion)
             
-            # Generate audio using v2 API
-            audio_generator = self.client.text_to_speech.convert(
-                voice_id=self.narrator_voice_id,
-                text=text,
-                model_id="eleven_multilingual_v2",  # Best for Hindi/Sanskrit
-                voice_settings=settings
-            )
-            
             # Save to file
             filename = f"scene_{scene_id or 'temp'}_{emotion or 'neutral'}.mp3"
             filepath = os.path.join(self.audio_dir, filename)
             
-            # audio_generator is an iterator, write chunks
-            with open(filepath, "wb") as f:
-                for chunk in audio_generator:
-                    f.write(chunk)
+            with external_call("tts"):
+                # Generate audio using v2 API
+                audio_generator = self.client.text_to_speech.convert(
+                    voice_id=self.narrator_voice_id,
+                    text=text,
+                    model_id="eleven_multilingual_v2",  # Best for Hindi/Sanskrit
+                    voice_settings=settings
+                )
+                
+                # audio_generator is an iterator, write chunks
+                with open(filepath, "wb") as f:
+                    for chunk in audio_generator:
+                        f.write(chunk)
             
             logger.info(f"✅ Audio generated: {filepath}")
             return f"/static/audio/narration/{filename}"
@@ -5,18 +5,86 @@ Generates audio with character-specific emotional tones by:
 1. Parsing dialogue into segments
 2. Generating audio for each segment with appropriate emotion
 3. Concatenating segments into final audio file
+
+Segments are synthesized concurrently (bounded by TTS_MAX_CONCURRENCY) and
+retried individually (TTS_MAX_RETRIES), so a scene costs roughly as long as
+its slowest segment rather than the sum of all of them.
+
+Assembly happens in memory: the segments' MP3 frames are joined and
+decoded to PCM in a single ffmpeg run, split back per segment by frame
+count, per-emotion gain is applied to the whole scene in one NumPy
+operation, and the result is encoded to MP3 exactly once. No temp files
+are written.
 """
 
 import edge_tts
 import asyncio
+import subprocess
+from typing import List, Optional, Tuple
 from pathlib import Path
-from typing import Optional
 import uuid
+import numpy as np
 from pydub import AudioSegment
 import os
 
+from app.metrics import external_call
 from app.services.dialogue_emotion_service import get_dialogue_emotion_service
-import math
+from app.services.tts_cache import TTSCache, get_tts_cache
+
+
+# MPEG audio Layer III tables, indexed by the header's version bits
+# (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5; 1 is reserved)
+_MP3_BITRATES_KBPS = {
+    "mpeg1": (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    "lsf": (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_frames(data: bytes) -> Optional[Tuple[bytes, int, int]]:
+    """
+    Walk the Layer III frame headers of an MP3 stream.
+    
+    Returns (audio frames, samples, sample rate): the frames without ID3
+    tags or a Xing/Info header frame, so streams can be joined and decoded
+    as one, and the number of samples they decode to (1152 per MPEG-1
+    frame, 576 per MPEG-2/2.5 frame). None if there are no frames or the
+    sample rate changes mid-stream.
+    """
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        pos = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    frames = []
+    samples = 0
+    sample_rate = None
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+            pos += 1
+            continue
+        version = (data[pos + 1] >> 3) & 3
+        layer = (data[pos + 1] >> 1) & 3
+        bitrate_index = data[pos + 2] >> 4
+        rate_index = (data[pos + 2] >> 2) & 3
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+        mpeg1 = version == 3
+        frame_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        bitrate = _MP3_BITRATES_KBPS["mpeg1" if mpeg1 else "lsf"][bitrate_index] * 1000
+        length = (144 if mpeg1 else 72) * bitrate // frame_rate + ((data[pos + 2] >> 1) & 1)
+        if sample_rate is None:
+            sample_rate = frame_rate
+        elif frame_rate != sample_rate:
+            return None
+        frame = data[pos:pos + length]
+        # The demuxer only drops a Xing/Info frame at the very start of a stream
+        if not (samples == 0 and (b"Xing" in frame[:40] or b"Info" in frame[:40])):
+            frames.append(frame)
+            samples += 1152 if mpeg1 else 576
+        pos += length
+    if not samples:
+        return None
+    return b"".join(frames), samples, sample_rate
 
 
 class EnhancedAudioService:
@@ -68,66 +136,138 @@ class EnhancedAudioService:
         'narrative': 1.00   # Baseline - neutral
     }
     
-    def __init__(self, output_dir: str = "static/audio"):
-        """Initialize audio service"""
+    # Edge TTS outputs 24 kHz mono; segments are decoded to this PCM format
+    SAMPLE_RATE = 24000
+    SEGMENT_GAP_MS = 100  # Tiny silence between segments for natural flow
+    OUTPUT_BITRATE = "128k"
+    
+    def __init__(
+        self,
+        output_dir: str = "static/audio",
+        communicate_cls=None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: float = 0.5,
+        tts_cache: Optional[TTSCache] = None
+    ):
+        """
+        Initialize audio service
+        
+        Args:
+            output_dir: Where final scene audio is written
+            communicate_cls: TTS client class with edge_tts.Communicate's interface
+                (inject a fake to run offline)
+            max_concurrency: Max segments synthesized at once (env TTS_MAX_CONCURRENCY)
+            max_retries: Retries per failed segment (env TTS_MAX_RETRIES)
+            retry_backoff: Base delay in seconds, doubled after every failed attempt
+            tts_cache: Segment cache (defaults to the shared disk cache)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.temp_dir = self.output_dir / "temp"
-        self.temp_dir.mkdir(exist_ok=True)
         self.dialogue_service = get_dialogue_emotion_service()
+        self.communicate_cls = communicate_cls or edge_tts.Communicate
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv("TTS_MAX_CONCURRENCY", "4")))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("TTS_MAX_RETRIES", "2"))
+        self.retry_backoff = retry_backoff
+        self.tts_cache = tts_cache or get_tts_cache()
+    
+    def select_voice(self, character: str = 'narrator', is_dialogue: bool = False) -> str:
+        """Pick the Edge TTS voice for a segment"""
+        if is_dialogue:
+            # For dialogues, use gender-appropriate voice
+            if character in self.MALE_CHARACTERS:
+                return self.VOICES['male_character']
+            elif character in self.FEMALE_CHARACTERS:
+                return self.VOICES['female_character']
+            # Default to male for unknown characters in dialogues
+            return self.VOICES['male_character']
+        # For narration, use the regular narrator voice
+        return self.VOICES['narrator']
+    
+    async def synthesize_speech(self, text: str, voice: str, rate: str, pitch: str) -> bytes:
+        """Return Edge TTS MP3 bytes for text, from the TTS cache when possible"""
+        cache_key = TTSCache.make_key(text, voice, rate, pitch)
+        cached = await asyncio.to_thread(self.tts_cache.read, cache_key)
+        if cached is not None:
+            return cached
+        
+        communicate = self.communicate_cls(text, voice, rate=rate, pitch=pitch)
+        audio = bytearray()
+        with external_call("tts"):
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    audio.extend(chunk["data"])
+            if not audio:
+                raise RuntimeError("Edge TTS returned no audio")
+        
+        audio = bytes(audio)
+        await asyncio.to_thread(self.tts_cache.write, cache_key, audio)
+        return audio
     
     async def generate_segment_audio(
         self,
         text: str,
         emotion: str,
-        segment_id: str,
         character: str = 'narrator',
         is_dialogue: bool = False
-    ) -> str:
-        """Generate audio for a single text segment"""
+    ) -> bytes:
+        """Generate MP3 audio for a single text segment (gain is applied at assembly)"""
         params = self.EMOTION_MAPPING.get(emotion, self.EMOTION_MAPPING['narrative'])
+        voice = self.select_voice(character, is_dialogue)
+        return await self.synthesize_speech(text, voice, params['rate'], params['pitch'])
+    
+    async def _generate_segment_with_retry(
+        self,
+        semaphore: asyncio.Semaphore,
+        segment: dict,
+        segment_id: str
+    ) -> bytes:
+        """Generate one segment under the concurrency limit, retrying on failure"""
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await self.generate_segment_audio(
+                        segment['text'].strip(),
+                        segment['emotion'],
+                        segment.get('character', 'narrator'),
+                        segment.get('is_dialogue', False)
+                    )
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self.retry_backoff * (2 ** attempt)
+                    print(f"    Warning: Segment {segment_id} failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+    
+    async def synthesize_segments(self, segments: list, scene_id: int) -> List[bytes]:
+        """
+        Synthesize all non-empty segments concurrently.
+        Returns MP3 bytes in the original segment order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = []
+        for i, segment in enumerate(segments):
+            if not segment['text'].strip():
+                continue
+            
+            segment_id = f"{scene_id}_{i}"
+            
+            # Debug output
+            dialogue_mark = "🗣️" if segment.get('is_dialogue', False) else "📖"
+            print(f"    {dialogue_mark} Segment {i+1}: {segment['emotion']} ({segment.get('character', 'narrator')})")
+            
+            tasks.append(asyncio.create_task(
+                self._generate_segment_with_retry(semaphore, segment, segment_id)
+            ))
         
-        # Select appropriate voice based on character and context
-        if is_dialogue:
-            # For dialogues, use gender-appropriate voice
-            if character in self.MALE_CHARACTERS:
-                voice = self.VOICES['male_character']
-            elif character in self.FEMALE_CHARACTERS:
-                voice = self.VOICES['female_character']
-            else:
-                # Default to male for unknown characters in dialogues
-                voice = self.VOICES['male_character']
-        else:
-            # For narration, use the regular narrator voice
-            voice = self.VOICES['narrator']
-        
-        # Create temp filename
-        temp_filename = f"seg_{segment_id}.mp3"
-        temp_filepath = self.temp_dir / temp_filename
-        
-        # Generate audio using Edge TTS
-        communicate = edge_tts.Communicate(
-            text,
-            voice,
-            rate=params['rate'],
-            pitch=params['pitch']
-        )
-        
-        await communicate.save(str(temp_filepath))
-        
-        # Apply volume adjustment based on emotion
-        volume_multiplier = self.VOLUME_MAPPING.get(emotion, 1.0)
-        if volume_multiplier != 1.0:
-            try:
-                audio = AudioSegment.from_mp3(str(temp_filepath))
-                # Convert multiplier to dB: dB = 20 * log10(multiplier)
-                db_change = 20 * math.log10(volume_multiplier)
-                adjusted_audio = audio + db_change
-                adjusted_audio.export(str(temp_filepath), format="mp3", bitrate="128k")
-            except Exception as e:
-                print(f"    Warning: Could not apply volume adjustment: {e}")
-        
-        return str(temp_filepath)
+        try:
+            return list(await asyncio.gather(*tasks))
+        except Exception:
+            # One segment gave up: stop the rest
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
     
     async def generate_multi_segment_audio(
         self,
@@ -151,64 +291,151 @@ class EnhancedAudioService:
         if len(segments) <= 1:
             return await self.generate_simple_audio(scene_text, scene_id, 'narrative')
         
-        print(f"  Generating {len(segments)} segments...")
+        segments = [s for s in segments if s['text'].strip()]
+        print(f"  Generating {len(segments)} segments (up to {self.max_concurrency} at once)...")
         
-        # Generate audio for each segment
-        segment_files = []
-        for i, segment in enumerate(segments):
-            segment_text = segment['text'].strip()
-            if not segment_text:
-                continue
-            
-            emotion = segment['emotion']
-            character = segment.get('character', 'narrator')
-            is_dialogue = segment.get('is_dialogue', False)
-            segment_id = f"{scene_id}_{i}_{uuid.uuid4().hex[:4]}"
-            
-            # Debug output
-            dialogue_mark = "🗣️" if is_dialogue else "📖"
-            print(f"    {dialogue_mark} Segment {i+1}: {emotion} ({character})")
-            
-            audio_file = await self.generate_segment_audio(
-                segment_text,
-                emotion,
-                segment_id,
-                character,
-                is_dialogue
-            )
-            segment_files.append(audio_file)
+        # Generate audio for all segments concurrently, keeping their order
+        segment_audio = await self.synthesize_segments(segments, scene_id)
+        gains = [self.VOLUME_MAPPING.get(s['emotion'], 1.0) for s in segments]
+        
+        # Decode, mix and encode once
+        return await self.concatenate_audio_segments(segment_audio, scene_id, gains)
+    
+    def _ffmpeg(self, args: list, data: bytes) -> bytes:
+        """Run ffmpeg with data on stdin and return stdout"""
+        result = subprocess.run(
+            [AudioSegment.converter, "-hide_banner", "-loglevel", "error", *args],
+            input=data,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace')[-300:]}")
+        return result.stdout
+    
+    def decode_to_pcm(self, mp3_bytes: bytes) -> np.ndarray:
+        """Decode MP3 bytes to mono int16 PCM at SAMPLE_RATE, entirely in memory"""
+        raw = self._ffmpeg(
+            ["-i", "pipe:0", "-f", "s16le", "-acodec", "pcm_s16le",
+             "-ac", "1", "-ar", str(self.SAMPLE_RATE), "pipe:1"],
+            mp3_bytes
+        )
+        return np.frombuffer(raw, dtype=np.int16)
+    
+    def encode_mp3(self, pcm: np.ndarray) -> bytes:
+        """Encode mono int16 PCM to MP3 bytes"""
+        return self._ffmpeg(
+            ["-f", "s16le", "-ar", str(self.SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+             "-b:a", self.OUTPUT_BITRATE, "-f", "mp3", "pipe:1"],
+            pcm.tobytes()
+        )
+    
+    def mix_segments(self, pcm_segments: List[np.ndarray], gains: List[float]) -> np.ndarray:
+        """
+        Join PCM segments with a short gap after each one and apply every
+        segment's gain in a single vectorized multiply.
+        """
+        gap = np.zeros(self.SAMPLE_RATE * self.SEGMENT_GAP_MS // 1000, dtype=np.int16)
+        pieces = []
+        lengths = []
+        for pcm in pcm_segments:
+            pieces.extend((pcm, gap))
+            lengths.append(len(pcm) + len(gap))
+        if not pieces:
+            return np.zeros(0, dtype=np.int16)
+        
+        gain_per_sample = np.repeat(np.asarray(gains, dtype=np.float32), lengths)
+        mixed = np.concatenate(pieces).astype(np.float32) * gain_per_sample
+        return np.clip(np.rint(mixed), -32768, 32767).astype(np.int16)
+    
+    def decode_segments(
+        self,
+        segment_audio: List[bytes],
+        gains: List[float]
+    ) -> Optional[Tuple[List[np.ndarray], List[float]]]:
+        """
+        Decode every segment with a single ffmpeg run: join their MP3 frames,
+        decode once and split the PCM back at each segment's frame count.
         
-        # Concatenate all segments
-        final_path = await self.concatenate_audio_segments(segment_files, scene_id)
+        Segments without MP3 frames are dropped with their gain. Returns None
+        when the joined stream can't be split reliably (mixed sample rates,
+        decode error or an unexpected length), so the caller can fall back to
+        decoding segments one by one.
+        """
+        parsed, kept_gains = [], []
+        for i, (audio, gain) in enumerate(zip(segment_audio, gains)):
+            frames = mp3_frames(audio)
+            if frames is None:
+                print(f"  Warning: Could not decode segment {i + 1}: no MP3 frames")
+                continue
+            parsed.append(frames)
+            kept_gains.append(gain)
+        if not parsed:
+            return [], []
+        if len({sample_rate for _, _, sample_rate in parsed}) != 1:
+            return None
         
-        # Cleanup temp files
-        for temp_file in segment_files:
-            try:
-                os.remove(temp_file)
-            except:
-                pass
+        try:
+            pcm = self.decode_to_pcm(b"".join(frames for frames, _, _ in parsed))
+        except RuntimeError as e:
+            print(f"  Warning: Joined segment decode failed, decoding separately: {e}")
+            return None
         
-        return final_path
+        source_samples = np.cumsum([samples for _, samples, _ in parsed])
+        ratio = self.SAMPLE_RATE / parsed[0][2]
+        # Resampling may shift the total by a few samples; a frame or more means the split is off
+        if abs(len(pcm) - source_samples[-1] * ratio) > 1152 * ratio:
+            print(f"  Warning: Joined segments decoded to {len(pcm)} samples, "
+                  f"expected {source_samples[-1] * ratio:.0f}; decoding separately")
+            return None
+        boundaries = np.rint(source_samples[:-1] * len(pcm) / source_samples[-1]).astype(np.int64)
+        return np.split(pcm, boundaries), kept_gains
     
-    async def concatenate_audio_segments(self, segment_files: list, scene_id: int) -> str:
-        """Concatenate multiple audio segments into one file"""
-        combined = AudioSegment.empty()
+    async def _decode_segments_separately(
+        self,
+        segment_audio: List[bytes],
+        gains: List[float]
+    ) -> Tuple[List[np.ndarray], List[float]]:
+        """One ffmpeg process per segment, at most max_concurrency at a time"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def decode(audio: bytes) -> np.ndarray:
+            async with semaphore:
+                return await asyncio.to_thread(self.decode_to_pcm, audio)
         
-        for audio_file in segment_files:
-            try:
-                segment = AudioSegment.from_mp3(audio_file)
-                # Add tiny silence between segments for natural flow (100ms)
-                silence = AudioSegment.silent(duration=100)
-                combined += segment + silence
-            except Exception as e:
-                print(f"  Warning: Could not load segment {audio_file}: {e}")
+        results = await asyncio.gather(*[decode(audio) for audio in segment_audio], return_exceptions=True)
+        pcm_segments, kept_gains = [], []
+        for i, (pcm, gain) in enumerate(zip(results, gains)):
+            if isinstance(pcm, Exception):
+                print(f"  Warning: Could not decode segment {i + 1}: {pcm}")
                 continue
+            pcm_segments.append(pcm)
+            kept_gains.append(gain)
+        return pcm_segments, kept_gains
+    
+    async def concatenate_audio_segments(
+        self,
+        segment_audio: List[bytes],
+        scene_id: int,
+        gains: Optional[List[float]] = None
+    ) -> str:
+        """Concatenate multiple MP3 segments (with optional per-segment gain) into one file"""
+        if gains is None:
+            gains = [1.0] * len(segment_audio)
+        
+        decoded = await asyncio.to_thread(self.decode_segments, segment_audio, gains)
+        if decoded is None:
+            decoded = await self._decode_segments_separately(segment_audio, gains)
+        pcm_segments, kept_gains = decoded
+        
+        mixed = self.mix_segments(pcm_segments, kept_gains)
+        mp3_bytes = await asyncio.to_thread(self.encode_mp3, mixed)
         
         # Export final file
         filename = f"scene_{scene_id}_{uuid.uuid4().hex[:8]}.mp3"
         filepath = self.output_dir / filename
-        
-        combined.export(str(filepath), format="mp3", bitrate="128k")
+        await asyncio.to_thread(filepath.write_bytes, mp3_bytes)
         
         return f"/static/audio/{filename}"
     
@@ -227,14 +454,9 @@ class EnhancedAudioService:
         filename = f"scene_{scene_id}_{uuid.uuid4().hex[:8]}.mp3"
         filepath = self.output_dir / filename
         
-        communicate = edge_tts.Communicate(
-            text,
-            voice,
-            rate=params['rate'],
-            pitch=params['pitch']
-        )
-        
-        await communicate.save(str(filepath))
+        # Edge TTS output is written as-is: no decode or re-encode needed
+        audio = await self.synthesize_speech(text, voice, params['rate'], params['pitch'])
+        await asyncio.to_thread(filepath.write_bytes, audio)
         
         return f"/static/audio/{filename}"
     
@@ -9,6 +9,8 @@ import logging
 from typing import Optional
 import requests
 
+from app.metrics import external_call
+
 logger = logging.getLogger(__name__)
 
 class FastVideoService:
@@ -87,8 +89,9 @@ class FastVideoService:
             f"&nologo=true"
         )
         
-        response = requests.get(image_url, timeout=60)
-        response.raise_for_status()
+        with external_call("image"):
+            response = requests.get(image_url, timeout=60)
+            response.raise_for_status()
         
         # Save image
         filename = f"scene_{scene_id or 'temp'}_fast.jpg"
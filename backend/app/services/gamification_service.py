@@ -1,12 +1,26 @@
 """
 Gamification logic: XP, streaks, badges.
 Functions operate using DB session from sqlmodel.
+
+Story completion is tracked incrementally in UserStoryProgress: each newly
+completed scene bumps its story's counter, and the story is marked complete
+once the counter reaches Story.total_scenes.
+
+Badges are declared as rules over a per-user progress snapshot. The badge
+catalog is cached in-process (cleared whenever a Badge row changes), so
+evaluating every rule costs one query for the user's completed stories and
+one for their earned badges, and awards are written in the caller's single
+commit.
 """
 
+import threading
+from dataclasses import dataclass
+from sqlalchemy import delete, event, func, insert
+from sqlalchemy.orm import Session as SASession
 from sqlmodel import select
-from datetime import datetime, date, timedelta
-from typing import List
-from app.models import User, UserSceneProgress, Badge, UserBadge, Story, Chapter, Scene
+from datetime import datetime, date, timedelta, timezone
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from app.models import User, UserSceneProgress, UserStoryProgress, Badge, UserBadge, Story, Chapter, Scene
 
 SCENE_XP = 25 # Increased for better progression feel
 
@@ -15,23 +29,132 @@ BADGE_EXPLORER = "story_explorer"
 BADGE_READER = "devoted_reader"
 BADGE_SCHOLAR = "cultural_scholar"
 BADGE_MASTER = "master_storyteller"
+# Badge Codes matching seed_service.DEFAULT_BADGES
+BADGE_FIRST_SCENE = "FIRST_SCENE"
+BADGE_RAMAYANA_COMPLETE = "RAMAYANA_COMPLETE"
+
+RAMAYANA_SLUG = "ramayana-epic"
+
+
+@dataclass(frozen=True)
+class BadgeProgress:
+    """What badge rules are evaluated against"""
+    scenes_completed: int
+    completed_stories: FrozenSet[str]  # story slugs
+    streak_days: int
+
+    @property
+    def stories_completed(self) -> int:
+        return len(self.completed_stories)
+
+    @classmethod
+    def for_user(cls, session, user: User) -> "BadgeProgress":
+        # Autoflushes, so stories completed in this transaction count
+        completed_stories = frozenset(session.exec(
+            select(Story.slug)
+            .join(UserStoryProgress, UserStoryProgress.story_id == Story.id)
+            .where(UserStoryProgress.user_id == user.id, UserStoryProgress.completed == True)
+        ).all())
+        return cls(
+            scenes_completed=user.stories_read,
+            completed_stories=completed_stories,
+            streak_days=user.current_streak_days
+        )
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    code: str
+    condition: Callable[[BadgeProgress], bool]
+
+
+BADGE_RULES: List[BadgeRule] = [
+    # FIRST_SCENE / STORY_EXPLORER: Read first story (or 1 scene)
+    BadgeRule(BADGE_FIRST_SCENE, lambda p: p.scenes_completed >= 1),
+    BadgeRule(BADGE_EXPLORER, lambda p: p.scenes_completed >= 1),
+    # DEVOTED_READER: Read 5 stories
+    BadgeRule(BADGE_READER, lambda p: p.stories_completed >= 5),
+    # CULTURAL_SCHOLAR: Read 10 stories
+    BadgeRule(BADGE_SCHOLAR, lambda p: p.stories_completed >= 10),
+    # MASTER_STORYTELLER: Read all (placeholder 20)
+    BadgeRule(BADGE_MASTER, lambda p: p.stories_completed >= 20),
+    # RAMAYANA_COMPLETE: Complete all scenes in the Ramayana
+    BadgeRule(BADGE_RAMAYANA_COMPLETE, lambda p: RAMAYANA_SLUG in p.completed_stories),
+]
+
+
+class BadgeCatalog:
+    """In-process cache of the Badge table as {code: badge dict}"""
+
+    def __init__(self):
+        self._badges: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def get(self, session) -> Dict[str, dict]:
+        badges = self._badges
+        if badges is None:
+            badges = {
+                badge.code: {
+                    "id": badge.id,
+                    "code": badge.code,
+                    "name": badge.name,
+                    "description": badge.description,
+                    "icon_url": badge.icon_url
+                }
+                for badge in session.exec(select(Badge)).all()
+            }
+            with self._lock:
+                self._badges = badges
+        return badges
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._badges = None
+
+
+# Singleton instance
+badge_catalog = BadgeCatalog()
+
+
+@event.listens_for(SASession, "after_flush")
+def _invalidate_badge_catalog(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Badge):
+            badge_catalog.invalidate()
+            return
+
 
 def complete_scene(session, user_id: int, scene_id: int) -> dict:
     """
     Mark a scene completed for a user, award XP if first time,
     update streaks and badges. Returns update summary.
+    Issues a fixed number of queries and commits once.
     """
     user = session.get(User, user_id)
     if not user:
         raise ValueError("User not found")
 
-    scene = session.get(Scene, scene_id)
-    if not scene:
+    scene_story = session.exec(
+        select(Chapter.story_id, Story.total_scenes)
+        .join(Scene, Scene.chapter_id == Chapter.id)
+        .join(Story, Chapter.story_id == Story.id)
+        .where(Scene.id == scene_id)
+    ).first()
+    if not scene_story:
         raise ValueError("Scene not found")
+    story_id, total_scenes = scene_story
 
     stmt = select(UserSceneProgress).where(UserSceneProgress.user_id == user_id, UserSceneProgress.scene_id == scene_id)
     progress = session.exec(stmt).first()
-    newly_earned_badges = []
+
+    newly_completed = not progress or not progress.completed
+    if newly_completed:
+        story_progress = session.exec(
+            select(UserStoryProgress).where(
+                UserStoryProgress.user_id == user_id,
+                UserStoryProgress.story_id == story_id
+            )
+        ).first()
 
     now = datetime.utcnow()
     today = date.today()
@@ -49,80 +172,261 @@ def complete_scene(session, user_id: int, scene_id: int) -> dict:
             user.total_xp += SCENE_XP
             user.stories_read += 1
 
-    # Streak logic
+    if newly_completed:
+        if not story_progress:
+            story_progress = UserStoryProgress(user_id=user_id, story_id=story_id)
+        _count_story_scene(story_progress, total_scenes, now)
+        session.add(story_progress)
+
+    apply_streak(user, today)
+    session.add(user)
+
+    # Evaluate badges
+    newly_earned_badges = [
+        {
+            "code": badge["code"],
+            "name": badge["name"],
+            "description": badge["description"],
+            "icon_url": badge["icon_url"]
+        }
+        for badge in award_badges(session, user)
+    ]
+
+    # Read before commit expires the instance
+    summary = {
+        "status": "success",
+        "xp_added": SCENE_XP,
+        "total_xp": user.total_xp,
+        "current_streak_days": user.current_streak_days,
+        "new_badges": newly_earned_badges,
+    }
+
+    session.commit()
+
+    return summary
+
+def apply_streak(user: User, day: date) -> None:
+    """Advance the user's streak for activity on `day`. Days before the last
+    active date (late offline replays) leave the streak unchanged."""
     last_active = user.last_active_date
     if last_active is None:
         user.current_streak_days = 1
     else:
-        if last_active == today - timedelta(days=1):
+        if last_active == day - timedelta(days=1):
             user.current_streak_days += 1
-        elif last_active == today:
-            pass
+        elif last_active >= day:
+            return
         else:
             user.current_streak_days = 1
-    user.last_active_date = today
+    user.last_active_date = day
     if user.current_streak_days > user.longest_streak_days:
         user.longest_streak_days = user.current_streak_days
 
-    session.add(user)
-    session.commit()
+def sync_scene_progress(session, user_id: int, events: List[Tuple[int, Optional[datetime]]]) -> dict:
+    """
+    Apply a batch of offline (scene_id, completed_at) events for a user.
+    Events are replayed in timestamp order so XP and streaks come out as if
+    each scene had been completed online. Scenes already completed (before or
+    earlier in the batch) and unknown scenes are skipped. Existing scene
+    progress and story progress are loaded in one query each, new rows are
+    inserted in one statement, badges are evaluated once and the batch
+    commits once.
+    """
+    user = session.get(User, user_id)
+    if not user:
+        raise ValueError("User not found")
 
-    # Evaluate badges
-    newly_codes = evaluate_badges_for_user(session, user_id)
-    for code in newly_codes:
-        badge = session.exec(select(Badge).where(Badge.code == code)).first()
-        if badge:
-            newly_earned_badges.append({
-                "code": badge.code, 
-                "name": badge.name, 
-                "description": badge.description, 
-                "icon_url": badge.icon_url
+    now = datetime.utcnow()
+    ordered = sorted(
+        ((scene_id, _as_utc(completed_at, now)) for scene_id, completed_at in events),
+        key=lambda event: event[1]
+    )
+    scene_ids = {scene_id for scene_id, _ in ordered}
+
+    with session.no_autoflush:
+        scene_stories = {
+            scene_id: (story_id, total_scenes)
+            for scene_id, story_id, total_scenes in session.exec(
+                select(Scene.id, Chapter.story_id, Story.total_scenes)
+                .join(Chapter, Scene.chapter_id == Chapter.id)
+                .join(Story, Chapter.story_id == Story.id)
+                .where(Scene.id.in_(scene_ids))
+            ).all()
+        } if scene_ids else {}
+        known = set(scene_stories)
+        story_ids = {story_id for story_id, _ in scene_stories.values()}
+        story_progress_by_story = {
+            story_progress.story_id: story_progress
+            for story_progress in session.exec(
+                select(UserStoryProgress).where(
+                    UserStoryProgress.user_id == user_id,
+                    UserStoryProgress.story_id.in_(story_ids)
+                )
+            ).all()
+        } if story_ids else {}
+        progress_by_scene = {
+            progress.scene_id: progress
+            for progress in session.exec(
+                select(UserSceneProgress).where(
+                    UserSceneProgress.user_id == user_id,
+                    UserSceneProgress.scene_id.in_(known)
+                )
+            ).all()
+        } if known else {}
+
+    applied: List[int] = []
+    duplicates: List[int] = []
+    unknown: List[int] = []
+    new_rows: List[dict] = []
+    for scene_id, completed_at in ordered:
+        if scene_id not in known:
+            if scene_id not in unknown:
+                unknown.append(scene_id)
+            continue
+        progress = progress_by_scene.get(scene_id)
+        if scene_id in applied or (progress is not None and progress.completed):
+            duplicates.append(scene_id)
+            continue
+        if progress is None:
+            new_rows.append({
+                "user_id": user_id,
+                "scene_id": scene_id,
+                "completed": True,
+                "completed_at": completed_at,
+                "xp_earned": SCENE_XP
             })
+        else:
+            progress.completed = True
+            progress.completed_at = completed_at
+            progress.xp_earned = SCENE_XP
+            session.add(progress)
+        user.total_xp += SCENE_XP
+        user.stories_read += 1
+        apply_streak(user, completed_at.date())
+        story_id, total_scenes = scene_stories[scene_id]
+        story_progress = story_progress_by_story.get(story_id)
+        if story_progress is None:
+            story_progress = UserStoryProgress(user_id=user_id, story_id=story_id)
+            story_progress_by_story[story_id] = story_progress
+        _count_story_scene(story_progress, total_scenes, completed_at)
+        session.add(story_progress)
+        applied.append(scene_id)
 
-    session.commit()
+    if new_rows:
+        session.exec(insert(UserSceneProgress).values(new_rows))
+    session.add(user)
+
+    newly_earned_badges = [
+        {
+            "code": badge["code"],
+            "name": badge["name"],
+            "description": badge["description"],
+            "icon_url": badge["icon_url"]
+        }
+        for badge in (award_badges(session, user) if applied else [])
+    ]
 
-    return {
+    # Read before commit expires the instance
+    summary = {
         "status": "success",
-        "xp_added": SCENE_XP,
+        "applied": applied,
+        "duplicates": duplicates,
+        "unknown_scenes": unknown,
+        "xp_added": SCENE_XP * len(applied),
         "total_xp": user.total_xp,
         "current_streak_days": user.current_streak_days,
         "new_badges": newly_earned_badges,
     }
 
-def evaluate_badges_for_user(session, user_id: int) -> List[str]:
-    newly_awarded = []
-    
-    def has_badge(code: str) -> bool:
-        stmt = select(UserBadge).join(Badge).where(UserBadge.user_id == user_id, Badge.code == code)
-        return session.exec(stmt).first() is not None
-
-    # Helper to award
-    def award(code: str):
-        badge = session.exec(select(Badge).where(Badge.code == code)).first()
-        if badge:
-            session.add(UserBadge(user_id=user_id, badge_id=badge.id))
-            newly_awarded.append(code)
-
-    # Count completed stories
-    # A story is completed if all its scenes are completed
-    # For MVP, we can just use stories_read count if we don't want to do full DB join
-    user = session.get(User, user_id)
-    stories_completed = user.stories_read // 3 # approx 3 scenes per story in our seed
+    session.commit()
 
-    # STORY_EXPLORER: Read first story (or 1 scene)
-    if not has_badge(BADGE_EXPLORER) and user.stories_read >= 1:
-        award(BADGE_EXPLORER)
+    return summary
 
-    # DEVOTED_READER: Read 5 stories
-    if not has_badge(BADGE_READER) and stories_completed >= 5:
-        award(BADGE_READER)
+def _count_story_scene(story_progress: UserStoryProgress, total_scenes: int, completed_at: datetime) -> None:
+    """Count one newly completed scene towards its story"""
+    story_progress.scenes_completed += 1
+    if not story_progress.completed and total_scenes and story_progress.scenes_completed >= total_scenes:
+        story_progress.completed = True
+        story_progress.completed_at = completed_at
 
-    # CULTURAL_SCHOLAR: Read 10 stories
-    if not has_badge(BADGE_SCHOLAR) and stories_completed >= 10:
-        award(BADGE_SCHOLAR)
+def rebuild_story_progress(session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute UserStoryProgress from UserSceneProgress for one user (or all),
+    e.g. after a reseed changes Story.total_scenes or for progress recorded
+    before story tracking existed. Commits. Returns the number of rows written.
+    """
+    stmt = (
+        select(
+            UserSceneProgress.user_id,
+            Chapter.story_id,
+            func.count(UserSceneProgress.id),
+            func.max(UserSceneProgress.completed_at),
+            Story.total_scenes
+        )
+        .join(Scene, UserSceneProgress.scene_id == Scene.id)
+        .join(Chapter, Scene.chapter_id == Chapter.id)
+        .join(Story, Chapter.story_id == Story.id)
+        .where(UserSceneProgress.completed == True)
+        .group_by(UserSceneProgress.user_id, Chapter.story_id, Story.total_scenes)
+    )
+    clear = delete(UserStoryProgress)
+    if user_id is not None:
+        stmt = stmt.where(UserSceneProgress.user_id == user_id)
+        clear = clear.where(UserStoryProgress.user_id == user_id)
 
-    # MASTER_STORYTELLER: Read all (placeholder 20)
-    if not has_badge(BADGE_MASTER) and stories_completed >= 20:
-        award(BADGE_MASTER)
+    rows = [
+        {
+            "user_id": row_user_id,
+            "story_id": story_id,
+            "scenes_completed": scenes_completed,
+            "completed": bool(total_scenes) and scenes_completed >= total_scenes,
+            "completed_at": last_completed_at if total_scenes and scenes_completed >= total_scenes else None
+        }
+        for row_user_id, story_id, scenes_completed, last_completed_at, total_scenes in session.exec(stmt).all()
+    ]
+    session.exec(clear)
+    if rows:
+        session.exec(insert(UserStoryProgress).values(rows))
+    session.commit()
+    return len(rows)
 
-    return newly_awarded
+def _as_utc(completed_at: Optional[datetime], now: datetime) -> datetime:
+    """Normalize a client timestamp to naive UTC, clamped to `now`"""
+    if completed_at is None:
+        return now
+    if completed_at.tzinfo is not None:
+        completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(completed_at, now)
+
+def award_badges(session, user: User) -> List[dict]:
+    """
+    Evaluate BADGE_RULES for a user and insert UserBadge rows for newly met
+    rules in one statement. Does not commit. Returns the awarded catalog entries.
+    """
+    catalog = badge_catalog.get(session)
+    progress = BadgeProgress.for_user(session, user)
+
+    earned = set(session.exec(
+        select(UserBadge.badge_id).where(UserBadge.user_id == user.id)
+    ).all())
+
+    awarded = [
+        catalog[rule.code]
+        for rule in BADGE_RULES
+        if rule.code in catalog
+        and catalog[rule.code]["id"] not in earned
+        and rule.condition(progress)
+    ]
+    if awarded:
+        now = datetime.utcnow()
+        session.exec(insert(UserBadge).values([
+            {"user_id": user.id, "badge_id": badge["id"], "earned_at": now}
+            for badge in awarded
+        ]))
+    return awarded
+
+def evaluate_badges_for_user(session, user_id: int) -> List[str]:
+    user = session.get(User, user_id)
+    if not user:
+        return []
+    return [badge["code"] for badge in award_badges(session, user)]
@@ -0,0 +1,550 @@
+"""
+Background Job Service
+
+Runs slow generation work (Edge TTS audio, Pollinations/SVD video) outside
+the HTTP request. Jobs live in the GenerationJob table, so they survive
+restarts and are visible to every API worker process:
+
+- enqueue: one active job per (kind, target, params); duplicates share it
+- claim: an atomic UPDATE ... WHERE status='queued' hands a job to exactly
+  one worker, which holds a renewable lease while it runs
+- recovery: jobs whose lease expired (crashed worker) are re-queued
+- cancel: queued jobs are dropped, running jobs are interrupted at their
+  next await point
+
+Blocking, requests-based services are run in worker threads so the event
+loop keeps serving other users while generation runs.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.metrics import JOB_DURATION, JOBS_IN_PROGRESS
+from app.models import GenerationJob, Scene, Chapter
+from app.schemas import JobOut
+from app.services.single_flight import single_flight
+
+logger = logging.getLogger("katha.jobs")
+
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+JobHandler = Callable[[GenerationJob, dict], Awaitable[dict]]
+
+
+class JobQueue:
+    """SQLite-backed job queue with an in-process asyncio worker pool"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        poll_interval: float = 2.0,
+        max_attempts: int = 3,
+        request_wait_seconds: Optional[float] = None
+    ):
+        self.worker_count = max(1, workers or int(os.getenv("JOB_WORKERS", "2")))
+        self.lease_seconds = lease_seconds or int(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        # How long a synchronous (background=false) endpoint holds the request
+        # before answering 202 with the job to poll
+        self.request_wait_seconds = (request_wait_seconds if request_wait_seconds is not None
+                                     else float(os.getenv("JOB_WAIT_SECONDS", "25")))
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[int, asyncio.Task] = {}
+        self._done_events: Dict[int, asyncio.Event] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    # ------------------------------------------------------------------
+    # Registration / lifecycle
+    # ------------------------------------------------------------------
+
+    def handler(self, kind: str):
+        """Decorator registering the coroutine that runs jobs of this kind"""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    async def start(self) -> None:
+        """Start the worker pool (called from the app lifespan)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"job-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"Job workers started ({self.worker_count} workers, id {self.worker_id})")
+
+    async def stop(self) -> None:
+        """Stop workers; jobs interrupted by shutdown go back to the queue"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def dedupe_key(kind: str, target_id: int, params: dict) -> str:
+        return f"{kind}:{target_id}:{json.dumps(params, sort_keys=True)}"
+
+    async def enqueue(self, kind: str, target_id: int, params: Optional[dict] = None) -> GenerationJob:
+        """
+        Queue a job, or return the already active job for the same
+        (kind, target_id, params).
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = await asyncio.to_thread(self._enqueue_sync, kind, target_id, params or {})
+        self._notify()
+        return job
+
+    async def get(self, job_id: int) -> Optional[GenerationJob]:
+        return await asyncio.to_thread(self._get_sync, job_id)
+
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[GenerationJob]:
+        return await asyncio.to_thread(self._list_sync, status, limit)
+
+    async def cancel(self, job_id: int) -> Optional[GenerationJob]:
+        """Cancel a queued job, or interrupt a running one"""
+        job = await asyncio.to_thread(self._cancel_sync, job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    async def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[GenerationJob]:
+        """Wait until a job reaches a final status (or timeout) and return it"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        try:
+            while True:
+                job = await self.get(job_id)
+                if job is None or job.status in FINAL_STATUSES:
+                    return job
+                wait_for = self.poll_interval
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        return job
+                    wait_for = min(wait_for, remaining)
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait_for)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Jobs finished by another process never set the event: drop it on
+            # every exit (other local waiters of the job fall back to polling)
+            if self._done_events.get(job_id) is event:
+                del self._done_events[job_id]
+
+    @staticmethod
+    def to_out(job: GenerationJob) -> JobOut:
+        return JobOut(
+            id=job.id,
+            kind=job.kind,
+            target_id=job.target_id,
+            params=json.loads(job.params_json or "{}"),
+            status=job.status,
+            cancel_requested=job.cancel_requested,
+            attempts=job.attempts,
+            result=json.loads(job.result_json) if job.result_json else None,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at
+        )
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    async def _worker_loop(self) -> None:
+        while not self._stopping:
+            try:
+                self._wakeup.clear()
+                job = await self._claim_next()
+                if job is not None:
+                    await self._execute(job)
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim_next(self) -> Optional[GenerationJob]:
+        claim = asyncio.ensure_future(asyncio.to_thread(self._claim_next_sync))
+        try:
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            # Shutdown mid-claim: the thread may already have taken a job
+            job = await claim
+            if job is not None:
+                await asyncio.to_thread(self._release_sync, job.id)
+            raise
+
+    async def _execute(self, job: GenerationJob) -> None:
+        handler = self._handlers.get(job.kind)
+        params = json.loads(job.params_json or "{}")
+        logger.info(f"Job {job.id} started: {job.kind} #{job.target_id}")
+
+        task = asyncio.create_task(handler(job, params))
+        self._running[job.id] = task
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, task))
+        status, result, error = "failed", None, None
+        started = time.perf_counter()
+        JOBS_IN_PROGRESS.inc(kind=job.kind)
+        try:
+            result = await task
+            status = "succeeded"
+        except asyncio.CancelledError:
+            if self._stopping:
+                # Shutdown, not a user cancel: let the next worker pick it up
+                status = "released"
+                await asyncio.to_thread(self._release_sync, job.id)
+                raise
+            status, error = "cancelled", "Cancelled by request"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            error = str(e)
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job.id, None)
+            JOBS_IN_PROGRESS.dec(kind=job.kind)
+            JOB_DURATION.observe(time.perf_counter() - started, kind=job.kind, status=status)
+
+        await asyncio.to_thread(self._finish_sync, job.id, status, result, error)
+        logger.info(f"Job {job.id} {status}")
+        event = self._done_events.pop(job.id, None)
+        if event is not None:
+            event.set()
+
+    async def _heartbeat(self, job_id: int, task: asyncio.Task) -> None:
+        """
+        Renew the lease and pick up cancel requests made by other processes.
+        The first check runs immediately, catching a cancel that arrived
+        between the claim and the task being registered in _running.
+        """
+        while not task.done():
+            cancel_requested = await asyncio.to_thread(self._renew_lease_sync, job_id)
+            if cancel_requested:
+                task.cancel()
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    # ------------------------------------------------------------------
+    # DB operations (run in worker threads)
+    # ------------------------------------------------------------------
+
+    def _enqueue_sync(self, kind: str, target_id: int, params: dict) -> GenerationJob:
+        key = self.dedupe_key(kind, target_id, params)
+        with Session(engine) as session:
+            existing = self._active_by_key(session, key)
+            if existing:
+                return existing
+
+            job = GenerationJob(
+                kind=kind,
+                target_id=target_id,
+                params_json=json.dumps(params, sort_keys=True),
+                dedupe_key=key
+            )
+            session.add(job)
+            try:
+                session.commit()
+            except IntegrityError:
+                # Lost the race against an identical submission
+                session.rollback()
+                existing = self._active_by_key(session, key)
+                if existing:
+                    return existing
+                raise
+            session.refresh(job)
+            return job
+
+    @staticmethod
+    def _active_by_key(session: Session, key: str) -> Optional[GenerationJob]:
+        return session.exec(
+            select(GenerationJob).where(
+                GenerationJob.dedupe_key == key,
+                GenerationJob.status.in_(ACTIVE_STATUSES)
+            )
+        ).first()
+
+    def _get_sync(self, job_id: int) -> Optional[GenerationJob]:
+        with Session(engine) as session:
+            return session.get(GenerationJob, job_id)
+
+    def _list_sync(self, status: Optional[str], limit: int) -> List[GenerationJob]:
+        with Session(engine) as session:
+            query = select(GenerationJob).order_by(GenerationJob.id.desc()).limit(limit)
+            if status:
+                query = query.where(GenerationJob.status == status)
+            return list(session.exec(query).all())
+
+    def _cancel_sync(self, job_id: int) -> Optional[GenerationJob]:
+        with Session(engine) as session:
+            job = session.get(GenerationJob, job_id)
+            if job is None:
+                return None
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.error = "Cancelled by request"
+                job.finished_at = datetime.utcnow()
+            elif job.status == "running":
+                job.cancel_requested = True
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    def _claim_next_sync(self) -> Optional[GenerationJob]:
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            self._recover_expired(session, now)
+            for _ in range(5):
+                candidate = session.exec(
+                    select(GenerationJob.id)
+                    .where(GenerationJob.status == "queued")
+                    .order_by(GenerationJob.id)
+                    .limit(1)
+                ).first()
+                if candidate is None:
+                    return None
+                claimed = session.exec(
+                    update(GenerationJob)
+                    .where(GenerationJob.id == candidate, GenerationJob.status == "queued")
+                    .values(
+                        status="running",
+                        worker_id=self.worker_id,
+                        started_at=now,
+                        lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        attempts=GenerationJob.attempts + 1
+                    )
+                )
+                session.commit()
+                if claimed.rowcount == 1:
+                    return session.get(GenerationJob, candidate)
+            return None
+
+    def _recover_expired(self, session: Session, now: datetime) -> None:
+        expired = session.exec(
+            select(GenerationJob).where(
+                GenerationJob.status == "running",
+                GenerationJob.lease_expires_at < now
+            )
+        ).all()
+        for job in expired:
+            if job.cancel_requested:
+                job.status, job.error = "cancelled", "Cancelled by request"
+                job.finished_at = now
+            elif job.attempts >= self.max_attempts:
+                job.status, job.error = "failed", "Worker lease expired too many times"
+                job.finished_at = now
+            else:
+                logger.warning(f"Re-queueing job {job.id} after its worker lease expired")
+                job.status = "queued"
+            job.worker_id = None
+            job.lease_expires_at = None
+            session.add(job)
+        if expired:
+            session.commit()
+
+    def _renew_lease_sync(self, job_id: int) -> bool:
+        with Session(engine) as session:
+            job = session.get(GenerationJob, job_id)
+            if job is None or job.status != "running":
+                return False
+            job.lease_expires_at = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+            session.add(job)
+            session.commit()
+            return job.cancel_requested
+
+    def _release_sync(self, job_id: int) -> None:
+        with Session(engine) as session:
+            job = session.get(GenerationJob, job_id)
+            if job is not None and job.status == "running":
+                job.status = "queued"
+                job.attempts = max(0, job.attempts - 1)
+                job.worker_id = None
+                job.lease_expires_at = None
+                session.add(job)
+                session.commit()
+
+    def _finish_sync(self, job_id: int, status: str, result: Optional[dict], error: Optional[str]) -> None:
+        with Session(engine) as session:
+            job = session.get(GenerationJob, job_id)
+            if job is None:
+                return
+            job.status = status
+            job.result_json = json.dumps(result) if result is not None else None
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            job.lease_expires_at = None
+            session.add(job)
+            session.commit()
+
+
+# Singleton instance
+job_queue = JobQueue()
+
+
+# ----------------------------------------------------------------------
+# Handlers
+# ----------------------------------------------------------------------
+
+def _load_scene(scene_id: int) -> Scene:
+    with Session(engine) as session:
+        scene = session.get(Scene, scene_id)
+        if not scene:
+            raise ValueError("Scene not found")
+        return scene
+
+
+def _update_scene(scene_id: int, **fields) -> None:
+    with Session(engine) as session:
+        scene = session.get(Scene, scene_id)
+        if not scene:
+            raise ValueError("Scene not found")
+        for key, value in fields.items():
+            setattr(scene, key, value)
+        session.add(scene)
+        session.commit()
+
+
+@job_queue.handler("scene_video")
+async def generate_scene_video_job(job: GenerationJob, params: dict) -> dict:
+    """Fast (Pollinations still) or SVD video for one scene"""
+    scene = await asyncio.to_thread(_load_scene, job.target_id)
+    fast_mode = params.get("fast_mode", True)
+
+    if fast_mode:
+        from app.services.fast_video_service import fast_video_service
+        generate = fast_video_service.generate_fast_video
+    else:
+        from app.services.svd_video_service import svd_video_service
+        generate = svd_video_service.generate_scene_video
+
+    # requests-based and blocking: keep it off the event loop
+    video_url = await asyncio.to_thread(
+        generate,
+        scene_text=scene.raw_text,
+        emotion=scene.ai_emotion,
+        scene_id=scene.id
+    )
+    await asyncio.to_thread(
+        _update_scene, scene.id, ai_video_url=video_url, generated_at=datetime.utcnow()
+    )
+    return {"scene_id": scene.id, "video_url": video_url, "fast_mode": fast_mode}
+
+
+async def narrate_scene(scene_id: int, regenerate: bool = False) -> str:
+    """
+    Return the scene's narration URL, generating and saving it if missing
+    (or replacing it with regenerate=True). Concurrent calls for the same
+    scene and regenerate flag (API requests, jobs, other worker processes)
+    share one synthesis, so only one audio file is written.
+    """
+    from app.services.enhanced_audio_service import get_enhanced_audio_service
+
+    # A regeneration must not settle for the URL it was asked to replace
+    previous_url = (await asyncio.to_thread(_load_scene, scene_id)).ai_audio_url if regenerate else None
+
+    async def generate() -> str:
+        scene = await asyncio.to_thread(_load_scene, scene_id)
+        if scene.ai_audio_url and not regenerate:
+            return scene.ai_audio_url
+        audio_path = await get_enhanced_audio_service().generate_audio_for_scene(
+            scene_text=scene.raw_text,
+            scene_id=scene.id,
+            scene_emotion=scene.ai_emotion
+        )
+        await asyncio.to_thread(_update_scene, scene.id, ai_audio_url=audio_path)
+        return audio_path
+
+    async def saved_url() -> Optional[str]:
+        scene = await asyncio.to_thread(_load_scene, scene_id)
+        if regenerate and scene.ai_audio_url == previous_url:
+            return None
+        return scene.ai_audio_url
+
+    return await single_flight.do("scene_audio", (scene_id, regenerate), generate, recheck=saved_url)
+
+
+@job_queue.handler("scene_audio")
+async def generate_scene_audio_job(job: GenerationJob, params: dict) -> dict:
+    """Podcast narration for one scene"""
+    audio_path = await narrate_scene(job.target_id, regenerate=params.get("regenerate", True))
+    return {"scene_id": job.target_id, "audio_url": audio_path}
+
+
+def _load_chapter_scenes(chapter_id: int):
+    with Session(engine) as session:
+        chapter = session.get(Chapter, chapter_id)
+        if not chapter:
+            raise ValueError("Chapter not found")
+        scenes = session.exec(
+            select(Scene).where(Scene.chapter_id == chapter_id).order_by(Scene.index)
+        ).all()
+        return chapter, scenes
+
+
+@job_queue.handler("chapter_audio")
+async def generate_chapter_audio_job(job: GenerationJob, params: dict) -> dict:
+    """
+    Narration for every scene in a chapter that has none yet.
+    Each scene is saved as soon as it is done, so a cancelled or crashed
+    job resumes where it stopped.
+    """
+    chapter, scenes = await asyncio.to_thread(_load_chapter_scenes, job.target_id)
+    if not scenes:
+        return {"success": False, "message": "No scenes found in chapter"}
+
+    generated_count = 0
+    for scene in scenes:
+        if scene.ai_audio_url:  # Only generate if doesn't exist
+            continue
+        await narrate_scene(scene.id)
+        generated_count += 1
+
+    return {
+        "success": True,
+        "message": f"Generated audio for {generated_count}/{len(scenes)} scenes",
+        "chapter_title": chapter.title,
+        "total_scenes": len(scenes),
+        "generated": generated_count
+    }
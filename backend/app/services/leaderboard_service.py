@@ -0,0 +1,304 @@
+"""
+Leaderboards
+
+Global XP and streak boards (User.total_xp, User.current_streak_days) and a
+per-story XP board (UserStoryProgress.scenes_completed * SCENE_XP), ranked
+in memory instead of ORDER BY over every user on each request.
+
+Each board is a sorted array of packed (score desc, user id asc) keys, so
+top-N is a slice and "my rank" is a binary search: both are microseconds at
+a million users. Only users with a non-zero score are ranked.
+
+Boards are built lazily from the database and kept current incrementally:
+committed sessions that changed a ranked score move that user's key. Bulk
+SQL statements on User or UserStoryProgress (e.g. rebuild_story_progress)
+drop the affected boards instead. Writes made by other worker processes are
+picked up by the periodic rebuild (LEADERBOARD_REFRESH_SECONDS), which runs
+in the background from the app lifespan.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import User, UserStoryProgress
+from app.services.gamification_service import SCENE_XP
+
+logger = logging.getLogger("katha.leaderboard")
+
+BOARD_XP = "xp"
+BOARD_STREAK = "streak"
+
+_USER_ID_BITS = 32
+_USER_ID_MASK = (1 << _USER_ID_BITS) - 1
+_MAX_SCORE = (1 << 31) - 1
+_CHANGES_KEY = "katha_leaderboard_changes"
+_STALE_KEY = "katha_leaderboard_stale"
+
+# Ranked user attributes -> board
+_USER_BOARDS = (("total_xp", BOARD_XP), ("current_streak_days", BOARD_STREAK))
+
+
+def story_board(story_id: int) -> Tuple[str, int]:
+    return ("story", story_id)
+
+
+def _pack(score: int, user_id: int) -> int:
+    """Sortable int64: higher score first, then lower user id"""
+    return (-min(score, _MAX_SCORE) << _USER_ID_BITS) | user_id
+
+
+def _unpack(key: int) -> Tuple[int, int]:
+    return key & _USER_ID_MASK, -(key >> _USER_ID_BITS)
+
+
+class RankIndex:
+    """One board's scores as a sorted array of packed keys"""
+
+    def __init__(self, scores: Iterable[Tuple[int, int]]):
+        self._keys = array("q", sorted(_pack(score, user_id) for user_id, score in scores if score > 0))
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, int]]:
+        """[(user_id, score)] for ranks offset+1 .. offset+limit"""
+        return [_unpack(key) for key in self._keys[offset:offset + limit]]
+
+    def rank(self, user_id: int, score: int) -> Optional[int]:
+        """1-based rank for a user with this score, None when unranked"""
+        if score <= 0:
+            return None
+        return bisect_left(self._keys, _pack(score, user_id)) + 1
+
+    def move(self, user_id: int, old: Optional[int], new: Optional[int]) -> None:
+        """Replace a user's old score with the new one (None/0 = not ranked)"""
+        keys = self._keys
+        if old:
+            key = _pack(old, user_id)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+        if new:
+            key = _pack(new, user_id)
+            i = bisect_left(keys, key)
+            if i == len(keys) or keys[i] != key:
+                keys.insert(i, key)
+
+
+class Leaderboards:
+    """Lazily built, incrementally maintained rank indexes"""
+
+    def __init__(self, refresh_seconds: Optional[int] = None):
+        self.refresh_seconds = refresh_seconds or int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "300"))
+        self.builds = 0
+        self.updates = 0
+        self.invalidations = 0
+        self._boards: Dict[Hashable, RankIndex] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def top(self, board: Hashable, limit: int, offset: int = 0) -> Tuple[List[Tuple[int, int]], int]:
+        """Top entries as [(user_id, score)] plus the number of ranked users"""
+        index = self._index(board)
+        with self._lock:
+            return index.top(limit, offset), len(index)
+
+    def rank(self, board: Hashable, user_id: int, score: int) -> Tuple[Optional[int], int]:
+        """A user's rank for their current score plus the number of ranked users"""
+        index = self._index(board)
+        with self._lock:
+            return index.rank(user_id, score), len(index)
+
+    def _index(self, board: Hashable) -> RankIndex:
+        index = self._boards.get(board)
+        if index is not None:
+            return index
+        with self._build_lock:
+            index = self._boards.get(board)
+            if index is None:
+                index = self._build(board)
+        return index
+
+    # ------------------------------------------------------------------
+    # Building / refreshing
+    # ------------------------------------------------------------------
+
+    def _build(self, board: Hashable) -> RankIndex:
+        start = time.perf_counter()
+        with Session(engine) as session:
+            index = RankIndex(session.exec(self._scores_query(board)))
+        with self._lock:
+            self._boards[board] = index
+            self.builds += 1
+        logger.info(f"Built leaderboard {board}: {len(index)} users in {time.perf_counter() - start:.2f}s")
+        return index
+
+    @staticmethod
+    def _scores_query(board: Hashable):
+        if board == BOARD_XP:
+            return select(User.id, User.total_xp).where(User.total_xp > 0)
+        if board == BOARD_STREAK:
+            return select(User.id, User.current_streak_days).where(User.current_streak_days > 0)
+        _, story_id = board
+        return select(
+            UserStoryProgress.user_id, UserStoryProgress.scenes_completed * SCENE_XP
+        ).where(UserStoryProgress.story_id == story_id, UserStoryProgress.scenes_completed > 0)
+
+    def refresh_stale(self) -> int:
+        """Rebuild boards older than refresh_seconds. Returns how many were rebuilt."""
+        cutoff = time.monotonic() - self.refresh_seconds
+        stale = [board for board, index in list(self._boards.items()) if index.built_at < cutoff]
+        for board in stale:
+            with self._build_lock:
+                self._build(board)
+        return len(stale)
+
+    def invalidate(self, boards: Optional[Iterable[Hashable]] = None) -> None:
+        """Drop the given boards (all when None); they rebuild on next use"""
+        with self._lock:
+            if boards is None:
+                self._boards.clear()
+            else:
+                for board in boards:
+                    self._boards.pop(board, None)
+            self.invalidations += 1
+
+    def invalidate_stories(self) -> None:
+        with self._lock:
+            stories = [board for board in self._boards if isinstance(board, tuple)]
+        self.invalidate(stories)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def apply(self, changes: List[Tuple[Hashable, int, Optional[int], Optional[int]]]) -> None:
+        """Apply committed (board, user_id, old, new) score changes to built boards"""
+        with self._lock:
+            for board, user_id, old, new in changes:
+                index = self._boards.get(board)
+                if index is not None:
+                    index.move(user_id, old, new)
+                    self.updates += 1
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Build the global boards and start the periodic refresh (app lifespan)"""
+        self._task = asyncio.create_task(self._refresh_loop(), name="leaderboard-refresh")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        try:
+            await asyncio.to_thread(self._index, BOARD_XP)
+            await asyncio.to_thread(self._index, BOARD_STREAK)
+        except Exception as e:
+            logger.error(f"Leaderboard warm-up failed: {e}")
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await asyncio.to_thread(self.refresh_stale)
+            except Exception as e:
+                logger.error(f"Leaderboard refresh failed: {e}")
+
+    def stats(self) -> dict:
+        """Board sizes and build/update counters for monitoring"""
+        with self._lock:
+            return {
+                "boards": {str(board): len(index) for board, index in self._boards.items()},
+                "builds": self.builds,
+                "updates": self.updates,
+                "invalidations": self.invalidations,
+                "refresh_seconds": self.refresh_seconds
+            }
+
+
+# Singleton instance
+leaderboards = Leaderboards()
+
+
+def _score_change(obj, attr: str, deleted: bool) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """(old, new) for a ranked attribute touched by this flush, else None"""
+    if deleted:
+        return getattr(obj, attr), None
+    history = inspect(obj).attrs[attr].history
+    if not history.added:
+        return None
+    old = history.deleted[0] if history.deleted else None
+    return old, history.added[0]
+
+
+@event.listens_for(SASession, "after_flush")
+def _track_score_changes(session, flush_context):
+    """Collect ranked score changes; applied only once the transaction commits"""
+    changes = []
+    for objects, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for obj in objects:
+            if isinstance(obj, User):
+                for attr, board in _USER_BOARDS:
+                    change = _score_change(obj, attr, deleted)
+                    if change:
+                        changes.append((board, obj.id, *change))
+            elif isinstance(obj, UserStoryProgress):
+                change = _score_change(obj, "scenes_completed", deleted)
+                if change:
+                    old, new = change
+                    changes.append((
+                        story_board(obj.story_id), obj.user_id,
+                        old and old * SCENE_XP, new and new * SCENE_XP
+                    ))
+    if changes:
+        session.info.setdefault(_CHANGES_KEY, []).extend(changes)
+
+
+@event.listens_for(SASession, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    """Bulk INSERT/UPDATE/DELETE bypass the flush, so drop the boards they touch"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (User, UserStoryProgress):
+        orm_execute_state.session.info.setdefault(_STALE_KEY, set()).add(mapper.class_)
+
+
+@event.listens_for(SASession, "after_commit")
+def _apply_on_commit(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    stale = session.info.pop(_STALE_KEY, None)
+    if changes:
+        leaderboards.apply(changes)
+    if stale:
+        if User in stale:
+            leaderboards.invalidate([BOARD_XP, BOARD_STREAK])
+        if UserStoryProgress in stale:
+            leaderboards.invalidate_stories()
+
+
+@event.listens_for(SASession, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop(_CHANGES_KEY, None)
+    session.info.pop(_STALE_KEY, None)
@@ -0,0 +1,133 @@
+"""
+LLM Response Cache
+
+Persistent cache for LLM answers that are effectively deterministic for a
+given input (Rishi glossary terms, dharma dilemmas). Entries are keyed by
+(function, prompt version, normalized input hash) so editing a prompt only
+requires bumping its version. Entries expire after LLM_CACHE_TTL_HOURS and
+the table is trimmed to LLM_CACHE_MAX_ENTRIES, least recently used first.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import LLMCacheEntry
+
+logger = logging.getLogger("katha.llm_cache")
+
+# Recency is only written back when older than this, so hot reads stay reads
+_TOUCH_INTERVAL = timedelta(hours=1)
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so trivially different copies share an entry"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+class LLMResponseCache:
+    """SQLite-backed TTL + LRU cache of LLM responses"""
+
+    def __init__(self, ttl_hours: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = timedelta(hours=ttl_hours or float(os.getenv("LLM_CACHE_TTL_HOURS", "720")))
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(function: str, prompt_version: str, text: str) -> str:
+        """Key of (function, prompt version, normalized input hash)"""
+        digest = hashlib.sha256(normalize_input(text).encode("utf-8")).hexdigest()
+        return f"{function}:{prompt_version}:{digest}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, function: str, prompt_version: str, text: str) -> Optional[Any]:
+        """Return the cached response, or None on a miss or expired entry"""
+        key = self.make_key(function, prompt_version, text)
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            entry = session.get(LLMCacheEntry, key)
+            if entry is None or entry.created_at < now - self.ttl:
+                self._count(hit=False)
+                return None
+
+            if entry.last_used_at < now - _TOUCH_INTERVAL:
+                entry.last_used_at = now
+                session.add(entry)
+                session.commit()
+
+            self._count(hit=True)
+            return json.loads(entry.response_json)
+
+    def set(self, function: str, prompt_version: str, text: str, value: Any) -> None:
+        """Store a response, then drop expired and least recently used entries"""
+        key = self.make_key(function, prompt_version, text)
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            session.merge(LLMCacheEntry(
+                key=key,
+                function=function,
+                prompt_version=prompt_version,
+                response_json=json.dumps(value, ensure_ascii=False),
+                created_at=now,
+                last_used_at=now
+            ))
+            session.commit()
+            self._trim(session, now)
+
+    def _trim(self, session: Session, now: datetime) -> None:
+        session.exec(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < now - self.ttl))
+        total = session.exec(select(func.count()).select_from(LLMCacheEntry)).one()
+        excess = total - self.max_entries
+        if excess > 0:
+            oldest = select(LLMCacheEntry.key).order_by(LLMCacheEntry.last_used_at).limit(excess)
+            session.exec(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(oldest)))
+        session.commit()
+
+    async def aget(self, function: str, prompt_version: str, text: str) -> Optional[Any]:
+        """Non-blocking get; cache failures are treated as misses"""
+        try:
+            return await asyncio.to_thread(self.get, function, prompt_version, text)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    async def aset(self, function: str, prompt_version: str, text: str, value: Any) -> None:
+        """Non-blocking set; cache failures never fail the caller"""
+        try:
+            await asyncio.to_thread(self.set, function, prompt_version, text, value)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "ttl_hours": self.ttl.total_seconds() / 3600,
+                "max_entries": self.max_entries
+            }
+
+
+# Singleton instance
+llm_cache = LLMResponseCache()
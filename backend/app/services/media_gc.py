@@ -0,0 +1,305 @@
+"""
+Orphaned Media Garbage Collector
+
+Every regeneration writes audio/video/images under a fresh name and leaves
+the previous file behind, and failed segment cleanup leaves files in
+static/audio/temp. The collector indexes every /static URL the database
+still references (story/chapter covers, scene image/video/audio/reel
+audio, job results) and removes generated files nobody points at.
+
+Unreferenced files younger than MEDIA_GC_MIN_AGE_HOURS are kept, since a
+generation may have written the file but not yet committed its URL. Temp
+files are removed once older than MEDIA_GC_TEMP_HOURS, referenced or not.
+
+Modes: "dry-run" only reports; "quarantine" moves files out of static/
+into MEDIA_GC_QUARANTINE_DIR (same relative path, restorable) and purges
+quarantined files after MEDIA_GC_QUARANTINE_DAYS; "delete" unlinks them.
+Runs from scripts/media_gc.py or periodically in the app lifespan.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from sqlmodel import Session, select
+
+from app.models import Story, Chapter, Scene, User, Badge, GenerationJob
+
+logger = logging.getLogger("katha.media_gc")
+
+MODE_DRY_RUN = "dry-run"
+MODE_QUARANTINE = "quarantine"
+MODE_DELETE = "delete"
+MODES = (MODE_DRY_RUN, MODE_QUARANTINE, MODE_DELETE)
+
+# Generated media, relative to the static directory; curated assets
+# (images/covers, images/stories) are never collected
+GENERATED_DIRS = ("audio", "videos", "images/scenes", "images/fast")
+TEMP_DIRS = ("audio/temp",)
+
+# Every column that can hold a /static URL
+URL_COLUMNS = (
+    Story.cover_image_url,
+    Chapter.cover_image_url,
+    Scene.ai_image_url,
+    Scene.ai_video_url,
+    Scene.ai_audio_url,
+    Scene.reel_audio_url,
+    User.profile_image_url,
+    Badge.icon_url,
+)
+_STATIC_URL = re.compile(r"/static/[^\s\"'<>]+")
+
+# Rows fetched per round trip while indexing references
+_YIELD_PER = 1000
+
+
+def static_path(url: Optional[str]) -> Optional[str]:
+    """Path below static/ for a /static URL (absolute or relative), else None"""
+    if not url:
+        return None
+    path = unquote(urlsplit(url).path)
+    marker = path.find("/static/")
+    if marker < 0:
+        return None
+    return os.path.normpath(path[marker + len("/static/"):]).replace(os.sep, "/")
+
+
+def referenced_paths(session: Session) -> Set[str]:
+    """Every static path the database references"""
+    referenced = set()
+    for column in URL_COLUMNS:
+        for url in session.exec(select(column).where(column.is_not(None)).execution_options(yield_per=_YIELD_PER)):
+            path = static_path(url)
+            if path:
+                referenced.add(path)
+    results = select(GenerationJob.result_json).where(GenerationJob.result_json.is_not(None))
+    for result_json in session.exec(results.execution_options(yield_per=_YIELD_PER)):
+        for url in _STATIC_URL.findall(result_json):
+            referenced.add(static_path(url))
+    return referenced
+
+
+@dataclass
+class GCReport:
+    mode: str
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    referenced_files: int = 0
+    recent_kept: int = 0
+    orphans: List[Tuple[str, int]] = field(default_factory=list)  # (static path, bytes)
+    stale_temp: List[Tuple[str, int]] = field(default_factory=list)
+    removed_bytes: int = 0
+    purged_quarantine: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self, list_limit: int = 50) -> dict:
+        return {
+            "mode": self.mode,
+            "scanned_files": self.scanned_files,
+            "scanned_mb": round(self.scanned_bytes / 2**20, 1),
+            "referenced_files": self.referenced_files,
+            "recent_kept": self.recent_kept,
+            "orphans": len(self.orphans),
+            "orphan_mb": round(sum(size for _, size in self.orphans) / 2**20, 1),
+            "stale_temp": len(self.stale_temp),
+            "stale_temp_mb": round(sum(size for _, size in self.stale_temp) / 2**20, 1),
+            "removed_mb": round(self.removed_bytes / 2**20, 1),
+            "purged_quarantine": self.purged_quarantine,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 2),
+            "sample": [path for path, _ in (self.orphans + self.stale_temp)[:list_limit]]
+        }
+
+
+class MediaGC:
+    """Finds and removes generated media no database row references"""
+
+    def __init__(
+        self,
+        static_dir: str = "static",
+        quarantine_dir: Optional[str] = None,
+        min_age_hours: Optional[float] = None,
+        temp_hours: Optional[float] = None,
+        quarantine_days: Optional[float] = None,
+        interval_hours: Optional[float] = None,
+        mode: Optional[str] = None
+    ):
+        self.static_dir = Path(static_dir)
+        self.quarantine_dir = Path(quarantine_dir or os.getenv("MEDIA_GC_QUARANTINE_DIR", "cache/media_quarantine"))
+        self.min_age_hours = min_age_hours if min_age_hours is not None else float(os.getenv("MEDIA_GC_MIN_AGE_HOURS", "24"))
+        self.temp_hours = temp_hours if temp_hours is not None else float(os.getenv("MEDIA_GC_TEMP_HOURS", "6"))
+        self.quarantine_days = (quarantine_days if quarantine_days is not None
+                                else float(os.getenv("MEDIA_GC_QUARANTINE_DAYS", "7")))
+        self.interval_hours = interval_hours if interval_hours is not None else float(os.getenv("MEDIA_GC_INTERVAL_HOURS", "24"))
+        self.mode = mode or os.getenv("MEDIA_GC_MODE", MODE_QUARANTINE)
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown media GC mode {self.mode!r}, expected one of {', '.join(MODES)}")
+        self.last_report: Optional[GCReport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------
+
+    def _files(self, subdirs: Tuple[str, ...], exclude: Tuple[str, ...] = ()) -> Iterator[Tuple[str, os.stat_result]]:
+        for subdir in subdirs:
+            root = self.static_dir / subdir
+            for dirpath, dirnames, filenames in os.walk(root):
+                relative_dir = Path(dirpath).relative_to(self.static_dir).as_posix()
+                # Temp and nested generated dirs are handled by their own pass
+                dirnames[:] = [
+                    name for name in dirnames
+                    if f"{relative_dir}/{name}" not in exclude and f"{relative_dir}/{name}" not in subdirs
+                ]
+                for name in filenames:
+                    try:
+                        yield f"{relative_dir}/{name}", os.stat(os.path.join(dirpath, name))
+                    except OSError:
+                        continue
+
+    def collect(self, session: Session, mode: Optional[str] = None) -> GCReport:
+        """Index references, then remove (or just report) orphans and stale temp files"""
+        mode = mode or self.mode
+        if mode not in MODES:
+            raise ValueError(f"Unknown media GC mode {mode!r}, expected one of {', '.join(MODES)}")
+        started = time.perf_counter()
+        report = GCReport(mode=mode)
+        referenced = referenced_paths(session)
+        now = time.time()
+        orphan_cutoff = now - self.min_age_hours * 3600
+        temp_cutoff = now - self.temp_hours * 3600
+
+        for path, stat_result in self._files(GENERATED_DIRS, exclude=TEMP_DIRS):
+            report.scanned_files += 1
+            report.scanned_bytes += stat_result.st_size
+            if path in referenced:
+                report.referenced_files += 1
+            elif stat_result.st_mtime > orphan_cutoff:
+                report.recent_kept += 1
+            else:
+                report.orphans.append((path, stat_result.st_size))
+        for path, stat_result in self._files(TEMP_DIRS):
+            report.scanned_files += 1
+            report.scanned_bytes += stat_result.st_size
+            if stat_result.st_mtime <= temp_cutoff:
+                report.stale_temp.append((path, stat_result.st_size))
+            else:
+                report.recent_kept += 1
+
+        if mode != MODE_DRY_RUN:
+            for path, size in report.orphans + report.stale_temp:
+                if self._remove(path, mode):
+                    report.removed_bytes += size
+                else:
+                    report.errors += 1
+            if mode == MODE_QUARANTINE:
+                report.purged_quarantine = self.purge_quarantine()
+
+        report.seconds = time.perf_counter() - started
+        self.last_report = report
+        logger.info(
+            f"Media GC ({mode}): {report.scanned_files} files scanned, {len(report.orphans)} orphans, "
+            f"{len(report.stale_temp)} stale temp, {report.removed_bytes / 2**20:.1f} MB removed "
+            f"in {report.seconds:.2f}s"
+        )
+        return report
+
+    def _remove(self, path: str, mode: str) -> bool:
+        source = self.static_dir / path
+        try:
+            if mode == MODE_DELETE:
+                source.unlink()
+            else:
+                target = self.quarantine_dir / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(source), str(target))
+                # Quarantine age counts from the move, not the file's creation
+                os.utime(target)
+            return True
+        except FileNotFoundError:
+            # Another worker got there first
+            return False
+        except OSError as e:
+            logger.warning(f"Media GC could not remove {path}: {e}")
+            return False
+
+    def purge_quarantine(self) -> int:
+        """Delete quarantined files older than MEDIA_GC_QUARANTINE_DAYS"""
+        cutoff = time.time() - self.quarantine_days * 86400
+        purged = 0
+        for dirpath, _, filenames in os.walk(self.quarantine_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.stat(path).st_mtime <= cutoff:
+                        os.unlink(path)
+                        purged += 1
+                except OSError:
+                    continue
+        return purged
+
+    def restore(self, paths: Optional[List[str]] = None) -> int:
+        """Move quarantined files (all, or the given static paths) back under static/"""
+        if paths is None:
+            paths = [
+                Path(dirpath, name).relative_to(self.quarantine_dir).as_posix()
+                for dirpath, _, filenames in os.walk(self.quarantine_dir) for name in filenames
+            ]
+        restored = 0
+        for path in paths:
+            source = self.quarantine_dir / path
+            target = self.static_dir / path
+            if not source.exists() or target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), str(target))
+            restored += 1
+        return restored
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    async def start(self, static_dir: Optional[str] = None) -> None:
+        """Run collect() every MEDIA_GC_INTERVAL_HOURS (0 disables) for the app lifespan"""
+        if static_dir is not None:
+            self.static_dir = Path(static_dir)
+        if self.interval_hours > 0:
+            self._task = asyncio.create_task(self._collect_loop(), name="media-gc")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _collect_loop(self) -> None:
+        from app.db import engine
+        while True:
+            await asyncio.sleep(self.interval_hours * 3600)
+            try:
+                def run():
+                    with Session(engine) as session:
+                        self.collect(session)
+                await asyncio.to_thread(run)
+            except Exception as e:
+                logger.error(f"Media GC failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "interval_hours": self.interval_hours,
+            "last_run": self.last_report.as_dict(list_limit=0) if self.last_report else None
+        }
+
+
+media_gc = MediaGC()
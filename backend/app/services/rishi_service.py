@@ -1,30 +1,112 @@
 import os
+import importlib.util
 import httpx
 import json
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.services.llm_cache import llm_cache
+from app.metrics import external_call
+from app.services.single_flight import single_flight
 
 # Re-use existing ENV vars or default to mock
 LLM_API_KEY = os.getenv("LLM_API_KEY")
 LLM_API_BASE_URL = os.getenv("LLM_API_BASE_URL")
 
-async def chat_with_rishi(query: str, context: str) -> str:
+# Connection pool settings for the shared LLM client
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+# HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "auto").lower()
+
+# Bump when a prompt changes so cached answers from the old prompt are ignored
+GLOSSARY_PROMPT_VERSION = "v1"
+DILEMMA_PROMPT_VERSION = "v1"
+
+_llm_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_enabled() -> bool:
+    if LLM_HTTP2 in ("0", "false", "no", "off"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_llm_client() -> httpx.AsyncClient:
+    """Build a pooled, keep-alive client for LLM_API_BASE_URL"""
+    return httpx.AsyncClient(
+        http2=_http2_enabled(),
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS
+        )
+    )
+
+
+def get_llm_client() -> httpx.AsyncClient:
     """
-    Rishi personality: Wise, patient, culturally deep.
-    Returns plain text response.
+    Shared app-lifetime client, so calls reuse warm TCP/TLS connections.
+    Opened in main.lifespan; created lazily for scripts that skip it.
     """
-    if not (LLM_API_KEY and LLM_API_BASE_URL):
-        return f"Child, the stars are silent (Mock: LLM not configured). You asked: {query}. The context was: {context[:50]}..."
+    global _llm_client
+    if _llm_client is None or _llm_client.is_closed:
+        _llm_client = create_llm_client()
+    return _llm_client
 
-    system_prompt = """You are 'Rishi', a wise ancient sage and cultural guide. 
+
+async def start_llm_client() -> None:
+    get_llm_client()
+
+
+async def close_llm_client() -> None:
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
+
+RISHI_CHAT_PROMPT = """You are 'Rishi', a wise ancient sage and cultural guide. 
     Your tone is calm, philosophical, and deeply knowledgeable about Indian epics (Ramayana, Mahabharata), folklore, and history. 
     Answer the user's question based on the provided story context, but feel free to expand with external cultural wisdom. 
     Keep answers concise (under 150 words) unless asked for detail. 
     Do not break character. 
     """
 
+
+def _mock_chat_response(query: str, context: str) -> str:
+    return f"Child, the stars are silent (Mock: LLM not configured). You asked: {query}. The context was: {context[:50]}..."
+
+
+async def chat_with_rishi(query: str, context: str) -> str:
+    """
+    Rishi personality: Wise, patient, culturally deep.
+    Returns plain text response.
+    """
+    if not (LLM_API_KEY and LLM_API_BASE_URL):
+        return _mock_chat_response(query, context)
+
     user_prompt = f"Context: {context}\n\nUser Question: {query}"
 
-    return await _call_llm(system_prompt, user_prompt)
+    return await _call_llm(RISHI_CHAT_PROMPT, user_prompt)
+
+
+async def stream_chat_with_rishi(query: str, context: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of chat_with_rishi.
+    Yields text deltas as the upstream model produces them.
+    """
+    if not (LLM_API_KEY and LLM_API_BASE_URL):
+        for word in _mock_chat_response(query, context).split(" "):
+            yield word + " "
+        return
+
+    user_prompt = f"Context: {context}\n\nUser Question: {query}"
+
+    async for delta in _stream_llm(RISHI_CHAT_PROMPT, user_prompt):
+        yield delta
 
 async def explain_term_glossary(text: str) -> List[Dict[str, str]]:
     """
@@ -34,6 +116,10 @@ async def explain_term_glossary(text: str) -> List[Dict[str, str]]:
     if not (LLM_API_KEY and LLM_API_BASE_URL):
         return [{"term": "Dharma", "definition": "Cosmic law and order (Mock)"}]
 
+    cached = await llm_cache.aget("glossary", GLOSSARY_PROMPT_VERSION, text)
+    if cached is not None:
+        return cached
+
     system_prompt = """Identify 1-3 complex cultural, english or sanskrit terms in the text provided. 
     Return ONLY a JSON array of objects with keys: 'term', 'definition'. 
     Definitions should be simple, 1 sentence. 
@@ -41,16 +127,27 @@ async def explain_term_glossary(text: str) -> List[Dict[str, str]]:
 
     user_prompt = f"Text: {text}"
 
-    try:
-        resp = await _call_llm(system_prompt, user_prompt)
-        # cleanup json
-        valid_json = resp.strip()
-        if valid_json.startswith("```json"):
-            valid_json = valid_json[7:-3]
-        return json.loads(valid_json)
-    except Exception as e:
-        print(f"Glossary parse error: {e}")
-        return []
+    async def generate() -> List[Dict[str, str]]:
+        try:
+            resp = await _call_llm(system_prompt, user_prompt)
+            # cleanup json
+            valid_json = resp.strip()
+            if valid_json.startswith("```json"):
+                valid_json = valid_json[7:-3]
+            terms = json.loads(valid_json)
+            await llm_cache.aset("glossary", GLOSSARY_PROMPT_VERSION, text, terms)
+            return terms
+        except Exception as e:
+            print(f"Glossary parse error: {e}")
+            return []
+
+    # Identical concurrent requests share one LLM call
+    return await single_flight.do(
+        "glossary",
+        llm_cache.make_key("glossary", GLOSSARY_PROMPT_VERSION, text),
+        generate,
+        recheck=lambda: llm_cache.aget("glossary", GLOSSARY_PROMPT_VERSION, text)
+    )
 
 async def generate_dharma_dilemma(scene_text: str) -> Dict[str, str]:
     """
@@ -65,6 +162,10 @@ async def generate_dharma_dilemma(scene_text: str) -> Dict[str, str]:
             "result_b": "Chaos ensues but you are free."
         }
 
+    cached = await llm_cache.aget("dilemma", DILEMMA_PROMPT_VERSION, scene_text)
+    if cached is not None:
+        return cached
+
     system_prompt = """Analyze the scene. Identify a moral or practical dilemma a character faces (or could face). 
     Create an interactive question for the proper. 
     Return JSON with:
@@ -77,26 +178,36 @@ async def generate_dharma_dilemma(scene_text: str) -> Dict[str, str]:
 
     user_prompt = f"Scene: {scene_text}"
     
-    try:
-        resp = await _call_llm(system_prompt, user_prompt)
-        valid_json = resp.strip()
-        if valid_json.startswith("```json"):
-             valid_json = valid_json[7:-3]
-        elif valid_json.startswith("```"):
-             valid_json = valid_json[3:-3]
-        return json.loads(valid_json)
-    except Exception as e:
-        print(f"Dilemma gen error: {e}")
-        return {
-             "question": "The path is unclear.",
-             "option_a": "Wait",
-             "result_a": "Time passes.",
-             "option_b": "Act",
-             "result_b": "Consequences follow."
-        }
+    async def generate() -> Dict[str, str]:
+        try:
+            resp = await _call_llm(system_prompt, user_prompt)
+            valid_json = resp.strip()
+            if valid_json.startswith("```json"):
+                 valid_json = valid_json[7:-3]
+            elif valid_json.startswith("```"):
+                 valid_json = valid_json[3:-3]
+            dilemma = json.loads(valid_json)
+            await llm_cache.aset("dilemma", DILEMMA_PROMPT_VERSION, scene_text, dilemma)
+            return dilemma
+        except Exception as e:
+            print(f"Dilemma gen error: {e}")
+            return {
+                 "question": "The path is unclear.",
+                 "option_a": "Wait",
+                 "result_a": "Time passes.",
+                 "option_b": "Act",
+                 "result_b": "Consequences follow."
+            }
 
+    return await single_flight.do(
+        "dilemma",
+        llm_cache.make_key("dilemma", DILEMMA_PROMPT_VERSION, scene_text),
+        generate,
+        recheck=lambda: llm_cache.aget("dilemma", DILEMMA_PROMPT_VERSION, scene_text)
+    )
 
-async def _call_llm(system: str, user: str) -> str:
+
+def _llm_request(system: str, user: str, stream: bool = False) -> tuple:
     headers = {"Authorization": f"Bearer {LLM_API_KEY}", "Content-Type": "application/json"}
     payload = {
         "model": "gpt-4o-mini", # Adapter for whatever API is behind BASE_URL
@@ -107,12 +218,48 @@ async def _call_llm(system: str, user: str) -> str:
         "temperature": 0.7,
         "max_tokens": 500
     }
+    if stream:
+        payload["stream"] = True
+    return payload, headers
+
+
+async def _call_llm(system: str, user: str) -> str:
+    payload, headers = _llm_request(system, user)
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(LLM_API_BASE_URL, json=payload, headers=headers)
+    with external_call("llm"):
+        resp = await get_llm_client().post(LLM_API_BASE_URL, json=payload, headers=headers)
         resp.raise_for_status()
-        data = resp.json()
-        choices = data.get("choices")
-        if choices:
-            return choices[0].get("message", {}).get("content") or choices[0].get("text")
-        return ""
+    data = resp.json()
+    choices = data.get("choices")
+    if choices:
+        return choices[0].get("message", {}).get("content") or choices[0].get("text")
+    return ""
+
+
+async def _stream_llm(system: str, user: str) -> AsyncIterator[str]:
+    """
+    Same request as _call_llm with "stream": true; yields content deltas from
+    the upstream server-sent events. Closing the generator (e.g. when the
+    client disconnects) closes the upstream response and its connection.
+    """
+    payload, headers = _llm_request(system, user, stream=True)
+
+    # Whole stream, so it is recorded separately from single-shot calls
+    with external_call("llm_stream"):
+        async with get_llm_client().stream("POST", LLM_API_BASE_URL, json=payload, headers=headers) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    choices = json.loads(data).get("choices")
+                except json.JSONDecodeError:
+                    continue
+                if not choices:
+                    continue
+                delta = choices[0].get("delta", {}).get("content") or choices[0].get("text")
+                if delta:
+                    yield delta
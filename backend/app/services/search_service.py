@@ -0,0 +1,219 @@
+"""
+Full-Text Search
+
+FTS5 index over story titles/descriptions, chapter titles/summaries and
+scene text, with bm25 ranking and highlighted titles and snippets.
+
+The index is a single FTS5 table kept in sync by SQLite triggers on story,
+chapter and scene, so the seeder (and any other writer, including bulk SQL)
+updates it in the same transaction. Rows are keyed by rowid = id * 4 + kind,
+so a changed row is replaced without a lookup. The tokenizer keeps combining
+marks inside words, so Devanagari text is searchable as well as Latin.
+
+FTS5 is SQLite-only: on other databases searches fall back to ILIKE.
+"""
+
+import logging
+from typing import List, Optional
+
+from sqlalchemy import inspect, or_, text
+from sqlmodel import Session, select
+
+from app.models import Story, Chapter, Scene
+
+logger = logging.getLogger("katha.search")
+
+SEARCH_TABLE = "search_index"
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_TOKENS = 24
+# bm25 column weights: kind, story_id, chapter_id, title, body
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+KIND_STORY = "story"
+KIND_CHAPTER = "chapter"
+KIND_SCENE = "scene"
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+    kind UNINDEXED, story_id UNINDEXED, chapter_id UNINDEXED, title, body,
+    tokenize = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+)
+"""
+
+# (kind, rowid offset, table, watched columns, story_id, chapter_id, title, body) per indexed table;
+# column expressions use the trigger's row alias
+_SOURCES = (
+    (KIND_STORY, 1, "story", "title, description", "{row}.id", "NULL", "{row}.title", "{row}.description"),
+    (KIND_CHAPTER, 2, "chapter", "title, short_summary, story_id", "{row}.story_id", "{row}.id",
+     "{row}.title", "{row}.short_summary"),
+    (KIND_SCENE, 3, "scene", "raw_text, chapter_id",
+     "(SELECT story_id FROM chapter WHERE chapter.id = {row}.chapter_id)", "{row}.chapter_id",
+     "NULL", "{row}.raw_text"),
+)
+
+
+def _triggers() -> List[str]:
+    statements = []
+    for kind, offset, table, columns, story_id, chapter_id, title, body in _SOURCES:
+        def insert(row: str) -> str:
+            values = ", ".join(expr.format(row=row) for expr in (story_id, chapter_id, title, body))
+            return (f"INSERT INTO {SEARCH_TABLE} (rowid, kind, story_id, chapter_id, title, body) "
+                    f"VALUES ({row}.id * 4 + {offset}, '{kind}', {values});")
+        delete = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * 4 + {offset};"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_ai AFTER INSERT ON \"{table}\" "
+            f"BEGIN {insert('new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_au AFTER UPDATE OF {columns} ON \"{table}\" "
+            f"BEGIN {delete} {insert('new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_ad AFTER DELETE ON \"{table}\" "
+            f"BEGIN {delete} END",
+        ]
+    return statements
+
+
+def is_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(bind) -> bool:
+    """
+    Create the FTS table and its triggers if missing (SQLite only), filling
+    the new table from existing content. Returns True when it was created.
+    """
+    if not is_supported(bind):
+        return False
+    created = not inspect(bind).has_table(SEARCH_TABLE)
+    with bind.begin() as conn:
+        if created:
+            conn.exec_driver_sql(_CREATE_TABLE)
+        for statement in _triggers():
+            conn.exec_driver_sql(statement)
+        if created:
+            _fill(conn)
+    if created:
+        logger.info("Created full-text search index")
+    return created
+
+
+def rebuild_search_index(bind) -> None:
+    """Re-fill the index from story, chapter and scene"""
+    if not is_supported(bind):
+        return
+    ensure_search_index(bind)
+    with bind.begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+        _fill(conn)
+
+
+def _fill(conn) -> None:
+    for kind, offset, table, _, story_id, chapter_id, title, body in _SOURCES:
+        values = ", ".join(expr.format(row=table) for expr in (story_id, chapter_id, title, body))
+        conn.exec_driver_sql(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, kind, story_id, chapter_id, title, body) "
+            f"SELECT {table}.id * 4 + {offset}, '{kind}', {values} FROM \"{table}\""
+        )
+
+
+def match_query(q: str) -> Optional[str]:
+    """
+    Turn user input into an FTS5 query: every whitespace-separated term must
+    match, as a quoted prefix, so FTS operators in the input are inert.
+    """
+    terms = [term.replace('"', '""') for term in q.split()]
+    terms = [term for term in terms if term.strip('"')]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search(session: Session, q: str, limit: int = 20) -> List[dict]:
+    """Ranked hits across stories, chapters and scenes, best first"""
+    match = match_query(q)
+    if not match:
+        return []
+    if not is_supported(session.get_bind()):
+        return _search_like(session, q, limit)
+
+    rows = session.execute(text(f"""
+        SELECT kind, rowid / 4 AS id, story_id, chapter_id,
+               highlight({SEARCH_TABLE}, 3, :open, :close) AS title,
+               snippet({SEARCH_TABLE}, 4, :open, :close, '…', :tokens) AS snippet,
+               bm25({SEARCH_TABLE}, 0, 0, 0, :title_weight, :body_weight) AS score
+        FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH :match
+        ORDER BY score
+        LIMIT :limit
+    """), {
+        "open": HIGHLIGHT_OPEN,
+        "close": HIGHLIGHT_CLOSE,
+        "tokens": SNIPPET_TOKENS,
+        "title_weight": TITLE_WEIGHT,
+        "body_weight": BODY_WEIGHT,
+        "match": match,
+        "limit": limit
+    }).all()
+    return [
+        {
+            "kind": row.kind,
+            "id": row.id,
+            "story_id": row.story_id,
+            "chapter_id": row.chapter_id,
+            "title": row.title,
+            "snippet": row.snippet,
+            # bm25 is lower-is-better; expose higher-is-better
+            "score": round(-row.score, 4)
+        }
+        for row in rows
+    ]
+
+
+def search_story_ids(session: Session, q: str) -> List[int]:
+    """Ids of stories with any matching story, chapter or scene text, best first"""
+    match = match_query(q)
+    if not match:
+        return []
+    if not is_supported(session.get_bind()):
+        return list(session.exec(
+            select(Story.id).where(or_(Story.title.ilike(f"%{q}%"), Story.description.ilike(f"%{q}%")))
+        ).all())
+
+    rows = session.execute(text(f"""
+        WITH hits AS MATERIALIZED (
+            SELECT story_id, bm25({SEARCH_TABLE}, 0, 0, 0, :title_weight, :body_weight) AS score
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH :match
+        )
+        SELECT story_id FROM hits
+        GROUP BY story_id
+        ORDER BY MIN(score)
+    """), {"title_weight": TITLE_WEIGHT, "body_weight": BODY_WEIGHT, "match": match}).all()
+    return [row.story_id for row in rows if row.story_id is not None]
+
+
+def _search_like(session: Session, q: str, limit: int) -> List[dict]:
+    pattern = f"%{q}%"
+    hits = [
+        {"kind": KIND_STORY, "id": story.id, "story_id": story.id, "chapter_id": None,
+         "title": story.title, "snippet": story.description, "score": 0.0}
+        for story in session.exec(
+            select(Story).where(or_(Story.title.ilike(pattern), Story.description.ilike(pattern))).limit(limit)
+        ).all()
+    ]
+    hits += [
+        {"kind": KIND_CHAPTER, "id": chapter.id, "story_id": chapter.story_id, "chapter_id": chapter.id,
+         "title": chapter.title, "snippet": chapter.short_summary, "score": 0.0}
+        for chapter in session.exec(
+            select(Chapter).where(or_(Chapter.title.ilike(pattern), Chapter.short_summary.ilike(pattern))).limit(limit)
+        ).all()
+    ]
+    hits += [
+        {"kind": KIND_SCENE, "id": scene.id, "story_id": story_id, "chapter_id": scene.chapter_id,
+         "title": None, "snippet": scene.raw_text[:200], "score": 0.0}
+        for scene, story_id in session.exec(
+            select(Scene, Chapter.story_id).join(Chapter, Scene.chapter_id == Chapter.id)
+            .where(Scene.raw_text.ilike(pattern)).limit(limit)
+        ).all()
+    ]
+    return hits[:limit]
@@ -3,16 +3,24 @@ Seed Service - Populates database with story content
 Updates rich story structures including movie-style reel scripts.
 """
 
+import codecs
 import json
 import os
 import logging
-from typing import Optional
-from sqlmodel import Session, select
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+from sqlmodel import Session, delete, select
 
-from app.models import Story, Chapter, Scene, Badge
+from app.models import Story, Chapter, Scene, Badge, UserSceneProgress, UserStoryProgress
+from app.services.gamification_service import rebuild_story_progress
+from app.services.story_cache import story_cache
 
 logger = logging.getLogger("katha.seed")
 
+# Stories diffed and flushed together; bounds memory when streaming a corpus
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "50"))
+READ_CHUNK_BYTES = 1 << 20
+
 # Default badges for gamification
 DEFAULT_BADGES = [
     {
@@ -65,110 +73,346 @@ def seed_badges(session: Session) -> int:
     return created
 
 
-def seed_stories(session: Session) -> dict:
-    """
-    Seed stories from stories.json.
-    Includes movie-style reel scripts.
-    """
-    data_path = get_stories_json_path()
-    
+def load_stories_json(data_path: Optional[str] = None) -> Optional[list]:
+    """Read stories.json, or None if it cannot be found."""
+    data_path = data_path or get_stories_json_path()
     if not os.path.exists(data_path):
         logger.error(f"Stories data file not found: {data_path}")
-        return {"status": "error", "message": "stories.json not found"}
-    
+        return None
     with open(data_path, "r", encoding="utf-8") as f:
-        stories_data = json.load(f)
-    
-    results = {
+        return json.load(f)
+
+
+def iter_stories(data_path: str, offset: int = 0) -> Iterator[Tuple[dict, int]]:
+    """
+    Stream stories from a JSON array file (like stories.json) or a JSON Lines
+    file (one story per line), one at a time. Yields (story, offset) where
+    offset is the byte position just after that story; passing it back as
+    `offset` resumes with the next story. Memory is bounded by the largest
+    single story, not the file.
+    """
+    with open(data_path, "rb") as f:
+        first = f.read(READ_CHUNK_BYTES).lstrip()[:1]
+        f.seek(offset)
+        if data_path.endswith((".jsonl", ".ndjson")) or first == b"{":
+            yield from _iter_json_lines(f, offset)
+        else:
+            yield from _iter_json_array(f, offset)
+
+
+def _iter_json_lines(f, offset: int) -> Iterator[Tuple[dict, int]]:
+    for line in f:
+        offset += len(line)
+        if line.strip():
+            yield json.loads(line), offset
+
+
+def _iter_json_array(f, offset: int) -> Iterator[Tuple[dict, int]]:
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    in_array = offset > 0  # resuming lands between two elements
+    eof = False
+    while True:
+        # Skip the array punctuation between stories
+        position = 0
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","
+                                          or (buffer[position] == "[" and not in_array)):
+            in_array = in_array or buffer[position] == "["
+            position += 1
+        if position:
+            offset += len(buffer[:position].encode("utf-8"))
+            buffer = buffer[position:]
+        if buffer.startswith("]"):
+            return
+        if buffer:
+            try:
+                story, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                offset += len(buffer[:end].encode("utf-8"))
+                buffer = buffer[end:]
+                yield story, offset
+                continue
+        elif eof:
+            return
+        # Incomplete story: read at least as much again so large stories parse in amortized linear time
+        chunk = f.read(max(READ_CHUNK_BYTES, len(buffer)))
+        eof = not chunk
+        buffer += text_decoder.decode(chunk, final=eof)
+
+
+def _cover_image_url(story_data: dict) -> str:
+    cover_image = story_data.get("cover_image_url", "")
+    if not cover_image or "unsplash" in cover_image:
+        # Fallback to a better AI generated prompt link
+        prompt = f"cinematic high quality painting of {story_data['title']} indian mythology style 8k"
+        cover_image = f"https://pollinations.ai/p/{prompt.replace(' ', '%20')}?width=800&height=1200&nologo=true"
+    return cover_image
+
+
+def _story_fields(story_data: dict) -> dict:
+    chapters = story_data.get("chapters", [])
+    return {
+        "title": story_data["title"],
+        "description": story_data.get("description", ""),
+        "category": story_data.get("category", "Folklore"),
+        "cover_image_url": _cover_image_url(story_data),
+        "total_chapters": len(chapters),
+        "total_scenes": sum(len(chapter.get("scenes", [])) for chapter in chapters)
+    }
+
+
+def _chapter_fields(chapter_data: dict) -> dict:
+    return {
+        "title": chapter_data["title"],
+        "short_summary": chapter_data.get("short_summary", "")
+    }
+
+
+def _scene_fields(scene_data: dict) -> dict:
+    # Generated asset fields (ai_*_url, reel_audio_url) are never touched
+    return {
+        "raw_text": scene_data["raw_text"],
+        "reel_script": scene_data.get("reel_script", ""),
+        "ai_emotion": scene_data.get("emotion", "shanta"),
+        "ai_symbolism": scene_data.get("symbolism", "")
+    }
+
+
+def _apply_fields(obj, fields: dict) -> bool:
+    """Set only the fields that differ; True if anything changed."""
+    changed = False
+    for name, value in fields.items():
+        if getattr(obj, name) != value:
+            setattr(obj, name, value)
+            changed = True
+    return changed
+
+
+def _new_results() -> dict:
+    return {
         "stories_created": 0,
         "stories_updated": 0,
+        "stories_unchanged": 0,
         "chapters_created": 0,
+        "chapters_updated": 0,
+        "chapters_deleted": 0,
         "scenes_created": 0,
-        "stories": []
+        "scenes_updated": 0,
+        "scenes_deleted": 0
+    }
+
+
+def _batches(stories: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for story in stories:
+        batch.append(story)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _sync_batch(session: Session, stories_data: list, results: dict) -> List[dict]:
+    """
+    Diff a batch of stories against the database by (slug, chapter index,
+    scene index) and flush the changes without committing: unchanged rows
+    are left alone, changed rows are updated in place (keeping their ids and
+    generated audio/video URLs), new rows are inserted in bulk and
+    chapters/scenes no longer in the data are deleted. Returns one summary
+    entry per story.
+    """
+    # Current rows for this batch, three queries
+    slugs = [story_data["slug"] for story_data in stories_data]
+    stories = {story.slug: story for story in session.exec(select(Story).where(Story.slug.in_(slugs))).all()}
+    story_ids = [story.id for story in stories.values()]
+    chapters = {
+        (chapter.story_id, chapter.index): chapter
+        for chapter in session.exec(select(Chapter).where(Chapter.story_id.in_(story_ids))).all()
+    }
+    scenes = {
+        (scene.chapter_id, scene.index): scene
+        for scene in session.exec(
+            select(Scene).join(Chapter, Scene.chapter_id == Chapter.id).where(Chapter.story_id.in_(story_ids))
+        ).all()
     }
     
+    # Stories
+    story_status = {}
     for story_data in stories_data:
-        # Check if story exists
-        existing_story = session.exec(
-            select(Story).where(Story.slug == story_data["slug"])
-        ).first()
-        
-        # If exists, we'll update it instead of skipping, to ensure new fields are added
-        story = existing_story if existing_story else Story(slug=story_data["slug"], title=story_data["title"])
-        
-        story.title = story_data["title"]
-        story.description = story_data.get("description", "")
-        story.category = story_data.get("category", "Folklore")
-        
-        # Handle Cover Image - use AI generation prompt if needed
-        cover_image = story_data.get("cover_image_url", "")
-        if not cover_image or "unsplash" in cover_image:
-            # Fallback to a better AI generated prompt link
-            prompt = f"cinematic high quality painting of {story.title} indian mythology style 8k"
-            cover_image = f"https://pollinations.ai/p/{prompt.replace(' ', '%20')}?width=800&height=1200&nologo=true"
-        
-        story.cover_image_url = cover_image
-        
-        session.add(story)
-        session.commit()
-        session.refresh(story)
-        
-        # Clear existing chapters to avoid duplicates on update
-        if existing_story:
-            from sqlmodel import delete
-            session.exec(delete(Scene).where(Scene.chapter_id.in_(
-                select(Chapter.id).where(Chapter.story_id == story.id)
-            )))
-            session.exec(delete(Chapter).where(Chapter.story_id == story.id))
-            session.commit()
-            results["stories_updated"] += 1
+        story = stories.get(story_data["slug"])
+        if story is None:
+            story = Story(slug=story_data["slug"], **_story_fields(story_data))
+            stories[story.slug] = story
+            session.add(story)
+            story_status[story.slug] = "created"
+        elif _apply_fields(story, _story_fields(story_data)):
+            story_status[story.slug] = "updated"
         else:
-            results["stories_created"] += 1
-        
-        total_scenes = 0
-        
-        # Create chapters
+            story_status[story.slug] = "unchanged"
+    session.flush()
+    
+    # Chapters
+    changed_stories = set()
+    kept_chapters = set()
+    for story_data in stories_data:
+        story = stories[story_data["slug"]]
         for chapter_data in story_data.get("chapters", []):
-            chapter = Chapter(
-                story_id=story.id,
-                index=chapter_data["index"],
-                title=chapter_data["title"],
-                short_summary=chapter_data.get("short_summary", "")
-            )
-            session.add(chapter)
-            session.commit()
-            session.refresh(chapter)
-            results["chapters_created"] += 1
-            
-            # Create scenes
+            key = (story.id, chapter_data["index"])
+            kept_chapters.add(key)
+            chapter = chapters.get(key)
+            if chapter is None:
+                chapter = Chapter(story_id=story.id, index=chapter_data["index"], **_chapter_fields(chapter_data))
+                chapters[key] = chapter
+                session.add(chapter)
+                results["chapters_created"] += 1
+                changed_stories.add(story.slug)
+            elif _apply_fields(chapter, _chapter_fields(chapter_data)):
+                results["chapters_updated"] += 1
+                changed_stories.add(story.slug)
+    session.flush()
+    
+    # Scenes
+    kept_scenes = set()
+    for story_data in stories_data:
+        story = stories[story_data["slug"]]
+        for chapter_data in story_data.get("chapters", []):
+            chapter = chapters[(story.id, chapter_data["index"])]
             for scene_data in chapter_data.get("scenes", []):
-                scene = Scene(
-                    chapter_id=chapter.id,
-                    index=scene_data["index"],
-                    raw_text=scene_data["raw_text"],
-                    reel_script=scene_data.get("reel_script", ""),
-                    ai_emotion=scene_data.get("emotion", "shanta"),
-                    ai_symbolism=scene_data.get("symbolism", "")
-                )
-                session.add(scene)
-                total_scenes += 1
-                results["scenes_created"] += 1
-            
-            session.commit()
-        
-        # Update story totals
-        story.total_chapters = len(story_data.get("chapters", []))
-        story.total_scenes = total_scenes
-        session.add(story)
-        session.commit()
-        
-        results["stories"].append({
+                key = (chapter.id, scene_data["index"])
+                kept_scenes.add(key)
+                scene = scenes.get(key)
+                if scene is None:
+                    session.add(Scene(chapter_id=chapter.id, index=scene_data["index"], **_scene_fields(scene_data)))
+                    results["scenes_created"] += 1
+                    changed_stories.add(story.slug)
+                elif _apply_fields(scene, _scene_fields(scene_data)):
+                    results["scenes_updated"] += 1
+                    changed_stories.add(story.slug)
+    
+    # Chapters and scenes dropped from the data
+    stale_chapter_ids = [chapter.id for key, chapter in chapters.items() if key not in kept_chapters]
+    chapter_story = {chapter.id: chapter.story_id for chapter in chapters.values()}
+    stale_scenes = [
+        (scene.id, chapter_story[key[0]]) for key, scene in scenes.items() if key not in kept_scenes
+    ]
+    stale_scene_ids = [scene_id for scene_id, _ in stale_scenes]
+    if stale_scene_ids or stale_chapter_ids:
+        session.exec(delete(UserSceneProgress).where(UserSceneProgress.scene_id.in_(stale_scene_ids)))
+        session.exec(delete(Scene).where(Scene.id.in_(stale_scene_ids)))
+        session.exec(delete(Chapter).where(Chapter.id.in_(stale_chapter_ids)))
+        results["chapters_deleted"] += len(stale_chapter_ids)
+        results["scenes_deleted"] += len(stale_scene_ids)
+        id_to_slug = {story.id: slug for slug, story in stories.items()}
+        changed_stories.update(id_to_slug[chapter_story[chapter_id]] for chapter_id in stale_chapter_ids)
+        changed_stories.update(id_to_slug[story_id] for _, story_id in stale_scenes)
+    session.flush()
+    
+    entries = []
+    for story_data in stories_data:
+        slug = story_data["slug"]
+        status = story_status[slug]
+        if status == "unchanged" and slug in changed_stories:
+            status = "updated"
+        results[f"stories_{status}"] += 1
+        fields = _story_fields(story_data)
+        entries.append({
             "title": story_data["title"],
-            "status": "synchronized",
-            "chapters": story.total_chapters,
-            "scenes": story.total_scenes
+            "status": status,
+            "chapters": fields["total_chapters"],
+            "scenes": fields["total_scenes"]
         })
+    return entries
+
+
+def seed_stories(session: Session, stories_data: Optional[Iterable[dict]] = None) -> dict:
+    """
+    Synchronize stories from stories.json (or the given stories).
+    Includes movie-style reel scripts.
+
+    The file is streamed and diffed in batches of SEED_BATCH_SIZE stories
+    (see _sync_batch); everything is written in one transaction.
+    """
+    if stories_data is None:
+        data_path = get_stories_json_path()
+        if not os.path.exists(data_path):
+            logger.error(f"Stories data file not found: {data_path}")
+            return {"status": "error", "message": "stories.json not found"}
+        stories_data = (story for story, _ in iter_stories(data_path))
+    
+    results = _new_results()
+    results["stories"] = []
+    for batch in _batches(stories_data, SEED_BATCH_SIZE):
+        results["stories"] += _sync_batch(session, batch, results)
+    
+    session.commit()
+    if results["chapters_deleted"] or results["scenes_deleted"]:
+        # Bulk deletes bypass the ORM flush hooks
+        story_cache.invalidate()
+    
+    return results
+
+
+def import_stories(
+    session: Session,
+    data_path: str,
+    batch_size: int = SEED_BATCH_SIZE,
+    resume: bool = True,
+    checkpoint_path: Optional[str] = None
+) -> dict:
+    """
+    Import a large story corpus (JSON array or JSON Lines) with flat memory.
+
+    Stories are streamed from the file and synchronized in batches of
+    `batch_size`, one transaction per batch. After each commit the byte
+    offset of the last committed story is saved to a checkpoint file
+    (default: <data_path>.checkpoint), so an interrupted import resumes with
+    the next story. The checkpoint is removed once the import completes, and
+    ignored if the data file has changed since it was written.
+    """
+    checkpoint_path = checkpoint_path or f"{data_path}.checkpoint"
+    source = os.stat(data_path)
+    source_key = {"size": source.st_size, "mtime": source.st_mtime}
+    
+    offset, imported = 0, 0
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("source") == source_key:
+            offset, imported = checkpoint["offset"], checkpoint["stories"]
+            logger.info(f"Resuming import of {data_path} after {imported} stories")
+        else:
+            logger.warning(f"{data_path} changed since the last checkpoint, starting over")
+    
+    results = _new_results()
+    started = time.perf_counter()
+    stream = iter_stories(data_path, offset)
+    for batch in _batches(stream, batch_size):
+        _sync_batch(session, [story for story, _ in batch], results)
+        session.commit()
+        if results["chapters_deleted"] or results["scenes_deleted"]:
+            story_cache.invalidate()
+        # Drop this batch's rows so memory stays flat
+        session.expunge_all()
+        
+        offset = batch[-1][1]
+        imported += len(batch)
+        with open(checkpoint_path, "w", encoding="utf-8") as f:
+            json.dump({"source": source_key, "offset": offset, "stories": imported}, f)
+        logger.info(
+            f"Imported {imported} stories ({offset / max(source.st_size, 1):.0%} of {data_path}, "
+            f"{results['scenes_created']} scenes created, {time.perf_counter() - started:.1f}s)"
+        )
     
+    if results["scenes_created"] or results["scenes_deleted"]:
+        rebuild_story_progress(session)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    results["stories_imported"] = imported
     return results
 
 
@@ -177,6 +421,11 @@ def seed_all(session: Session) -> dict:
     try:
         badges_created = seed_badges(session)
         story_results = seed_stories(session)
+        if "stories" not in story_results:
+            return story_results
+        # Scene counts changed, so recount story completion
+        if story_results["scenes_created"] or story_results["scenes_deleted"]:
+            rebuild_story_progress(session)
         return {
             "status": "ok",
             "message": f"Synchronized {len(story_results['stories'])} stories",
@@ -191,11 +440,12 @@ def seed_all(session: Session) -> dict:
 def reset_and_seed(session: Session) -> dict:
     """Reset and reseed."""
     try:
-        from sqlmodel import delete
+        session.exec(delete(UserStoryProgress))
         session.exec(delete(Scene))
         session.exec(delete(Chapter))
         session.exec(delete(Story))
         session.commit()
+        story_cache.invalidate()
         return seed_all(session)
     except Exception as e:
         logger.error(f"Reset and seed error: {e}")
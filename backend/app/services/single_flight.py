@@ -0,0 +1,173 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent callers asking for the same (operation, key) share one
+computation instead of each starting their own, e.g. every reader of a
+scene without narration hitting /api/audio/generate at once, or identical
+Rishi glossary requests.
+
+- Within a process, callers await the leader's asyncio task.
+- Across worker processes, the leader holds a FlightLease row (renewed while
+  it runs). Other processes wait for the lease to go away and then call
+  `recheck()` to read the result the leader persisted (scene URL, LLM
+  cache entry). If there is none (the leader failed or crashed), they
+  take the lease and compute it themselves.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.db import engine
+from app.models import FlightLease
+
+logger = logging.getLogger("katha.single_flight")
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Callers see the error; this only silences "exception never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Keyed request coalescing across asyncio tasks and processes"""
+
+    def __init__(self, lease_seconds: Optional[int] = None, poll_interval: float = 0.25):
+        self.lease_seconds = lease_seconds or int(os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "120"))
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.leaders = 0
+        self.coalesced = 0
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+
+    async def do(
+        self,
+        operation: str,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        recheck: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
+        """
+        Run fn once for (operation, key) and share its result with every
+        concurrent caller. With `recheck`, the call is also coalesced with
+        other processes through a lease; recheck returns the persisted result
+        (or None) once another process's lease is released.
+        """
+        flight = (operation, key)
+        task = self._inflight.get(flight)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(self._lead(flight, fn, recheck))
+            task.add_done_callback(_consume_exception)
+            self._inflight[flight] = task
+        else:
+            self.coalesced += 1
+        # Shielded: one caller disconnecting must not cancel the shared work
+        return await asyncio.shield(task)
+
+    async def _lead(self, flight, fn, recheck) -> Any:
+        try:
+            if recheck is None:
+                return await fn()
+            operation, key = flight
+            return await self._run_leased(f"{operation}:{key}", fn, recheck)
+        finally:
+            self._inflight.pop(flight, None)
+
+    async def _run_leased(self, lease_key: str, fn, recheck) -> Any:
+        while True:
+            if await asyncio.to_thread(self._acquire_sync, lease_key):
+                break
+            self.coalesced += 1
+            await self._wait_released(lease_key)
+            result = await recheck()
+            if result is not None:
+                return result
+
+        heartbeat = asyncio.create_task(self._heartbeat(lease_key))
+        try:
+            return await fn()
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._release_sync, lease_key)
+
+    async def _wait_released(self, lease_key: str) -> None:
+        while await asyncio.to_thread(self._held_by_other_sync, lease_key):
+            await asyncio.sleep(self.poll_interval)
+
+    async def _heartbeat(self, lease_key: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew_sync, lease_key)
+            except Exception as e:
+                logger.warning(f"Could not renew lease {lease_key}: {e}")
+
+    # ------------------------------------------------------------------
+    # Lease table (blocking; called via asyncio.to_thread)
+    # ------------------------------------------------------------------
+
+    def _expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def _acquire_sync(self, lease_key: str) -> bool:
+        with Session(engine) as session:
+            # Take over a lease left behind by a crashed process
+            taken = session.exec(
+                update(FlightLease)
+                .where(FlightLease.key == lease_key, FlightLease.expires_at < datetime.utcnow())
+                .values(owner=self.owner, expires_at=self._expiry())
+            )
+            if taken.rowcount:
+                session.commit()
+                return True
+
+            session.add(FlightLease(key=lease_key, owner=self.owner, expires_at=self._expiry()))
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                return False
+            return True
+
+    def _held_by_other_sync(self, lease_key: str) -> bool:
+        with Session(engine) as session:
+            lease = session.get(FlightLease, lease_key)
+            return lease is not None and lease.expires_at >= datetime.utcnow()
+
+    def _renew_sync(self, lease_key: str) -> None:
+        with Session(engine) as session:
+            session.exec(
+                update(FlightLease)
+                .where(FlightLease.key == lease_key, FlightLease.owner == self.owner)
+                .values(expires_at=self._expiry())
+            )
+            session.commit()
+
+    def _release_sync(self, lease_key: str) -> None:
+        with Session(engine) as session:
+            session.exec(
+                delete(FlightLease)
+                .where(FlightLease.key == lease_key, FlightLease.owner == self.owner)
+            )
+            session.commit()
+
+    def stats(self) -> dict:
+        """Leader/follower counters for monitoring"""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
+
+
+# Singleton instance
+single_flight = SingleFlight()
@@ -0,0 +1,124 @@
+"""
+Story Tree Cache
+
+In-process cache for the read-only catalog payloads (stories, chapters,
+map locations) served by the stories, chapters and locations routes.
+Content only changes when the seeder runs or a generation job writes an
+asset URL, so payloads are built once per content version and served from
+memory until the next write.
+
+Any committed session that touched a Story, Chapter, Scene or Location bumps
+the version and clears the cache automatically. Bulk SQL statements (e.g. the
+deletes in seed_service) bypass the ORM flush, so callers issuing them must
+call `story_cache.invalidate()` themselves.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+
+from app.models import Story, Chapter, Scene, Location
+
+logger = logging.getLogger("katha.cache")
+
+_CONTENT_MODELS = (Story, Chapter, Scene, Location)
+_DIRTY_FLAG = "katha_story_content_changed"
+
+
+class StoryCache:
+    """Versioned LRU cache of serialized catalog payloads"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.version = 1
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached payload for key, or None on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """
+        Store a payload. If `version` is given and the content version has
+        moved on since the payload was built, the stale payload is dropped.
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached payload for key, building it with loader on a miss"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        version = self.version
+        value = loader()
+        if value is not None:
+            self.set(key, value, version=version)
+        return value
+
+    def invalidate(self) -> int:
+        """Drop every cached payload and bump the content version"""
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+            self.invalidations += 1
+            logger.debug(f"Story cache invalidated (version {self.version})")
+            return self.version
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations
+            }
+
+
+# Singleton instance
+story_cache = StoryCache()
+
+
+@event.listens_for(SASession, "after_flush")
+def _track_content_changes(session, flush_context):
+    """Remember whether this transaction wrote any story content"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _CONTENT_MODELS):
+            session.info[_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(SASession, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_DIRTY_FLAG, False):
+        story_cache.invalidate()
+
+
+@event.listens_for(SASession, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop(_DIRTY_FLAG, None)
@@ -10,6 +10,8 @@ import time
 from typing import Optional
 import logging
 
+from app.metrics import external_call
+
 logger = logging.getLogger(__name__)
 
 class SVDVideoService:
@@ -87,8 +89,9 @@ class SVDVideoService:
             f"&nologo=true"
         )
         
-        response = requests.get(image_url, timeout=60)
-        response.raise_for_status()
+        with external_call("image"):
+            response = requests.get(image_url, timeout=60)
+            response.raise_for_status()
         
         # Save image
         filename = f"scene_{scene_id or 'temp'}_source.jpg"
@@ -124,25 +127,26 @@ class SVDVideoService:
         
         # Send to SVD API
         logger.info(f"Sending image to SVD API for animation...")
-        response = requests.post(
-            self.svd_api_url,
-            headers=headers,
-            data=image_data,
-            timeout=300  # SVD can take 1-3 minutes
-        )
-        
-        # Handle rate limits / model loading
-        if response.status_code == 503:
-            logger.warning("Model is loading, waiting 20s...")
-            time.sleep(20)
+        with external_call("video"):
             response = requests.post(
                 self.svd_api_url,
                 headers=headers,
                 data=image_data,
-                timeout=300
+                timeout=300  # SVD can take 1-3 minutes
             )
-        
-        response.raise_for_status()
+            
+            # Handle rate limits / model loading
+            if response.status_code == 503:
+                logger.warning("Model is loading, waiting 20s...")
+                time.sleep(20)
+                response = requests.post(
+                    self.svd_api_url,
+                    headers=headers,
+                    data=image_data,
+                    timeout=300
+                )
+            
+            response.raise_for_status()
         
         # Save video
         filename = f"scene_{scene_id or 'temp'}_reel.mp4"
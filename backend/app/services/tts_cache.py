@@ -0,0 +1,174 @@
+"""
+Content-Addressed TTS Cache
+
+Stores synthesized speech on disk keyed by a hash of everything that affects
+the output (text, voice, rate, pitch, volume). Narration fragments such as
+"the king said" repeat across scenes, and regeneration runs re-request
+unchanged segments, so both only pay for TTS once.
+
+The cache is bounded by TTS_CACHE_MAX_MB and evicts least recently used
+entries; file mtimes record recency so the order survives restarts.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("katha.tts_cache")
+
+
+class TTSCache:
+    """Size-bounded LRU disk cache of synthesized audio"""
+
+    def __init__(self, cache_dir: str = "cache/tts", max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str, pitch: str, volume: float = 1.0) -> str:
+        """Hash of every parameter that changes the synthesized audio"""
+        raw = "\x1f".join([text, voice, rate, pitch, f"{volume:.4f}"])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def _load_index(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*/*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Return the cached audio for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            self._record_miss(key)
+            return None
+        self._record_hit(key, len(data))
+        return data
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """
+        Copy the cached audio for key to dest.
+        Returns False on a miss (the caller synthesizes and calls store).
+        """
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, dest)
+            os.utime(path)
+            size = path.stat().st_size
+        except OSError:
+            self._record_miss(key)
+            return False
+        self._record_hit(key, size)
+        return True
+
+    def _record_miss(self, key: str) -> None:
+        with self._lock:
+            self.misses += 1
+            size = self._index.pop(key, None)
+            if size is not None:
+                self._total_bytes -= size
+
+    def _record_hit(self, key: str, size: int) -> None:
+        with self._lock:
+            self.hits += 1
+            if key not in self._index:
+                # Written by another process since we started
+                self._index[key] = size
+                self._total_bytes += size
+            self._index.move_to_end(key)
+
+    def write(self, key: str, data: bytes) -> None:
+        """Add freshly synthesized audio bytes to the cache"""
+        self._put(key, lambda tmp_path: tmp_path.write_bytes(data))
+
+    def store(self, key: str, src: Path) -> None:
+        """Add a freshly synthesized file to the cache"""
+        self._put(key, lambda tmp_path: shutil.copyfile(src, tmp_path))
+
+    def _put(self, key: str, writer) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Could not cache TTS segment {key[:12]}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            old_size = self._index.pop(key, None)
+            if old_size is not None:
+                self._total_bytes -= old_size
+            self._index[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """Hit-rate and size figures for monitoring"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions
+            }
+
+
+# Singleton
+_tts_cache = None
+
+def get_tts_cache() -> TTSCache:
+    """Get or create TTS cache singleton"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache(
+            cache_dir=os.getenv("TTS_CACHE_DIR", "cache/tts"),
+            max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024
+        )
+    return _tts_cache
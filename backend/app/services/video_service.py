@@ -9,6 +9,8 @@ import os
 from typing import Optional
 import logging
 
+from app.metrics import external_call
+
 logger = logging.getLogger(__name__)
 
 class VideoGenerationService:
@@ -96,8 +98,9 @@ class VideoGenerationService:
         )
         
         # Download and save
-        response = requests.get(image_url, timeout=60)
-        response.raise_for_status()
+        with external_call("image"):
+            response = requests.get(image_url, timeout=60)
+            response.raise_for_status()
         
         filename = f"scene_{scene_id or 'temp'}_video.jpg"
         filepath = os.path.join(self.video_dir, filename)
@@ -144,8 +147,9 @@ class VideoGenerationService:
                 f"&nologo=true"
             )
             
-            response = requests.get(image_url, timeout=60)
-            response.raise_for_status()
+            with external_call("image"):
+                response = requests.get(image_url, timeout=60)
+                response.raise_for_status()
             
             filename = f"chapter_{chapter_id}_reel.jpg"
             filepath = os.path.join(self.video_dir, filename)
@@ -24,6 +24,7 @@ from sqlmodel import Session, select
 from app.db import engine
 from app.models import Story, Chapter, Scene
 from app.services.enhanced_audio_service import get_enhanced_audio_service
+from app.services.tts_cache import get_tts_cache
 
 
 async def main():
@@ -131,6 +132,9 @@ async def main():
         if total_errors > 0:
             print(f"   ❌ Errors: {total_errors} files")
         print(f"   📁 Location: static/audio/")
+        cache_stats = get_tts_cache().stats()
+        print(f"   ♻️  TTS cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+              f"({cache_stats['hit_ratio']:.0%} reused)")
         print(f"\n🎧 Audio Features:")
         print(f"   • Character-specific emotions")
         print(f"   • Natural dialogue flow")
@@ -0,0 +1,33 @@
+"""
+Backfill per-story completion from existing scene progress
+
+Rebuilds UserStoryProgress from UserSceneProgress so readers who completed
+scenes before story tracking existed get their story completion (and the
+badges that depend on it on their next completed scene). Safe to re-run.
+
+Usage (from backend/):
+    python scripts/backfill_story_progress.py [--user-id 42]
+"""
+
+import argparse
+import sys
+sys.path.insert(0, '.')
+
+from sqlmodel import Session
+from app.db import engine, create_db_and_tables
+from app.services.gamification_service import rebuild_story_progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        rows = rebuild_story_progress(session, user_id=args.user_id)
+    print(f"Rebuilt {rows} story progress rows")
+
+
+if __name__ == "__main__":
+    main()
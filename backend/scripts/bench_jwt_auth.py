@@ -0,0 +1,85 @@
+"""
+JWT auth overhead microbenchmark.
+
+Compares per-request authentication cost with and without the verified-token
+cache in app.jwt_auth:
+- verify_token() alone (the work get_current_user_id does per request)
+- full GET /api/users/me round trips through the app in-process
+
+Usage (from backend/):
+    python scripts/bench_jwt_auth.py [--iterations 20000] [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT auth overhead microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_jwt.db"
+
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+    from app import jwt_auth
+    from app.db import engine, create_db_and_tables
+    from app.main import app
+    from app.models import User
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        user = User(name="Bench", email="bench@katha.app", username="bench")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        user_id = user.id
+
+    token = jwt_auth.create_access_token(user_id, "bench@katha.app").access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    cache = jwt_auth.token_cache
+    cache_size = cache.max_entries
+
+    def uncached_verify():
+        cache.clear()
+        jwt_auth.verify_token(token)
+
+    assert jwt_auth.verify_token(token).user_id == user_id
+    cached = per_call_us(lambda: jwt_auth.verify_token(token), args.iterations)
+    uncached = per_call_us(uncached_verify, args.iterations)
+    print(f"verify_token: uncached {uncached:.1f} us, cached {cached:.1f} us "
+          f"({uncached / cached:.0f}x)")
+
+    with TestClient(app) as client:
+        def me():
+            assert client.get("/api/users/me", headers=headers).status_code == 200
+
+        for _ in range(50):  # warm up
+            me()
+        cache.max_entries = 0
+        cache.clear()
+        uncached_req = per_call_us(me, args.requests)
+        cache.max_entries = cache_size
+        cached_req = per_call_us(me, args.requests)
+
+    print(f"GET /api/users/me: uncached {uncached_req:.0f} us, cached {cached_req:.0f} us per request "
+          f"(auth saves ~{uncached_req - cached_req:.0f} us)")
+    print(f"Token cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Leaderboard benchmark on synthetic data.
+
+Fills a throwaway SQLite database with --users readers (long-tailed XP,
+mostly short streaks, a fraction with progress in one story), then measures:
+- building each rank index from the database
+- top-10 and "my rank" through GET /api/leaderboard/... in-process
+- the ORDER BY / COUNT(*) queries the index replaces, for comparison
+It also completes a scene for a random reader and checks that their rank
+moved incrementally to what a full COUNT(*) says.
+
+Usage (from backend/):
+    python scripts/bench_leaderboard.py [--users 1000000] [--requests 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, '.')
+
+
+def percentiles_ms(samples):
+    samples = sorted(samples)
+    return (samples[len(samples) // 2] * 1e3, samples[int(len(samples) * 0.99)] * 1e3)
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles_ms(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leaderboard benchmark on synthetic data")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_leaderboard.db"
+    os.environ["LEADERBOARD_REFRESH_SECONDS"] = "3600"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from sqlmodel import Session
+    from app import jwt_auth
+    from app.db import engine, create_db_and_tables
+    from app.main import app
+    from app.models import Story, Chapter, Scene
+    from app.services.gamification_service import complete_scene
+    from app.services.leaderboard_service import leaderboards, story_board, BOARD_XP, BOARD_STREAK
+
+    create_db_and_tables()
+    rng = random.Random(42)
+
+    with Session(engine) as session:
+        story = Story(title="Bench", slug="bench", total_scenes=40)
+        session.add(story)
+        session.commit()
+        chapter = Chapter(story_id=story.id, index=1, title="One")
+        session.add(chapter)
+        session.commit()
+        session.add_all([Scene(chapter_id=chapter.id, index=i, raw_text=f"Scene {i}") for i in range(1, 41)])
+        session.commit()
+        story_id = story.id
+        scene_ids = [row[0] for row in session.exec(text("SELECT id FROM scene ORDER BY id")).all()]
+
+    start = time.perf_counter()
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        batch, progress = [], []
+        for user_id in range(1, args.users + 1):
+            scenes = min(int(rng.paretovariate(1.1)) - 1, 400)
+            streak = min(int(rng.expovariate(0.3)), 365) if rng.random() < 0.4 else 0
+            batch.append((f"Reader {user_id}", now, scenes * 25, streak, streak, scenes))
+            if scenes and rng.random() < 0.2:
+                progress.append((user_id, story_id, min(scenes, 40), scenes >= 40))
+            if len(batch) == 50_000:
+                conn.exec_driver_sql(
+                    "INSERT INTO user (name, created_at, total_xp, current_streak_days, longest_streak_days, stories_read) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.exec_driver_sql(
+                "INSERT INTO user (name, created_at, total_xp, current_streak_days, longest_streak_days, stories_read) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch)
+        conn.exec_driver_sql(
+            "INSERT INTO userstoryprogress (user_id, story_id, scenes_completed, completed) VALUES (?, ?, ?, ?)",
+            progress)
+    print(f"Inserted {args.users} users ({len(progress)} with story progress) in {time.perf_counter() - start:.1f}s")
+
+    for board in (BOARD_XP, BOARD_STREAK, story_board(story_id)):
+        start = time.perf_counter()
+        leaderboards._build(board)
+        print(f"Built {board} index in {time.perf_counter() - start:.2f}s")
+
+    with engine.connect() as conn:
+        def naive_top():
+            conn.exec_driver_sql("SELECT id, total_xp FROM user ORDER BY total_xp DESC, id LIMIT 10").all()
+
+        def naive_rank():
+            xp = rng.randrange(0, 2000)
+            conn.exec_driver_sql(
+                "SELECT COUNT(*) FROM user WHERE total_xp > ? OR (total_xp = ? AND id < ?)",
+                (xp, xp, rng.randrange(1, args.users))).one()
+
+        iterations = max(3, min(20, args.requests // 100))
+        p50, p99 = timed(naive_top, iterations)
+        print(f"ORDER BY top-10 (no index):   p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+        p50, p99 = timed(naive_rank, iterations)
+        print(f"COUNT(*) my-rank (no index):  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+    user_ids = [rng.randrange(1, args.users + 1) for _ in range(64)]
+    tokens = {user_id: jwt_auth.create_access_token(user_id, f"r{user_id}@katha.app").access_token for user_id in user_ids}
+
+    with TestClient(app) as client:
+        def get(path, user_id=None):
+            headers = {"Authorization": f"Bearer {tokens[user_id]}"} if user_id else {}
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+            return response.json()
+
+        for path in ("/api/leaderboard/xp", "/api/leaderboard/streak", f"/api/leaderboard/stories/{story_id}"):
+            p50, p99 = timed(lambda: get(f"{path}?limit=10"), args.requests)
+            print(f"GET {path:<33} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+            p50, p99 = timed(lambda: get(f"{path}/me", rng.choice(user_ids)), args.requests)
+            print(f"GET {path + '/me':<33} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+        # Incremental update: the rank after a completion must match a full count
+        user_id = user_ids[0]
+        before = get("/api/leaderboard/xp/me", user_id)
+        with Session(engine) as session:
+            done = {row[0] for row in session.exec(
+                text("SELECT scene_id FROM usersceneprogress WHERE user_id = :u").bindparams(u=user_id)).all()}
+            complete_scene(session, user_id, next(s for s in scene_ids if s not in done))
+        after = get("/api/leaderboard/xp/me", user_id)
+        with engine.connect() as conn:
+            expected = conn.exec_driver_sql(
+                "SELECT COUNT(*) FROM user WHERE total_xp > 0 AND (total_xp > ? OR (total_xp = ? AND id < ?))",
+                (after["score"], after["score"], user_id)).scalar() + 1
+        print(f"Reader {user_id}: rank {before['rank']} -> {after['rank']} "
+              f"(score {before['score']} -> {after['score']}, full count says {expected})")
+        if after["rank"] != expected:
+            print("FAILED: incremental rank differs from a full count")
+            sys.exit(1)
+
+    print(f"Leaderboards: {leaderboards.stats()}")
+
+
+if __name__ == "__main__":
+    main()
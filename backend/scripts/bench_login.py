@@ -0,0 +1,112 @@
+"""
+Login throughput benchmark.
+
+Creates a throwaway database with one user, then fires concurrent
+POST /api/users/login requests at the app in-process for a fixed duration and
+reports logins/second overall and per bcrypt core. While the logins run, it
+samples event-loop lag to show that hashing stays off the loop.
+
+The second phase stores the user's hash at a different cost and checks that
+the next login upgrades it to BCRYPT_ROUNDS.
+
+Usage (from backend/):
+    python scripts/bench_login.py [--rounds 12] [--concurrency 16] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+EMAIL = "bench@katha.app"
+PASSWORD = "correct horse battery staple"
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def run(args):
+    import httpx
+    from sqlmodel import Session, select
+    from app import auth
+    from app.db import engine, create_db_and_tables
+    from app.main import app
+    from app.models import User
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        session.add(User(name="Bench", email=EMAIL, username="bench", password_hash=auth.hash_password(PASSWORD)))
+        session.commit()
+
+    cores = min(auth.BCRYPT_WORKERS, os.cpu_count() or 1)
+    print(f"bcrypt rounds={auth.BCRYPT_ROUNDS}, pool={auth.BCRYPT_WORKERS} threads, {os.cpu_count()} CPUs")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login() -> int:
+            resp = await client.post("/api/users/login", json={"email": EMAIL, "password": PASSWORD})
+            return resp.status_code
+
+        assert await login() == 200
+
+        done = 0
+        deadline = time.perf_counter() + args.seconds
+
+        async def worker():
+            nonlocal done
+            while time.perf_counter() < deadline:
+                assert await login() == 200
+                done += 1
+
+        stop = asyncio.Event()
+        lag = []
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lag))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await lag_task
+
+        rate = done / elapsed
+        print(f"{done} logins in {elapsed:.1f}s with {args.concurrency} concurrent clients")
+        print(f"  {rate:.1f} logins/s total, {rate / cores:.1f} logins/s per core")
+        print(f"  event-loop lag: max {max(lag) * 1000:.1f} ms, mean {sum(lag) / len(lag) * 1000:.2f} ms")
+
+        # Rehash on login when the stored cost differs
+        old_rounds = max(4, auth.BCRYPT_ROUNDS - 2)
+        with Session(engine) as session:
+            user = session.exec(select(User).where(User.email == EMAIL)).one()
+            user.password_hash = auth.hash_password(PASSWORD, rounds=old_rounds)
+            session.add(user)
+            session.commit()
+        assert await login() == 200
+        with Session(engine) as session:
+            stored = session.exec(select(User).where(User.email == EMAIL)).one().password_hash
+        upgraded = auth.hash_cost(stored) == auth.BCRYPT_ROUNDS
+        print(f"Rehash on login: cost {old_rounds} -> {auth.hash_cost(stored)} ({'OK' if upgraded else 'FAILED'})")
+        if not upgraded:
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_login.db"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Before/after query plans for the foreign-key and composite indexes.
+
+Builds a throwaway SQLite database shaped like an old katha.db: the schema
+without the indexes added to models.py, plus a few duplicate progress,
+badge and favorite rows. It then runs the hot lookups (ordered chapter and
+scene listings, progress, badges, favorites) and prints each query's
+EXPLAIN QUERY PLAN and mean latency. Then it migrates the database with
+app.db.ensure_indexes() and prints the same again.
+
+Usage (from backend/):
+    python scripts/bench_schema_indexes.py [--users 5000] [--scenes-per-user 100]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, '.')
+
+STORIES = 50
+CHAPTERS_PER_STORY = 8
+SCENES_PER_CHAPTER = 25
+
+NEW_INDEXES = (
+    "ix_chapter_story_index",
+    "ix_scene_chapter_index",
+    "ix_usersceneprogress_user_scene",
+    "ix_userbadge_user_badge",
+    "ix_userfavoritestory_user_story",
+)
+
+QUERIES = {
+    "chapters of story": ('SELECT * FROM chapter WHERE story_id = ? ORDER BY "index"', lambda r, n: (r.randint(1, STORIES),)),
+    "scenes of chapter": ('SELECT * FROM scene WHERE chapter_id = ? ORDER BY "index"',
+                          lambda r, n: (r.randint(1, STORIES * CHAPTERS_PER_STORY),)),
+    "progress lookup": ("SELECT * FROM usersceneprogress WHERE user_id = ? AND scene_id = ?",
+                        lambda r, n: (r.randint(1, n), r.randint(1, STORIES * CHAPTERS_PER_STORY * SCENES_PER_CHAPTER))),
+    "user's progress": ("SELECT scene_id FROM usersceneprogress WHERE user_id = ? AND completed = 1",
+                        lambda r, n: (r.randint(1, n),)),
+    "user's badges": ("SELECT badge_id FROM userbadge WHERE user_id = ?", lambda r, n: (r.randint(1, n),)),
+    "user's favorites": ("SELECT story.* FROM story JOIN userfavoritestory ON userfavoritestory.story_id = story.id "
+                         "WHERE userfavoritestory.user_id = ?", lambda r, n: (r.randint(1, n),)),
+}
+
+
+def run(conn, users, iterations, rng):
+    results = {}
+    for label, (sql, params) in QUERIES.items():
+        plan = "; ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params(rng, users)).all())
+        start = time.perf_counter()
+        for _ in range(iterations):
+            conn.exec_driver_sql(sql, params(rng, users)).all()
+        results[label] = ((time.perf_counter() - start) / iterations * 1e3, plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Before/after query plans for the schema indexes")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--scenes-per-user", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_indexes.db"
+
+    from sqlmodel import SQLModel
+    from app import models  # noqa: F401  (registers the tables)
+    from app.db import engine, ensure_indexes
+
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    scene_count = STORIES * CHAPTERS_PER_STORY * SCENES_PER_CHAPTER
+
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        conn.exec_driver_sql(
+            "INSERT INTO story (title, slug, total_chapters, total_scenes) VALUES (?, ?, ?, ?)",
+            [(f"Story {s}", f"story-{s}", CHAPTERS_PER_STORY, CHAPTERS_PER_STORY * SCENES_PER_CHAPTER)
+             for s in range(1, STORIES + 1)])
+        conn.exec_driver_sql(
+            'INSERT INTO chapter (story_id, "index", title) VALUES (?, ?, ?)',
+            [(s, c, f"Chapter {c}") for s in range(1, STORIES + 1) for c in range(1, CHAPTERS_PER_STORY + 1)])
+        conn.exec_driver_sql(
+            'INSERT INTO scene (chapter_id, "index", raw_text) VALUES (?, ?, ?)',
+            [(c, i, "text") for c in range(1, STORIES * CHAPTERS_PER_STORY + 1) for i in range(1, SCENES_PER_CHAPTER + 1)])
+        conn.exec_driver_sql(
+            "INSERT INTO user (name, created_at, total_xp, current_streak_days, longest_streak_days, stories_read) "
+            "VALUES (?, ?, 0, 0, 0, 0)", [(f"Reader {u}", now) for u in range(1, args.users + 1)])
+        conn.exec_driver_sql(
+            "INSERT INTO badge (code, name) VALUES (?, ?)", [(f"BADGE_{b}", f"Badge {b}") for b in range(1, 11)])
+        progress, badges, favorites = [], [], []
+        for user_id in range(1, args.users + 1):
+            for scene_id in rng.sample(range(1, scene_count + 1), args.scenes_per_user):
+                progress.append((user_id, scene_id, True, now, 25))
+            badges += [(user_id, badge_id, now) for badge_id in rng.sample(range(1, 11), 3)]
+            favorites += [(user_id, story_id, now) for story_id in rng.sample(range(1, STORIES + 1), 2)]
+        # Double taps the old schema let through
+        progress += [(u, s, False, None, 0) for u, s, *_ in rng.sample(progress, 50)]
+        badges += rng.sample(badges, 20)
+        favorites += rng.sample(favorites, 20)
+        rng.shuffle(progress)
+        conn.exec_driver_sql(
+            "INSERT INTO usersceneprogress (user_id, scene_id, completed, completed_at, xp_earned) VALUES (?, ?, ?, ?, ?)",
+            progress)
+        conn.exec_driver_sql("INSERT INTO userbadge (user_id, badge_id, earned_at) VALUES (?, ?, ?)", badges)
+        conn.exec_driver_sql("INSERT INTO userfavoritestory (user_id, story_id, created_at) VALUES (?, ?, ?)", favorites)
+    print(f"{args.users} users, {scene_count} scenes, {len(progress)} progress rows (50 duplicates)")
+
+    with engine.connect() as conn:
+        before = run(conn, args.users, args.iterations, random.Random(7))
+
+    start = time.perf_counter()
+    created = ensure_indexes(engine)
+    print(f"Migrated in {time.perf_counter() - start:.2f}s, created: {', '.join(created)}")
+
+    with engine.connect() as conn:
+        after = run(conn, args.users, args.iterations, random.Random(7))
+        incomplete_dupes = conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM usersceneprogress WHERE completed = 0").scalar()
+        rows = conn.exec_driver_sql("SELECT COUNT(*) FROM usersceneprogress").scalar()
+    print(f"Progress rows after migration: {rows} ({incomplete_dupes} incomplete duplicates kept)\n")
+
+    for label in QUERIES:
+        (before_ms, before_plan), (after_ms, after_plan) = before[label], after[label]
+        print(f"{label}: {before_ms:.3f} ms -> {after_ms:.3f} ms ({before_ms / after_ms:.0f}x)")
+        print(f"  before: {before_plan}")
+        print(f"  after:  {after_plan}")
+
+    if incomplete_dupes or rows != len(progress) - 50 or set(created) != set(NEW_INDEXES):
+        print("FAILED: migration did not dedupe progress or create every index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Full-text search and reseed benchmark.
+
+Builds a throwaway SQLite database seeded with stories.json copied --copies
+times (each copy under its own slug), then:
+  - times FTS5 searches (GET /api/stories/search and ?q= on the list)
+    against the old ILIKE scan for a few queries, Latin and Devanagari;
+  - times a no-op reseed, a reseed with one edited scene, and checks that
+    the edit kept the scene's id and generated video URL and that the
+    search index picked up the new text;
+  - checks that search responses revalidate with 304 and that distinct
+    search strings add nothing to the story cache.
+
+Usage (from backend/):
+    python scripts/bench_search.py [--copies 100] [--repeat 50]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+QUERIES = ("rama", "hanuman ocean", "forest", "राम")
+
+
+def build_corpus(copies):
+    from app.services.seed_service import load_stories_json
+    base = load_stories_json()
+    corpus = []
+    for n in range(copies):
+        for story in base:
+            story = copy.deepcopy(story)
+            story["slug"] = f"{story['slug']}-{n}"
+            story["title"] = f"{story['title']} {n}"
+            corpus.append(story)
+    return corpus
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search and reseed benchmark")
+    parser.add_argument("--copies", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_search.db"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import or_
+    from sqlmodel import Session, select
+    from app.db import engine, create_db_and_tables
+    from app.main import app
+    from app.models import Scene
+    from app.services.search_service import search
+    from app.services.seed_service import seed_stories
+    from app.services.story_cache import story_cache
+
+    create_db_and_tables()
+    corpus = build_corpus(args.copies)
+    failed = False
+
+    with Session(engine) as session:
+        seed_ms, results = timed(lambda: seed_stories(session, corpus), 1)
+        print(f"Initial seed: {results['stories_created']} stories, {results['scenes_created']} scenes "
+              f"in {seed_ms:.0f} ms")
+
+        for q in QUERIES:
+            fts_ms, hits = timed(lambda: search(session, q, 20), args.repeat)
+            pattern = f"%{q}%"
+            like_ms, rows = timed(lambda: session.exec(
+                select(Scene.id).where(or_(Scene.raw_text.ilike(pattern), Scene.reel_script.ilike(pattern)))
+            ).all(), args.repeat)
+            print(f"{q!r:>16}: fts {fts_ms:6.2f} ms ({len(hits)} hits), ilike scan {like_ms:6.2f} ms ({len(rows)} rows)")
+            if hits:
+                print(f"{'':>18}{hits[0]['kind']} {hits[0]['id']}: {(hits[0]['title'] or hits[0]['snippet'])[:70]}")
+
+        noop_ms, noop = timed(lambda: seed_stories(session, corpus), 1)
+        changed = noop["stories_created"] + noop["stories_updated"]
+        print(f"No-op reseed: {noop_ms:.0f} ms, {noop['stories_unchanged']} unchanged, {changed} changed")
+        failed |= bool(changed)
+
+        # Edit one scene that already has a generated video
+        scene = session.exec(select(Scene).order_by(Scene.id)).first()
+        scene.ai_video_url = "/static/videos/bench.mp4"
+        session.add(scene)
+        session.commit()
+        scene_id = scene.id
+        corpus[0]["chapters"][0]["scenes"][0]["raw_text"] = "Zyzzyva the bench marker walks into the forest"
+        edit_ms, edited = timed(lambda: seed_stories(session, corpus), 1)
+        session.expire_all()
+        scene = session.get(Scene, scene_id)
+        hits = search(session, "zyzzyva", 5)
+        print(f"One-scene reseed: {edit_ms:.0f} ms, {edited['scenes_updated']} scene updated, "
+              f"video kept: {scene.ai_video_url == '/static/videos/bench.mp4'}, "
+              f"indexed: {[hit['id'] for hit in hits] == [scene_id]}")
+        failed |= (edited["scenes_updated"] != 1 or scene.ai_video_url != "/static/videos/bench.mp4"
+                   or [hit["id"] for hit in hits] != [scene_id])
+
+    with TestClient(app) as client:
+        client.get("/api/stories/")
+        entries = story_cache.stats()["entries"]
+        for path in ("/api/stories/search", "/api/stories/"):
+            request_ms, response = timed(lambda: client.get(path, params={"q": "rama"}), args.repeat)
+            assert response.status_code == 200, response.text
+            revalidated = client.get(path, params={"q": "rama"}, headers={"If-None-Match": response.headers["etag"]})
+            print(f"GET {path}?q=rama: {request_ms:.2f} ms ({len(response.json())} results, uncached), "
+                  f"revalidation {revalidated.status_code}")
+            failed |= revalidated.status_code != 304
+        for i in range(100):
+            client.get("/api/stories/search", params={"q": f"rama{i}"})
+            client.get("/api/stories/", params={"q": f"sita{i}"})
+        print(f"Story cache entries after 200 distinct searches: {entries} -> {story_cache.stats()['entries']}")
+        failed |= story_cache.stats()["entries"] != entries
+
+    if failed:
+        print("FAILED: reseed changed rows it should not have, lost the edit, or searches were cached")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
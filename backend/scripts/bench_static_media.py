@@ -0,0 +1,150 @@
+"""
+/static serving benchmark: StaticFiles vs MediaFiles.
+
+Builds a throwaway static directory with a uniquely named MP3 and MP4, a
+fixed-name JPG and a JSON asset (precompressed with
+scripts/precompress_static.py), mounts it with plain StaticFiles and with
+app.media.MediaFiles, and compares:
+  - full-file download throughput;
+  - audio seeking (64 KB Range requests at random offsets), in latency and
+    bytes transferred;
+  - bytes transferred for the JSON asset with Accept-Encoding: gzip.
+It also checks the response semantics: cache headers, 206 bodies, 416,
+If-Range and 304 revalidation.
+
+Usage (from backend/):
+    python scripts/bench_static_media.py [--size-mb 8] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+SEEK_BYTES = 64 * 1024
+
+
+def build_static(directory, size_mb):
+    rng = random.Random(42)
+    os.makedirs(os.path.join(directory, "audio"))
+    os.makedirs(os.path.join(directory, "videos"))
+    os.makedirs(os.path.join(directory, "images"))
+    files = {
+        "audio": "audio/scene_100_14a12b0a.mp3",
+        "video": "videos/scene_100_video_1768400641463.mp4",
+        "image": "images/scene_100_video.jpg",
+        "json": "images/manifest.json",
+    }
+    for key, size in (("audio", size_mb), ("video", size_mb * 2), ("image", 1)):
+        with open(os.path.join(directory, files[key]), "wb") as f:
+            f.write(rng.randbytes(size * 2**20))
+    with open(os.path.join(directory, files["json"]), "w", encoding="utf-8") as f:
+        json.dump([{"scene_id": i, "audio": f"/static/audio/scene_{i}_14a12b0a.mp3", "emotion": "shanta"}
+                   for i in range(20000)], f)
+    subprocess.run([sys.executable, "scripts/precompress_static.py", "--static-dir", directory],
+                   check=True, capture_output=True)
+    return files
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/static serving benchmark")
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.testclient import TestClient
+    from app.media import IMMUTABLE_CACHE_CONTROL, MEDIA_CACHE_CONTROL, MediaFiles
+
+    directory = tempfile.mkdtemp()
+    files = build_static(directory, args.size_mb)
+    with open(os.path.join(directory, files["audio"]), "rb") as f:
+        audio = f.read()
+
+    clients = {}
+    for label, mount in (("StaticFiles", StaticFiles), ("MediaFiles", MediaFiles)):
+        app = FastAPI()
+        app.mount("/static", mount(directory=directory), name="static")
+        clients[label] = TestClient(app)
+
+    rng = random.Random(7)
+    offsets = [rng.randrange(0, len(audio) - SEEK_BYTES) for _ in range(args.repeat)]
+    for label, client in clients.items():
+        full_s, response = timed(lambda: client.get(f"/static/{files['video']}"), args.repeat)
+        mb = len(response.content) / 2**20
+        seeks = iter(offsets * 2)
+
+        def seek():
+            start = next(seeks)
+            return client.get(f"/static/{files['audio']}", headers={"Range": f"bytes={start}-{start + SEEK_BYTES - 1}"})
+        seek_s, response = timed(seek, args.repeat)
+        json_response = client.get(f"/static/{files['json']}", headers={"Accept-Encoding": "gzip"})
+        wire = int(json_response.headers.get("content-length", len(json_response.content)))
+        print(f"{label:>11}: full {mb:.0f} MB in {full_s * 1e3:6.1f} ms ({mb / full_s:6.0f} MB/s); "
+              f"seek {seek_s * 1e3:6.2f} ms, {len(response.content) / 1024:7.0f} KB ({response.status_code}); "
+              f"json {wire / 1024:6.0f} KB on the wire")
+
+    client = clients["MediaFiles"]
+    failed = []
+
+    def check(label, ok):
+        print(f"  {'ok ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failed.append(label)
+
+    print("MediaFiles semantics:")
+    response = client.get(f"/static/{files['audio']}", headers={"Range": "bytes=1000-1999"})
+    check("206 returns exactly the requested bytes",
+          response.status_code == 206 and response.content == audio[1000:2000]
+          and response.headers["content-range"] == f"bytes 1000-1999/{len(audio)}")
+    response = client.get(f"/static/{files['audio']}", headers={"Range": "bytes=-500"})
+    check("suffix range returns the tail", response.status_code == 206 and response.content == audio[-500:])
+    response = client.get(f"/static/{files['audio']}", headers={"Range": f"bytes={len(audio)}-"})
+    check("range past the end is 416", response.status_code == 416
+          and response.headers["content-range"] == f"bytes */{len(audio)}")
+    response = client.get(f"/static/{files['audio']}")
+    etag = response.headers["etag"]
+    check("unique names are immutable", response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+          and response.headers["accept-ranges"] == "bytes" and response.content == audio)
+    check("fixed names revalidate",
+          client.get(f"/static/{files['image']}").headers["cache-control"] == MEDIA_CACHE_CONTROL)
+    response = client.get(f"/static/{files['audio']}", headers={"Range": "bytes=0-99", "If-Range": '"stale"'})
+    check("stale If-Range sends the whole file", response.status_code == 200 and len(response.content) == len(audio))
+    response = client.get(f"/static/{files['audio']}", headers={"Range": "bytes=0-99", "If-Range": etag})
+    check("current If-Range honours the range", response.status_code == 206 and len(response.content) == 100)
+    response = client.get(f"/static/{files['audio']}", headers={"If-None-Match": etag})
+    check("If-None-Match revalidates with 304", response.status_code == 304)
+    with open(os.path.join(directory, files["json"]), "rb") as f:
+        manifest = f.read()
+    response = client.get(f"/static/{files['json']}", headers={"Accept-Encoding": "gzip"})
+    check("precompressed JSON is sent gzip-encoded",
+          response.headers.get("content-encoding") == "gzip" and response.content == manifest
+          and response.headers["content-type"].startswith("application/json")
+          and response.headers.get("vary") == "Accept-Encoding")
+    response = client.get(f"/static/{files['json']}", headers={"Accept-Encoding": "identity"})
+    check("identity clients get the original", "content-encoding" not in response.headers
+          and response.content == manifest)
+    check("gzip variant decompresses to the source",
+          gzip.decompress(open(os.path.join(directory, files["json"] + ".gz"), "rb").read()) == manifest)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
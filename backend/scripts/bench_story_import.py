@@ -0,0 +1,153 @@
+"""
+Streaming story import benchmark.
+
+Writes a synthetic corpus (--stories stories of --chapters chapters with
+--scenes scenes each, with Devanagari text) as a JSON array and as JSON
+Lines, then:
+  - compares peak Python memory of json.load against iter_stories;
+  - imports the array into a throwaway SQLite database with
+    import_stories, interrupting it part-way and resuming from the
+    checkpoint, and checks that every story and scene landed exactly once;
+  - re-imports the JSON Lines copy, which must change nothing.
+
+Usage (from backend/):
+    python scripts/bench_story_import.py [--stories 1000] [--chapters 4] [--scenes 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, '.')
+
+TEXT = ("Arjuna lowered his bow as the conch shells sounded across Kurukshetra. "
+        "धर्मक्षेत्रे कुरुक्षेत्रे समवेता युयुत्सवः। ") * 4
+
+
+def story(n, chapters, scenes):
+    return {
+        "slug": f"corpus-{n}",
+        "title": f"Corpus Story {n}",
+        "description": TEXT,
+        "category": "Epic",
+        "chapters": [
+            {
+                "index": c,
+                "title": f"Parva {c}",
+                "short_summary": TEXT[:120],
+                "scenes": [{"index": i, "raw_text": TEXT, "reel_script": TEXT, "emotion": "vira"}
+                           for i in range(1, scenes + 1)]
+            }
+            for c in range(1, chapters + 1)
+        ]
+    }
+
+
+def write_corpus(directory, args):
+    array_path = os.path.join(directory, "corpus.json")
+    lines_path = os.path.join(directory, "corpus.jsonl")
+    with open(array_path, "w", encoding="utf-8") as array, open(lines_path, "w", encoding="utf-8") as lines:
+        array.write("[\n")
+        for n in range(args.stories):
+            data = json.dumps(story(n, args.chapters, args.scenes), ensure_ascii=False)
+            array.write(("  " if n == 0 else ",\n  ") + data)
+            lines.write(data + "\n")
+        array.write("\n]\n")
+    return array_path, lines_path
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming story import benchmark")
+    parser.add_argument("--stories", type=int, default=1000)
+    parser.add_argument("--chapters", type=int, default=4)
+    parser.add_argument("--scenes", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/bench_import.db"
+
+    from sqlmodel import Session, func, select
+    from app.db import engine, create_db_and_tables
+    from app.models import Scene, Story
+    from app.services.seed_service import import_stories, iter_stories
+
+    array_path, lines_path = write_corpus(directory, args)
+    size_mb = os.path.getsize(array_path) / 2**20
+    total_scenes = args.stories * args.chapters * args.scenes
+    print(f"Corpus: {args.stories} stories, {total_scenes} scenes, {size_mb:.0f} MB")
+
+    def load_all():
+        with open(array_path, encoding="utf-8") as f:
+            return len(json.load(f))
+
+    for label, fn in (
+        ("json.load", load_all),
+        ("iter_stories (array)", lambda: sum(1 for _ in iter_stories(array_path))),
+        ("iter_stories (lines)", lambda: sum(1 for _ in iter_stories(lines_path))),
+    ):
+        count, peak, elapsed = peak_mb(fn)
+        print(f"{label:>22}: {count} stories, peak {peak:7.1f} MB, {elapsed:.2f}s")
+
+    create_db_and_tables()
+    failed = False
+
+    class Interrupted(Exception):
+        pass
+
+    class FlakySession(Session):
+        """Dies after a few commits, like a killed import"""
+        commits_left = max(args.stories // args.batch_size // 2, 1)
+
+        def commit(self):
+            if FlakySession.commits_left == 0:
+                raise Interrupted()
+            FlakySession.commits_left -= 1
+            super().commit()
+
+    try:
+        with FlakySession(engine) as session:
+            import_stories(session, array_path, batch_size=args.batch_size)
+    except Interrupted:
+        pass
+    with Session(engine) as session:
+        done = session.exec(select(func.count()).select_from(Story)).one()
+    print(f"Interrupted after {done} stories, checkpoint: {os.path.exists(array_path + '.checkpoint')}")
+
+    with Session(engine) as session:
+        results, peak, elapsed = peak_mb(lambda: import_stories(session, array_path, batch_size=args.batch_size))
+        stories = session.exec(select(func.count()).select_from(Story)).one()
+        scenes = session.exec(select(func.count()).select_from(Scene)).one()
+    print(f"Resumed: {results['stories_imported'] - done} more stories in {elapsed:.1f}s, peak {peak:.1f} MB; "
+          f"database has {stories} stories, {scenes} scenes")
+    failed |= stories != args.stories or scenes != total_scenes or os.path.exists(array_path + ".checkpoint")
+
+    with Session(engine) as session:
+        results, peak, elapsed = peak_mb(lambda: import_stories(session, lines_path, batch_size=args.batch_size))
+    changed = results["stories_created"] + results["stories_updated"]
+    print(f"Re-import (JSON Lines): {results['stories_unchanged']} unchanged, {changed} changed "
+          f"in {elapsed:.1f}s, peak {peak:.1f} MB")
+    failed |= bool(changed)
+
+    if failed:
+        print("FAILED: resumed import lost or duplicated rows, or the re-import changed rows")
+        sys.exit(1)
+    print("OK: every story and scene imported exactly once")
+
+
+if __name__ == "__main__":
+    main()
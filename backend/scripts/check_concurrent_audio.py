@@ -0,0 +1,180 @@
+"""
+Offline check for concurrent segment synthesis in EnhancedAudioService.
+
+Swaps edge_tts.Communicate for a fake that sleeps instead of calling the
+network, then verifies that segments:
+- run concurrently (total time ~ slowest segment, not the sum)
+- come back in their original order
+- are retried individually when a synthesis attempt fails
+- are served from the TTS cache when synthesized again
+and that assembly decodes all segments with one ffmpeg run and splits the
+PCM back at the right sample per segment (with a fake decoder built from
+synthetic MP3 frames), falling back to at most TTS_MAX_CONCURRENCY
+separate decodes when the segments can't be joined.
+
+Usage (from backend/):
+    python scripts/check_concurrent_audio.py
+"""
+
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, '.')
+
+from app.services.enhanced_audio_service import EnhancedAudioService, mp3_frames
+from app.services.tts_cache import TTSCache
+
+SEGMENT_DELAY = 0.2
+
+# MPEG-2 Layer III, 48 kbps, 24 kHz, mono (Edge TTS's format): 144-byte frames of 576 samples
+LSF_HEADER = bytes([0xFF, 0xF3, 0x64, 0xC4])
+# Same at 22.05 kHz
+LSF_22K_HEADER = bytes([0xFF, 0xF3, 0x60, 0xC4])
+
+
+def fake_mp3(marker: int, frames: int, header: bytes = LSF_HEADER, id3: bool = False, xing: bool = False) -> bytes:
+    """Frames whose payload carries `marker`, which the fake decoder turns into sample values"""
+    length = 72 * 48000 // 24000
+    frame = header + bytes([marker]) * (length - len(header))
+    data = frame * frames
+    if xing:
+        data = header + b"\0" * 13 + b"Xing" + b"\0" * (length - 21) + data
+    if id3:
+        data = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\0" * 5 + data
+    return data
+
+
+def fake_decode(data: bytes) -> np.ndarray:
+    """Stand-in for ffmpeg: 576 samples per frame, valued by the frame's payload marker"""
+    joined, samples, _ = mp3_frames(data)
+    return np.repeat(np.frombuffer(joined[4::144], dtype=np.uint8).astype(np.int16), 576)
+
+
+def check_single_decode() -> bool:
+    ok = True
+    service = EnhancedAudioService(output_dir=tempfile.mkdtemp(), tts_cache=TTSCache(cache_dir=tempfile.mkdtemp()))
+    calls = []
+    service.decode_to_pcm = lambda data: calls.append(data) or fake_decode(data)
+
+    frame_counts = [3, 1, 7, 2]
+    segments = [fake_mp3(i + 1, n, id3=(i == 1), xing=(i == 2)) for i, n in enumerate(frame_counts)]
+    segments.insert(2, b"not audio at all")
+    pcm_segments, gains = service.decode_segments(segments, [1.0, 1.1, 9.9, 1.2, 1.3])
+    if len(calls) != 1:
+        print(f"FAILED: {len(calls)} decoder runs for one scene")
+        ok = False
+    if [len(pcm) for pcm in pcm_segments] != [n * 576 for n in frame_counts]:
+        print(f"FAILED: split lengths {[len(pcm) for pcm in pcm_segments]}")
+        ok = False
+    if any(set(pcm.tolist()) != {i + 1} for i, pcm in enumerate(pcm_segments)):
+        print("FAILED: PCM split at the wrong sample")
+        ok = False
+    if gains != [1.0, 1.1, 1.2, 1.3]:
+        print(f"FAILED: gains not kept in step with segments: {gains}")
+        ok = False
+
+    # Mixed sample rates can't be joined: separate decodes, bounded
+    active = peak = 0
+    lock = threading.Lock()
+
+    def slow_decode(data):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return fake_decode(data)
+
+    service.max_concurrency = 2
+    service.decode_to_pcm = slow_decode
+    mixed = [fake_mp3(1, 2, header=LSF_22K_HEADER)] + [fake_mp3(i, 2) for i in range(2, 12)]
+    if service.decode_segments(mixed, [1.0] * len(mixed)) is not None:
+        print("FAILED: mixed sample rates were decoded as one stream")
+        ok = False
+    pcm_segments, _ = asyncio.run(service._decode_segments_separately(mixed, [1.0] * len(mixed)))
+    if len(pcm_segments) != len(mixed):
+        print("FAILED: separate decodes lost segments")
+        ok = False
+    if peak > 2:
+        print(f"FAILED: {peak} decoder processes at once with a limit of 2")
+        ok = False
+    print(f"Single decode: 1 run for {len(frame_counts)} segments; fallback peak concurrency {peak}")
+    return ok
+
+
+class FakeCommunicate:
+    """Drop-in for edge_tts.Communicate that streams the text instead of speech"""
+
+    attempts = {}
+    flaky_texts = set()
+
+    def __init__(self, text, voice, rate="+0%", pitch="+0Hz", **kwargs):
+        self.text = text
+
+    async def stream(self):
+        count = FakeCommunicate.attempts.get(self.text, 0) + 1
+        FakeCommunicate.attempts[self.text] = count
+        await asyncio.sleep(SEGMENT_DELAY)
+        if self.text in FakeCommunicate.flaky_texts and count == 1:
+            raise ConnectionError("simulated TTS hiccup")
+        yield {"type": "audio", "data": self.text.encode("utf-8")}
+
+
+async def main():
+    segments = [
+        {'text': f"Segment number {i}", 'emotion': 'narrative', 'character': 'narrator', 'is_dialogue': False}
+        for i in range(8)
+    ]
+    FakeCommunicate.flaky_texts = {"Segment number 3"}
+
+    service = EnhancedAudioService(
+        output_dir=tempfile.mkdtemp(),
+        communicate_cls=FakeCommunicate,
+        max_concurrency=8,
+        retry_backoff=0.01,
+        tts_cache=TTSCache(cache_dir=tempfile.mkdtemp())
+    )
+
+    start = time.perf_counter()
+    audio = await service.synthesize_segments(segments, scene_id=1)
+    elapsed = time.perf_counter() - start
+    texts = [data.decode("utf-8") for data in audio]
+
+    serial_time = SEGMENT_DELAY * len(segments)
+    print(f"{len(audio)} segments in {elapsed:.2f}s (serial would be ~{serial_time:.2f}s)")
+
+    ok = True
+    if texts != [s['text'] for s in segments]:
+        print("FAILED: segment order not preserved")
+        ok = False
+    if FakeCommunicate.attempts["Segment number 3"] != 2:
+        print("FAILED: flaky segment was not retried exactly once")
+        ok = False
+    if elapsed > serial_time / 2:
+        print("FAILED: segments did not run concurrently")
+        ok = False
+
+    # A second run is served entirely from the TTS cache
+    attempts_before = sum(FakeCommunicate.attempts.values())
+    await service.synthesize_segments(segments, scene_id=2)
+    if sum(FakeCommunicate.attempts.values()) != attempts_before:
+        print("FAILED: repeated segments were re-synthesized")
+        ok = False
+    print(f"TTS cache: {service.tts_cache.stats()}")
+
+    ok = await asyncio.to_thread(check_single_decode) and ok
+
+    if not ok:
+        sys.exit(1)
+    print("OK: concurrent, ordered, retried, cached, decoded once")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
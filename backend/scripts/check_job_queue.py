@@ -0,0 +1,191 @@
+"""
+Offline check for the persistent generation job queue.
+
+Registers a stub job kind that sleeps instead of generating media, then
+verifies on a throwaway SQLite database that:
+- submitting an identical job while one is active returns the same job
+- a queued job can be cancelled before any worker claims it
+- a running job is interrupted by cancel (also via POST /api/jobs/{id}/cancel)
+- /api/jobs/{id}/result answers 202 while running, the result once done
+  and 409 for a cancelled job
+- a job whose worker stopped renewing its lease is re-queued and claimed
+  by another worker
+- shutting a worker down puts its running job back in the queue instead
+  of failing it, and the next worker completes it
+- wait() timing out leaves no per-job event behind
+- POST /api/scenes/{id}/generate holds the request at most
+  JOB_WAIT_SECONDS, then answers 202 with the job to poll
+
+Usage (from backend/):
+    python scripts/check_job_queue.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+STUB_KIND = "check_sleep"
+SLOW_VIDEO_SECONDS = 1.5
+
+
+async def stub_handler(job, params: dict) -> dict:
+    await asyncio.sleep(params.get("seconds", 0))
+    return {"target_id": job.target_id, "slept": params.get("seconds", 0)}
+
+
+async def stub_scene_video(job, params: dict) -> dict:
+    from app.services.job_service import _update_scene
+    await asyncio.sleep(0 if params.get("fast_mode", True) else SLOW_VIDEO_SECONDS)
+    video_url = f"/static/videos/scene_{job.target_id}_check.mp4"
+    await asyncio.to_thread(_update_scene, job.target_id, ai_video_url=video_url)
+    return {"scene_id": job.target_id, "video_url": video_url}
+
+
+async def wait_for_status(queue, job_id: int, status: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.02)
+    return await queue.get(job_id)
+
+
+def main():
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/check_job_queue.db"
+    os.environ["MEDIA_GC_INTERVAL_HOURS"] = "0"
+    logging.disable(logging.WARNING)
+
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+    from app.db import create_db_and_tables, engine
+    from app.main import app
+    from app.services.job_service import JobQueue, job_queue
+    from app.services.seed_service import seed_all
+
+    create_db_and_tables()
+    failed = []
+
+    def check(label, ok):
+        print(f"  {'ok ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failed.append(label)
+
+    def new_queue(**kwargs) -> JobQueue:
+        queue = JobQueue(workers=1, poll_interval=0.05, **kwargs)
+        queue.handler(STUB_KIND)(stub_handler)
+        return queue
+
+    async def queue_checks():
+        print("Queue:")
+        idle = new_queue()
+        first = await idle.enqueue(STUB_KIND, 1, {"seconds": 0})
+        again = await idle.enqueue(STUB_KIND, 1, {"seconds": 0})
+        other = await idle.enqueue(STUB_KIND, 1, {"seconds": 1})
+        check("duplicate enqueue returns the active job", first.id == again.id and other.id != first.id)
+
+        cancelled = await idle.cancel(first.id)
+        check("queued job is cancelled without running",
+              cancelled.status == "cancelled" and cancelled.started_at is None)
+        resubmitted = await idle.enqueue(STUB_KIND, 1, {"seconds": 0})
+        check("cancelled job no longer dedupes new submissions", resubmitted.id != first.id)
+
+        job = await idle.wait(resubmitted.id, timeout=0.1)
+        check("wait() timeout returns the unfinished job", job.status == "queued")
+        check("wait() timeout leaves no event behind", resubmitted.id not in idle._done_events)
+        await idle.cancel(resubmitted.id)
+        await idle.cancel(other.id)
+
+        # Worker A claims a job, then "crashes" (never renews its lease)
+        crashed = new_queue(lease_seconds=1)
+        rescuer = new_queue(lease_seconds=1)
+        job = await crashed.enqueue(STUB_KIND, 2, {"seconds": 0})
+        claimed = await asyncio.to_thread(crashed._claim_next_sync)
+        early = await asyncio.to_thread(rescuer._claim_next_sync)
+        check("live lease is not taken over", claimed.id == job.id and early is None)
+        await asyncio.sleep(1.2)
+        taken = await asyncio.to_thread(rescuer._claim_next_sync)
+        check("expired lease is claimed by another worker",
+              taken is not None and taken.id == job.id and taken.worker_id == rescuer.worker_id
+              and taken.attempts == 2)
+        await rescuer._execute(taken)
+        job = await rescuer.get(job.id)
+        check("rescued job completes", job.status == "succeeded")
+
+        # Shutdown mid-job releases it to the queue
+        stopping = new_queue()
+        await stopping.start()
+        job = await stopping.enqueue(STUB_KIND, 3, {"seconds": 1})
+        running = await wait_for_status(stopping, job.id, "running")
+        await stopping.stop()
+        released = await stopping.get(job.id)
+        check("shutdown releases the running job instead of failing it",
+              running.status == "running" and released.status == "queued"
+              and released.worker_id is None and released.attempts == 0 and released.error is None)
+
+        successor = new_queue()
+        await successor.start()
+        finished = await successor.wait(job.id, timeout=5)
+        await successor.stop()
+        check("next worker completes the released job",
+              finished.status == "succeeded" and finished.worker_id == successor.worker_id
+              and finished.attempts == 1)
+
+    asyncio.run(queue_checks())
+
+    # Through the API, with the app's own queue and workers
+    job_queue.handler(STUB_KIND)(stub_handler)
+    job_queue.handler("scene_video")(stub_scene_video)
+    job_queue.request_wait_seconds = 0.5
+    print("API:")
+    with TestClient(app) as client:
+        response = client.post("/api/jobs/", json={"kind": STUB_KIND, "target_id": 10, "params": {"seconds": 0.5}})
+        job_id = response.json()["id"]
+        duplicate = client.post("/api/jobs/", json={"kind": STUB_KIND, "target_id": 10, "params": {"seconds": 0.5}})
+        check("duplicate POST returns the same job", response.status_code == 202 and duplicate.json()["id"] == job_id)
+        pending = client.get(f"/api/jobs/{job_id}/result")
+        done = client.get(f"/api/jobs/{job_id}/result", params={"wait": 5})
+        check("result is 202 while pending, then the handler's result",
+              pending.status_code == 202 and done.status_code == 200
+              and done.json() == {"target_id": 10, "slept": 0.5})
+
+        job_id = client.post("/api/jobs/", json={"kind": STUB_KIND, "target_id": 11, "params": {"seconds": 30}}).json()["id"]
+        for _ in range(100):
+            if client.get(f"/api/jobs/{job_id}").json()["status"] == "running":
+                break
+            time.sleep(0.02)
+        started = time.perf_counter()
+        client.post(f"/api/jobs/{job_id}/cancel")
+        result = client.get(f"/api/jobs/{job_id}/result", params={"wait": 5})
+        check("running job is interrupted by cancel",
+              result.status_code == 409 and "cancelled" in result.json()["detail"]
+              and time.perf_counter() - started < 5)
+        check("unknown job is 404", client.get("/api/jobs/999999/result").status_code == 404)
+
+        with Session(engine) as session:
+            seed_all(session)
+        started = time.perf_counter()
+        fast = client.post("/api/scenes/1/generate", params={"fast_mode": "true"})
+        check("quick generation returns the updated scene",
+              fast.status_code == 200 and fast.json()["ai_video_url"] == "/static/videos/scene_1_check.mp4")
+        slow = client.post("/api/scenes/2/generate", params={"fast_mode": "false"})
+        held = time.perf_counter() - started
+        check("slow generation answers 202 with the job after JOB_WAIT_SECONDS",
+              slow.status_code == 202 and slow.json()["status"] in ("queued", "running") and held < SLOW_VIDEO_SECONDS)
+        done = client.get(f"/api/jobs/{slow.json()['id']}/result", params={"wait": 5})
+        check("polled job finishes and updates the scene",
+              done.status_code == 200 and client.get("/api/scenes/2").json()["ai_video_url"]
+              == "/static/videos/scene_2_check.mp4")
+
+    if failed:
+        sys.exit(1)
+    print("OK: deduped, cancellable, leased, released on shutdown")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Offline check that Rishi LLM calls reuse pooled connections.
+
+Starts a local mock chat-completions server that counts TCP connections,
+points LLM_API_BASE_URL at it and makes a burst of chat, glossary and
+dilemma calls through the shared client. With keep-alive pooling, the
+number of connections stays at the pool's concurrency, not the call count.
+Repeating the glossary and dilemma calls must then be served from the LLM
+response cache without reaching the server.
+
+Usage (from backend/):
+    python scripts/check_llm_client.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, '.')
+
+CALLS = 30
+
+
+class MockLLMServer:
+    """Minimal HTTP/1.1 keep-alive server speaking the chat-completions format"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1/chat/completions"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = dict(
+                    line.split(": ", 1)
+                    for line in head.decode().split("\r\n")[1:]
+                    if ": " in line
+                )
+                length = int(headers.get("content-length") or headers.get("Content-Length") or 0)
+                payload = json.loads(await reader.readexactly(length))
+                self.requests += 1
+
+                system = payload["messages"][0]["content"]
+                if "JSON array" in system:
+                    content = '[{"term": "Dharma", "definition": "Righteous duty."}]'
+                elif "dilemma" in system:
+                    content = json.dumps({
+                        "question": "Duty or love?",
+                        "option_a": "Duty", "result_a": "Order holds.",
+                        "option_b": "Love", "result_b": "The heart rules."
+                    })
+                else:
+                    content = "Patience, child."
+                body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main():
+    mock = MockLLMServer()
+    url = await mock.start()
+    os.environ["LLM_API_BASE_URL"] = url
+    os.environ["LLM_API_KEY"] = "test-key"
+    os.environ["LLM_MAX_CONNECTIONS"] = "4"
+    os.environ["LLM_HTTP2"] = "off"  # the mock only speaks HTTP/1.1
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/llm_check.db"
+
+    from app.db import create_db_and_tables
+    from app.services import rishi_service
+    from app.services.llm_cache import llm_cache
+
+    create_db_and_tables()
+
+    await rishi_service.start_llm_client()
+    try:
+        calls = []
+        for i in range(CALLS):
+            if i % 3 == 0:
+                calls.append(rishi_service.chat_with_rishi("Who is Rama?", "Ayodhya"))
+            elif i % 3 == 1:
+                calls.append(rishi_service.explain_term_glossary(f"Rama followed his dharma ({i})."))
+            else:
+                calls.append(rishi_service.generate_dharma_dilemma(f"Rama is exiled ({i})."))
+        results = await asyncio.gather(*calls)
+        pooled_requests = mock.requests
+
+        # Same inputs again (modulo whitespace) come from the response cache
+        repeats = []
+        for i in range(CALLS):
+            if i % 3 == 1:
+                repeats.append(rishi_service.explain_term_glossary(f"Rama  followed his dharma ({i}). "))
+            elif i % 3 == 2:
+                repeats.append(rishi_service.generate_dharma_dilemma(f"Rama is exiled ({i})."))
+        cached_results = await asyncio.gather(*repeats)
+    finally:
+        await rishi_service.close_llm_client()
+        await mock.stop()
+
+    print(f"{pooled_requests} requests over {mock.connections} connections")
+    print(f"LLM cache: {llm_cache.stats()}")
+    if pooled_requests != CALLS or not all(results):
+        print("FAILED: not every call reached the mock server")
+        sys.exit(1)
+    if mock.connections > 4:
+        print("FAILED: connections were not reused")
+        sys.exit(1)
+    if mock.requests != pooled_requests or not all(cached_results):
+        print("FAILED: repeated glossary/dilemma calls were not served from cache")
+        sys.exit(1)
+    print("OK: LLM calls reuse pooled connections and cached answers")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""
+Offline check for the orphaned media collector.
+
+Builds a throwaway static/ tree and SQLite database in which scenes, a
+story cover and a finished job reference some of the files (relative,
+absolute and URL-encoded URLs), then verifies that:
+- referenced files are kept, including ones only a job result mentions
+- unreferenced files younger than the minimum age are kept
+- old orphans and stale temp files are collected, young temp files kept
+- curated assets (images/covers) are never touched
+- dry-run moves nothing; quarantine moves files aside and restore() puts
+  them back byte for byte; delete unlinks them
+- restored files are not re-collected straight away, and quarantined
+  files are purged after the retention period
+
+Usage (from backend/):
+    python scripts/check_media_gc.py
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+DAY = 86400
+
+# path below static/ -> (age in seconds, expected outcome)
+FILES = {
+    "audio/scene_1_aaaa1111.mp3": (3 * DAY, "kept"),             # relative URL
+    "videos/scene_1_video_1700000000000.mp4": (3 * DAY, "kept"),  # absolute URL
+    "audio/scene two_bbbb2222.mp3": (3 * DAY, "kept"),           # URL-encoded
+    "images/scenes/scene_2_job.jpg": (3 * DAY, "kept"),          # job result only
+    "images/stories/ramayana.jpg": (3 * DAY, "kept"),            # curated, referenced
+    "audio/scene_1_old00000.mp3": (3 * DAY, "orphan"),
+    "videos/scene_2_video_1600000000000.mp4": (2 * DAY, "orphan"),
+    "images/fast/scene_3_fast.jpg": (5 * DAY, "orphan"),
+    "audio/scene_1_young000.mp3": (3600, "kept"),                # younger than min age
+    "audio/temp/segment_1_0.mp3": (7 * 3600, "stale_temp"),
+    "audio/temp/segment_1_1.mp3": (600, "kept"),
+    "images/covers/unused_cover.jpg": (30 * DAY, "kept"),        # curated, unreferenced
+}
+
+
+def build_tree(static_dir: str) -> dict:
+    contents = {}
+    now = time.time()
+    for path, (age, _) in FILES.items():
+        full = os.path.join(static_dir, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        contents[path] = os.urandom(256) + path.encode()
+        with open(full, "wb") as f:
+            f.write(contents[path])
+        os.utime(full, (now - age, now - age))
+    return contents
+
+
+def build_db() -> None:
+    from sqlmodel import Session
+    from app.db import engine, create_db_and_tables
+    from app.models import Story, Chapter, Scene, GenerationJob
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        story = Story(title="Ramayana", slug="ramayana", cover_image_url="/static/images/stories/ramayana.jpg")
+        session.add(story)
+        session.commit()
+        chapter = Chapter(story_id=story.id, index=1, title="One")
+        session.add(chapter)
+        session.commit()
+        session.add(Scene(
+            chapter_id=chapter.id, index=1, raw_text="Rama walks into the forest.",
+            ai_audio_url="/static/audio/scene_1_aaaa1111.mp3",
+            ai_video_url="http://localhost:8000/static/videos/scene_1_video_1700000000000.mp4?v=2",
+        ))
+        session.add(Scene(
+            chapter_id=chapter.id, index=2, raw_text="Sita waits.",
+            reel_audio_url="/static/audio/scene%20two_bbbb2222.mp3",
+        ))
+        session.add(GenerationJob(
+            kind="scene_video", target_id=2, dedupe_key="scene_video:2:{}", status="succeeded",
+            result_json=json.dumps({"scene_id": 2, "video_url": "/static/images/scenes/scene_2_job.jpg"}),
+        ))
+        session.commit()
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/check_media_gc.db"
+    logging.disable(logging.INFO)
+
+    from sqlmodel import Session
+    from app.db import engine
+    from app.services.media_gc import MediaGC, MODE_DELETE, MODE_DRY_RUN, MODE_QUARANTINE, referenced_paths
+
+    static_dir = os.path.join(workdir, "static")
+    quarantine_dir = os.path.join(workdir, "quarantine")
+    contents = build_tree(static_dir)
+    build_db()
+    failed = []
+
+    def check(label, ok):
+        print(f"  {'ok ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failed.append(label)
+
+    def present():
+        return {path for path in FILES if os.path.exists(os.path.join(static_dir, path))}
+
+    expected = {outcome: {path for path, (_, o) in FILES.items() if o == outcome}
+                for outcome in ("kept", "orphan", "stale_temp")}
+    gc = MediaGC(static_dir=static_dir, quarantine_dir=quarantine_dir, min_age_hours=24, temp_hours=6,
+                 quarantine_days=7, interval_hours=0, mode=MODE_QUARANTINE)
+
+    with Session(engine) as session:
+        referenced = referenced_paths(session)
+        check("relative, absolute, URL-encoded and job result URLs are indexed", {
+            "audio/scene_1_aaaa1111.mp3", "videos/scene_1_video_1700000000000.mp4",
+            "audio/scene two_bbbb2222.mp3", "images/scenes/scene_2_job.jpg",
+        } <= referenced)
+
+        report = gc.collect(session, mode=MODE_DRY_RUN)
+        check("dry-run reports old orphans", {path for path, _ in report.orphans} == expected["orphan"])
+        check("dry-run reports stale temp files", {path for path, _ in report.stale_temp} == expected["stale_temp"])
+        check("dry-run moves nothing", present() == set(FILES) and not os.path.exists(quarantine_dir))
+        check("covers are not even scanned", not any("covers" in path for path, _ in report.orphans))
+
+        report = gc.collect(session)
+        collected = expected["orphan"] | expected["stale_temp"]
+        check("quarantine keeps referenced, young and curated files", present() == expected["kept"])
+        check("quarantine moves orphans and stale temp files aside", all(
+            os.path.exists(os.path.join(quarantine_dir, path)) for path in collected))
+        check("removed bytes are reported", report.removed_bytes == sum(len(contents[path]) for path in collected))
+
+    restored = gc.restore()
+    check("restore() puts every file back unchanged", restored == len(collected) and present() == set(FILES) and all(
+        open(os.path.join(static_dir, path), "rb").read() == contents[path] for path in FILES))
+
+    # Quarantine age counts from the move, so restored files are not re-collected at once
+    with Session(engine) as session:
+        report = gc.collect(session)
+    check("restored files are not collected again straight away",
+          not report.orphans and not report.stale_temp and present() == set(FILES))
+
+    # Quarantined files older than the retention period are purged
+    build_tree(static_dir)
+    with Session(engine) as session:
+        gc.collect(session)
+    check("fresh quarantine survives a purge", gc.purge_quarantine() == 0)
+    old = time.time() - 8 * DAY
+    for dirpath, _, filenames in os.walk(quarantine_dir):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (old, old))
+    check("expired quarantine is purged", gc.purge_quarantine() == len(collected) and gc.restore() == 0)
+
+    # Put the orphans back, then delete them outright
+    build_tree(static_dir)
+    with Session(engine) as session:
+        gc.collect(session, mode=MODE_DELETE)
+    check("delete unlinks orphans and stale temp files without quarantining",
+          present() == expected["kept"] and gc.restore() == 0)
+
+    if failed:
+        sys.exit(1)
+    print("OK: references kept, orphans collected, curated assets untouched, quarantine restorable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Check the /metrics endpoint and measure the metrics middleware overhead.
+
+Seeds a throwaway SQLite database, sends a few requests (a templated route,
+a 404, a login POST) and checks that /metrics reports them by route
+template with per-request query counts, request/response sizes, external
+call latencies and cache hit ratios in valid Prometheus text format. Then
+times a trivial endpoint with and without MetricsMiddleware.
+
+Usage (from backend/):
+    python scripts/check_metrics.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? -?[0-9.e+-]+|\+Inf$')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check /metrics and the middleware overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/check_metrics.db"
+    os.environ["MEDIA_GC_INTERVAL_HOURS"] = "0"
+    logging.disable(logging.INFO)
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+    from app.db import engine
+    from app.main import app
+    from app.metrics import MetricsMiddleware, external_call
+    from app.services.seed_service import seed_all
+
+    failed = []
+
+    def check(label, ok):
+        print(f"  {'ok ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failed.append(label)
+
+    with TestClient(app) as client:
+        with Session(engine) as session:
+            seed_all(session)
+        for story_id in (1, 2, 1):
+            client.get(f"/api/stories/{story_id}")
+        client.get("/api/no-such-route")
+        client.post("/api/users/login", json={"email": "nobody@example.com", "password": "x" * 8})
+
+        async def failing_tts():
+            with external_call("tts"):
+                raise RuntimeError("upstream down")
+        try:
+            asyncio.run(failing_tts())
+        except RuntimeError:
+            pass
+
+        response = client.get("/metrics")
+        text = response.text
+
+    print("/metrics:")
+    check("served as Prometheus text", response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+    samples = [line for line in text.splitlines() if line and not line.startswith("#")]
+    check("every sample line parses", all(SAMPLE.match(line) for line in samples))
+    check("labelled by route template, not raw path",
+          'route="/api/stories/{story_id}"' in text and 'route="/api/stories/1"' not in text)
+    check("requests counted per status",
+          re.search(r'katha_http_requests_total\{method="GET",route="/api/stories/\{story_id\}",status="200"\} 3', text)
+          is not None)
+    check("unknown paths collapse to one label", 'route="unmatched",status="404"' in text)
+    query_count = re.search(
+        r'katha_http_request_db_queries_count\{method="GET",route="/api/stories/\{story_id\}"\} (\d+)', text)
+    query_sum = re.search(
+        r'katha_http_request_db_queries_sum\{method="GET",route="/api/stories/\{story_id\}"\} (\d+)', text)
+    check("per-request query counts recorded", query_count is not None and int(query_count.group(1)) == 3
+          and query_sum is not None and int(query_sum.group(1)) > 0)
+    check("request body sizes recorded", re.search(
+        r'katha_http_request_size_bytes_sum\{method="POST",route="/api/users/login"\} [1-9]', text) is not None)
+    check("response sizes recorded", re.search(
+        r'katha_http_response_size_bytes_sum\{method="GET",route="/api/stories/\{story_id\}"\} [1-9]', text) is not None)
+    check("external call failures recorded",
+          'katha_external_call_duration_seconds_count{service="tts",outcome="error"} 1' in text)
+    check("cache hit ratios exported", 'katha_cache_hit_ratio{cache="story_tree"}' in text)
+    check("histogram buckets end with +Inf", 'le="+Inf"' in text)
+
+    # Overhead on a trivial endpoint
+    def build(instrumented):
+        bench = FastAPI()
+
+        @bench.get("/ping/{item_id}")
+        def ping(item_id: int):
+            return {"ok": item_id}
+        if instrumented:
+            bench.add_middleware(MetricsMiddleware)
+        return TestClient(bench)
+
+    timings = {}
+    for label, instrumented in (("plain", False), ("metrics", True)):
+        with build(instrumented) as client:
+            for _ in range(100):
+                client.get("/ping/1")
+            start = time.perf_counter()
+            for i in range(args.requests):
+                client.get(f"/ping/{i}")
+            timings[label] = (time.perf_counter() - start) / args.requests * 1e6
+    overhead = timings["metrics"] - timings["plain"]
+    print(f"Per request: plain {timings['plain']:.0f} us, with metrics {timings['metrics']:.0f} us "
+          f"(+{overhead:.0f} us; request log line disabled)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
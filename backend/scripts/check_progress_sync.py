@@ -0,0 +1,125 @@
+"""
+Check that POST /api/scenes/sync applies an offline batch in one transaction.
+
+Builds a throwaway in-memory database, completes a few scenes online, then
+syncs a shuffled 50-event batch spread over several days (including repeats,
+already-completed scenes and an unknown scene id) that finishes the story.
+Asserts the batch uses a constant number of queries, commits once, skips
+duplicates, produces the same XP as replaying the events one by one and
+marks the story (and its RAMAYANA_COMPLETE badge) complete.
+
+Usage (from backend/):
+    python scripts/check_progress_sync.py
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.models import User, Story, Chapter, Scene, Badge, UserStoryProgress
+from app.services.gamification_service import (
+    complete_scene, sync_scene_progress, SCENE_XP, RAMAYANA_SLUG, BADGE_RAMAYANA_COMPLETE
+)
+from app.services.seed_service import DEFAULT_BADGES
+
+BATCH = 50
+ONLINE = 3  # scenes completed online before the sync
+SCENES = ONLINE + BATCH - 5  # the batch finishes the story
+
+
+def main():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        for badge in DEFAULT_BADGES:
+            session.add(Badge(**badge))
+        story = Story(title="Check", slug=RAMAYANA_SLUG, total_scenes=SCENES)
+        session.add(story)
+        session.commit()
+        chapter = Chapter(story_id=story.id, index=1, title="One")
+        session.add(chapter)
+        session.commit()
+        scenes = [Scene(chapter_id=chapter.id, index=i, raw_text=f"Scene {i}") for i in range(1, SCENES + 1)]
+        session.add_all(scenes)
+        user = User(name="Offline reader")
+        session.add(user)
+        session.commit()
+        scene_ids = [scene.id for scene in scenes]
+        user_id = user.id
+
+    for scene_id in scene_ids[:ONLINE]:
+        with Session(engine) as session:
+            complete_scene(session, user_id, scene_id)
+
+    # Offline reading over the last three days, delivered out of order
+    start = datetime.utcnow() - timedelta(days=3)
+    fresh = scene_ids[ONLINE:ONLINE + BATCH - 5]
+    events = [(scene_id, start + timedelta(hours=i)) for i, scene_id in enumerate(fresh)]
+    events += [(fresh[0], start), (fresh[1], start)]  # replayed twice
+    events += [(scene_id, start) for scene_id in scene_ids[:ONLINE - 1]]  # already done online
+    events += [(999999, start)]  # deleted scene
+    random.Random(7).shuffle(events)
+
+    statements = []
+    commits = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def on_commit(conn):
+        commits.append(1)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    with Session(engine) as session:
+        result = sync_scene_progress(session, user_id, events)
+    event.remove(engine, "before_cursor_execute", on_execute)
+    event.remove(engine, "commit", on_commit)
+
+    reads = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    print(f"{len(events)} events -> {len(reads)} queries, {len(statements) - len(reads)} writes, "
+          f"{len(commits)} commit")
+    print(f"applied={len(result['applied'])} duplicates={len(result['duplicates'])} "
+          f"unknown={result['unknown_scenes']} streak={result['current_streak_days']}")
+
+    with Session(engine) as session:
+        user = session.get(User, user_id)
+        total_xp = user.total_xp
+        story_progress = session.exec(
+            select(UserStoryProgress).where(UserStoryProgress.user_id == user_id)
+        ).one()
+        print(f"story progress: {story_progress.scenes_completed}/{SCENES} "
+              f"completed={story_progress.completed}")
+
+    expected_xp = SCENE_XP * (ONLINE + len(fresh))
+    ok = (
+        len(commits) == 1
+        and len(reads) <= 6
+        and result["applied"] == fresh
+        and len(result["duplicates"]) == 2 + (ONLINE - 1)
+        and result["unknown_scenes"] == [999999]
+        and total_xp == expected_xp
+        and result["xp_added"] == SCENE_XP * len(fresh)
+        and story_progress.scenes_completed == SCENES
+        and story_progress.completed
+        and BADGE_RAMAYANA_COMPLETE in {badge["code"] for badge in result["new_badges"]}
+    )
+    if not ok:
+        print("FAILED: sync did not apply the batch in one transaction")
+        sys.exit(1)
+    print("OK: one query per lookup, timestamp-ordered replay, story completed and a single commit")
+
+
+if __name__ == "__main__":
+    main()
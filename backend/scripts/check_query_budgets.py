@@ -0,0 +1,144 @@
+"""
+Check per-request SQL query budgets and the slow-query log.
+
+Seeds a throwaway SQLite database, adds extra stories with chapters and a
+user holding many badges, then asserts with app.metrics.assert_query_budget
+that the catalog list (with chapters), a story and the achievements page
+run a fixed number of statements however many rows they return (no N+1).
+Also shows the Server-Timing header and checks that statements slower than
+SLOW_QUERY_MS are logged with their route.
+
+Usage (from backend/):
+    python scripts/check_query_budgets.py [--stories 60] [--badges 40]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, '.')
+
+# Statements per request, including the story cache miss that builds the payload
+BUDGETS = {
+    "list_stories": 2,
+    "get_story": 4,
+    "achievements": 3,
+}
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check per-request SQL query budgets")
+    parser.add_argument("--stories", type=int, default=60, help="Extra stories (3 chapters each) to add")
+    parser.add_argument("--badges", type=int, default=40, help="Badges to award one user")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/check_query_budgets.db"
+    os.environ["MEDIA_GC_INTERVAL_HOURS"] = "0"
+    os.environ["SERVER_TIMING"] = "true"
+    logging.disable(logging.INFO)
+
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+    from app import metrics
+    from app.db import engine
+    from app.main import app
+    from app.metrics import QueryBudgetExceeded, assert_query_budget, response_query_count
+    from app.models import Badge, Chapter, Story, User, UserBadge
+    from app.services.seed_service import seed_all
+    from app.services.story_cache import story_cache
+
+    failed = []
+
+    def check(label, ok):
+        print(f"  {'ok ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failed.append(label)
+
+    def within_budget(response, name):
+        try:
+            assert_query_budget(response, BUDGETS[name])
+            return True
+        except QueryBudgetExceeded as e:
+            print(f"       {e}")
+            return False
+
+    with TestClient(app) as client:
+        with Session(engine) as session:
+            seed_all(session)
+            for i in range(args.stories):
+                story = Story(title=f"Budget story {i}", slug=f"budget-story-{i}", category="budget",
+                              total_chapters=3)
+                session.add(story)
+                session.flush()
+                for index in range(1, 4):
+                    session.add(Chapter(story_id=story.id, index=index, title=f"Chapter {index}"))
+            user = User(name="Budget reader", username="budget-reader")
+            session.add(user)
+            session.flush()
+            for i in range(args.badges):
+                badge = Badge(code=f"budget_{i}", name=f"Budget badge {i}")
+                session.add(badge)
+                session.flush()
+                if i % 2 == 0:
+                    session.add(UserBadge(user_id=user.id, badge_id=badge.id))
+            session.commit()
+            user_id = user.id
+
+        print("Query budgets:")
+        counts = {}
+        for limit in (1, 10, 100):
+            story_cache.invalidate()
+            response = client.get("/api/stories/", params={"limit": limit, "include_chapters": "true"})
+            counts[limit] = response_query_count(response)
+            print(f"       list_stories limit={limit:<3} {len(response.json()):>3} stories, "
+                  f"{counts[limit]} queries; Server-Timing: {response.headers['server-timing']}")
+            check(f"list_stories(limit={limit}, include_chapters) within budget", within_budget(response, "list_stories"))
+        check("list_stories query count does not grow with stories", len(set(counts.values())) == 1)
+
+        story_cache.invalidate()
+        check("get_story within budget", within_budget(client.get("/api/stories/1"), "get_story"))
+        response = client.get("/api/stories/1")
+        check("cached get_story runs no queries", response_query_count(response) == 0)
+
+        response = client.get(f"/api/user/{user_id}/achievements")
+        body = response.json()
+        print(f"       achievements: {len(body['earned_badges'])} earned, {len(body['locked_badges'])} locked, "
+              f"{response_query_count(response)} queries")
+        check("achievements within budget", within_budget(response, "achievements"))
+
+        # Every statement is "slow" with a zero threshold
+        collector = _Collect()
+        metrics.sql_logger.addHandler(collector)
+        metrics.sql_logger.propagate = False
+        threshold = metrics.SLOW_QUERY_MS
+        metrics.SLOW_QUERY_MS = 0
+        try:
+            client.get(f"/api/user/{user_id}/achievements")
+        finally:
+            metrics.SLOW_QUERY_MS = threshold
+            metrics.sql_logger.propagate = True
+            metrics.sql_logger.removeHandler(collector)
+        print("Slow-query log:")
+        for message in collector.messages[:2]:
+            print(f"       {message[:140]}")
+        check("slow statements logged with method and route",
+              bool(collector.messages)
+              and all("GET /api/user/{user_id}/achievements" in message for message in collector.messages))
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Offline check for the streaming Rishi chat endpoint (POST /api/ai/rishi/chat/stream).
+
+Starts a fake streaming LLM that emits chat-completion chunks as server-sent
+events with a delay between tokens, then serves the Rishi router with uvicorn
+and verifies that:
+- the first event arrives after roughly one token delay, not the full answer
+- the deltas reassemble into the complete answer followed by `event: done`
+- disconnecting mid-answer closes the upstream LLM request early
+
+Usage (from backend/):
+    python scripts/check_rishi_stream.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+TOKENS = ["Dharma ", "is ", "the ", "path ", "that ", "holds ", "the ", "world ", "together, ", "child."] * 3
+TOKEN_DELAY = 0.05
+
+
+class FakeStreamingLLM:
+    """Chat-completions server that streams one token per TOKEN_DELAY"""
+
+    def __init__(self):
+        self.sent = []  # tokens written per request
+        self.aborted = 0
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1/chat/completions"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        headers = {
+            key.lower(): value
+            for key, value in (
+                line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if ": " in line
+            )
+        }
+        payload = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+        assert payload.get("stream") is True
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nConnection: close\r\n\r\n")
+        closed = asyncio.ensure_future(reader.read(1))  # b"" once the client hangs up
+        sent = 0
+        try:
+            for token in TOKENS:
+                await asyncio.wait([closed], timeout=TOKEN_DELAY)
+                if closed.done():
+                    self.aborted += 1
+                    break
+                chunk = {"choices": [{"delta": {"content": token}}]}
+                writer.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                await writer.drain()
+                sent += 1
+            else:
+                writer.write(b"data: [DONE]\n\n")
+                await writer.drain()
+        except ConnectionError:
+            self.aborted += 1
+        finally:
+            self.sent.append(sent)
+            closed.cancel()
+            writer.close()
+
+
+async def read_events(url: str, body: dict, stop_after=None):
+    """Return (seconds to first event, [(event, data)]) for one SSE request"""
+    import httpx
+
+    start = time.perf_counter()
+    first = None
+    events = []
+    async with httpx.AsyncClient(timeout=10) as client:
+        async with client.stream("POST", url, json=body) as resp:
+            assert resp.status_code == 200, resp.status_code
+            assert resp.headers["content-type"].startswith("text/event-stream")
+            event = "message"
+            async for line in resp.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    if first is None:
+                        first = time.perf_counter() - start
+                    events.append((event, json.loads(line[5:])))
+                    event = "message"
+                    if stop_after and len(events) >= stop_after:
+                        break
+    return first, events
+
+
+async def main():
+    fake = FakeStreamingLLM()
+    llm_url = await fake.start()
+    os.environ["LLM_API_BASE_URL"] = llm_url
+    os.environ["LLM_API_KEY"] = "test-key"
+    os.environ["LLM_HTTP2"] = "off"
+
+    import uvicorn
+    from fastapi import FastAPI
+    from app.api.routes.ai import rishi
+    from app.services import rishi_service
+
+    app = FastAPI()
+    app.include_router(rishi.router, prefix="/api/ai/rishi")
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/api/ai/rishi/chat/stream"
+    body = {"query": "What is dharma?", "context": "Rama accepts exile."}
+
+    ok = True
+    try:
+        first, events = await read_events(url, body)
+        full_time = TOKEN_DELAY * len(TOKENS)
+        answer = "".join(data["delta"] for event, data in events if event == "message")
+        print(f"First event after {first * 1000:.0f} ms (full answer takes ~{full_time * 1000:.0f} ms)")
+        if first > full_time / 4:
+            print("FAILED: first event was not streamed early")
+            ok = False
+        if answer != "".join(TOKENS) or events[-1][0] != "done":
+            print("FAILED: streamed answer incomplete or missing done event")
+            ok = False
+
+        # Hang up after three tokens; the upstream request must be abandoned
+        await read_events(url, body, stop_after=3)
+        await asyncio.sleep(TOKEN_DELAY * 4)
+        print(f"Upstream tokens sent per request: {fake.sent}")
+        if fake.aborted != 1 or fake.sent[-1] >= len(TOKENS):
+            print("FAILED: upstream stream kept running after client disconnect")
+            ok = False
+    finally:
+        server.should_exit = True
+        await serve
+        await rishi_service.close_llm_client()
+        await fake.stop()
+
+    if not ok:
+        sys.exit(1)
+    print("OK: Rishi chat streams early and cancels upstream on disconnect")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
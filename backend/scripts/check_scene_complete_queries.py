@@ -0,0 +1,97 @@
+"""
+Check that POST /api/scenes/{id}/complete uses a constant number of SQL queries.
+
+Builds a throwaway in-memory database with the seeded badges, then completes
+a scene for users with very different histories (new reader, a few scenes,
+many scenes and badges) and asserts every completion issues the same number
+of queries, writes awards in one statement and commits once.
+
+Usage (from backend/):
+    python scripts/check_scene_complete_queries.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import User, Story, Chapter, Scene, Badge
+from app.services.gamification_service import complete_scene
+from app.services.seed_service import DEFAULT_BADGES
+
+SCENES = 80
+HISTORIES = (0, 4, 70)  # scenes already completed before the measured one
+
+
+def main():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        for badge in DEFAULT_BADGES:
+            session.add(Badge(**badge))
+        for code in ("story_explorer", "devoted_reader", "cultural_scholar", "master_storyteller"):
+            session.add(Badge(code=code, name=code.replace("_", " ").title()))
+        story = Story(title="Check", slug="check")
+        session.add(story)
+        session.commit()
+        chapter = Chapter(story_id=story.id, index=1, title="One")
+        session.add(chapter)
+        session.commit()
+        scenes = [Scene(chapter_id=chapter.id, index=i, raw_text=f"Scene {i}") for i in range(1, SCENES + 1)]
+        session.add_all(scenes)
+        users = [User(name=f"Reader {n}") for n in HISTORIES]
+        session.add_all(users)
+        session.commit()
+        scene_ids = [scene.id for scene in scenes]
+        user_ids = [user.id for user in users]
+
+    for user_id, history in zip(user_ids, HISTORIES):
+        for scene_id in scene_ids[:history]:
+            with Session(engine) as session:
+                complete_scene(session, user_id, scene_id)
+
+    statements = []
+    commits = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def on_commit(conn):
+        commits.append(1)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    counts = {}
+    for user_id, history in zip(user_ids, HISTORIES):
+        statements.clear()
+        commits.clear()
+        with Session(engine) as session:
+            result = complete_scene(session, user_id, scene_ids[history])
+        reads = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        counts[history] = (len(reads), len(statements) - len(reads), len(commits), len(result["new_badges"]))
+    event.remove(engine, "before_cursor_execute", on_execute)
+    event.remove(engine, "commit", on_commit)
+
+    for history, (reads, writes, commit_count, badges) in counts.items():
+        print(f"{history:>3} prior scenes -> {reads} queries, {writes} writes, "
+              f"{commit_count} commit, {badges} new badges")
+
+    read_counts = {reads for reads, _, _, _ in counts.values()}
+    # progress + story progress + user, plus one batched insert when badges are awarded
+    write_ok = all(writes == 3 + (1 if badges else 0) for _, writes, _, badges in counts.values())
+    if len(read_counts) != 1 or not write_ok or any(c != 1 for _, _, c, _ in counts.values()):
+        print("FAILED: scene completion cost depends on user history")
+        sys.exit(1)
+    print("OK: constant query count, batched awards and a single commit")
+
+
+if __name__ == "__main__":
+    main()
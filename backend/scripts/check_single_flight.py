@@ -0,0 +1,201 @@
+"""
+Offline check for single-flight coalescing of scene narration.
+
+Replaces the enhanced audio service with a stub that sleeps instead of
+running Edge TTS and records every synthesis, then verifies that:
+- concurrent narrate_scene() calls in one process share one synthesis
+- concurrent calls from several worker processes on the same database
+  also share one synthesis (via the FlightLease table), and every caller
+  gets the same audio URL
+- regenerate=True never joins a plain narration flight, and after another
+  process's regeneration it accepts only a URL different from the one it
+  was asked to replace
+
+Usage (from backend/):
+    python scripts/check_single_flight.py
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.insert(0, '.')
+
+CALLERS_PER_PROCESS = 10
+PROCESSES = 3
+SYNTH_DELAY = 0.5
+
+
+class StubAudioService:
+    """Stands in for EnhancedAudioService; logs each synthesis to a file"""
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+
+    async def generate_audio_for_scene(self, scene_text, scene_id, scene_emotion=None):
+        await asyncio.sleep(SYNTH_DELAY)
+        url = f"/static/audio/scene_{scene_id}_{uuid.uuid4().hex[:8]}.mp3"
+        with open(self.log_path, "a") as f:
+            f.write(url + "\n")
+        return url
+
+
+def setup_app(db_path: str, log_path: str):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    from app.services import enhanced_audio_service
+    enhanced_audio_service._enhanced_audio_service = StubAudioService(log_path)
+
+
+def run_callers(db_path: str, log_path: str, scene_id: int, results) -> None:
+    setup_app(db_path, log_path)
+    from app.services.job_service import narrate_scene
+
+    async def main():
+        return await asyncio.gather(*(narrate_scene(scene_id) for _ in range(CALLERS_PER_PROCESS)))
+
+    results.extend(asyncio.run(main()))
+
+
+def create_scenes(db_path: str, log_path: str) -> list:
+    setup_app(db_path, log_path)
+    from sqlmodel import Session
+    from app.db import engine, create_db_and_tables
+    from app.models import Story, Chapter, Scene
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        story = Story(title="Check", slug=f"check-{uuid.uuid4().hex[:6]}")
+        session.add(story)
+        session.commit()
+        chapter = Chapter(story_id=story.id, index=1, title="One")
+        session.add(chapter)
+        session.commit()
+        scene_ids = []
+        for index in (1, 2, 3):
+            scene = Scene(chapter_id=chapter.id, index=index, raw_text="Rama walks into the forest.")
+            session.add(scene)
+            session.commit()
+            scene_ids.append(scene.id)
+        return scene_ids
+
+
+def synth_count(log_path: str) -> int:
+    if not os.path.exists(log_path):
+        return 0
+    with open(log_path) as f:
+        return len(f.read().split())
+
+
+def check_regenerate(log_path: str, scene_id: int) -> bool:
+    """Run in the main process, after run_callers() set the app up"""
+    from datetime import datetime, timedelta
+    from sqlmodel import Session
+    from app.db import engine
+    from app.models import FlightLease
+    from app.services.job_service import _load_scene, _update_scene, narrate_scene
+
+    ok = True
+    lease_key = f"scene_audio:{(scene_id, True)}"
+
+    async def plain_then_regenerate():
+        plain = asyncio.create_task(narrate_scene(scene_id))
+        await asyncio.sleep(SYNTH_DELAY / 5)
+        regenerated = asyncio.create_task(narrate_scene(scene_id, regenerate=True))
+        return await plain, await regenerated
+
+    plain_url, regenerated_url = asyncio.run(plain_then_regenerate())
+    print(f"Regenerate during a plain flight: {plain_url} -> {regenerated_url}")
+    if regenerated_url == plain_url:
+        print("FAILED: regenerate joined the plain narration flight")
+        ok = False
+
+    def other_process_lease(seconds: float) -> None:
+        with Session(engine) as session:
+            session.merge(FlightLease(key=lease_key, owner="other-process",
+                                      expires_at=datetime.utcnow() + timedelta(seconds=seconds)))
+            session.commit()
+
+    # Another process holds the regeneration lease and dies without saving
+    current = _load_scene(scene_id).ai_audio_url
+    other_process_lease(SYNTH_DELAY)
+    url = asyncio.run(narrate_scene(scene_id, regenerate=True))
+    print(f"Regenerate after a crashed regeneration: {current} -> {url}")
+    if url == current:
+        print("FAILED: regenerate accepted the URL it was asked to replace")
+        ok = False
+
+    # Another process regenerates, saves a new URL and releases: reuse it
+    other_url = "/static/audio/from_other_process.mp3"
+    other_process_lease(60)
+
+    async def other_process_finishes():
+        await asyncio.sleep(SYNTH_DELAY)
+        _update_scene(scene_id, ai_audio_url=other_url)
+        with Session(engine) as session:
+            session.delete(session.get(FlightLease, lease_key))
+            session.commit()
+
+    async def regenerate_while_other_runs():
+        other = asyncio.create_task(other_process_finishes())
+        url = await narrate_scene(scene_id, regenerate=True)
+        await other
+        return url
+
+    before = synth_count(log_path)
+    url = asyncio.run(regenerate_while_other_runs())
+    print(f"Regenerate after another process's regeneration: {url}")
+    if url != other_url or synth_count(log_path) != before:
+        print("FAILED: regenerate did not reuse the other process's new URL")
+        ok = False
+    return ok
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "single_flight.db")
+    log_path = os.path.join(workdir, "synth.log")
+    in_process_scene, cross_process_scene, regenerate_scene = create_scenes(db_path, log_path)
+    ok = True
+
+    # In one process
+    results = []
+    run_callers(db_path, log_path, in_process_scene, results)
+    count = synth_count(log_path)
+    print(f"In-process: {len(results)} callers, {count} synthesis, {len(set(results))} distinct URL")
+    if count != 1 or len(set(results)) != 1:
+        print("FAILED: concurrent calls in one process were not coalesced")
+        ok = False
+
+    # Across processes
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager:
+        shared = manager.list()
+        procs = [
+            ctx.Process(target=run_callers, args=(db_path, log_path, cross_process_scene, shared))
+            for _ in range(PROCESSES)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        results = list(shared)
+
+    count = synth_count(log_path) - 1
+    print(f"Cross-process: {len(results)} callers in {PROCESSES} processes, {count} synthesis, "
+          f"{len(set(results))} distinct URL")
+    if count != 1 or len(set(results)) != 1 or len(results) != PROCESSES * CALLERS_PER_PROCESS:
+        print("FAILED: concurrent calls across processes were not coalesced")
+        ok = False
+
+    ok = check_regenerate(log_path, regenerate_scene) and ok
+
+    if not ok:
+        sys.exit(1)
+    print("OK: one synthesis per scene, shared by every caller; regenerations replace the URL")
+
+
+if __name__ == "__main__":
+    main()
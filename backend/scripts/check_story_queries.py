@@ -0,0 +1,75 @@
+"""
+Check that GET /api/stories/{story_id} uses a constant number of SQL queries.
+
+Builds throwaway in-memory databases with stories of different chapter counts
+and asserts that loading the full story tree issues the same number of queries.
+
+Usage (from backend/):
+    python scripts/check_story_queries.py
+"""
+
+import sys
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import Story, Chapter, Scene
+from app.api.routes.stories import _build_story_out
+
+SCENES_PER_CHAPTER = 5
+
+
+def count_queries(chapter_count: int) -> int:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        story = Story(title="Check", slug="check", total_chapters=chapter_count)
+        session.add(story)
+        session.commit()
+        session.refresh(story)
+        for c in range(1, chapter_count + 1):
+            chapter = Chapter(story_id=story.id, index=c, title=f"Chapter {c}")
+            session.add(chapter)
+            session.commit()
+            session.refresh(chapter)
+            for s in range(1, SCENES_PER_CHAPTER + 1):
+                session.add(Scene(chapter_id=chapter.id, index=s, raw_text=f"Scene {c}.{s}"))
+        session.commit()
+        story_id = story.id
+
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    with Session(engine) as session:
+        story_out = _build_story_out(session, story_id, include_scenes=True)
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+    assert len(story_out.chapters) == chapter_count
+    assert all(len(c.scenes) == SCENES_PER_CHAPTER for c in story_out.chapters)
+    return len(statements)
+
+
+def main():
+    counts = {n: count_queries(n) for n in (1, 7, 18)}
+    for chapters, queries in counts.items():
+        print(f"{chapters:>3} chapters -> {queries} queries")
+
+    if len(set(counts.values())) != 1:
+        print("FAILED: query count grows with chapter count")
+        sys.exit(1)
+    print("OK: query count is constant")
+
+
+if __name__ == "__main__":
+    main()
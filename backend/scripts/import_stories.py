@@ -0,0 +1,39 @@
+"""
+Import a large story corpus
+
+Streams stories from a JSON array file (same shape as app/data/stories.json)
+or a JSON Lines file (one story per line) and synchronizes them in batches,
+committing each batch. Memory stays flat whatever the corpus size, and an
+interrupted import resumes after the last committed batch. Safe to re-run:
+unchanged stories are left alone.
+
+Usage (from backend/):
+    python scripts/import_stories.py path/to/corpus.jsonl [--batch-size 50] [--restart]
+"""
+
+import argparse
+import logging
+import sys
+sys.path.insert(0, '.')
+
+from sqlmodel import Session
+from app.db import engine, create_db_and_tables
+from app.services.seed_service import SEED_BATCH_SIZE, import_stories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="JSON array or JSON Lines story file")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE, help="Stories per transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the top")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    create_db_and_tables()
+    with Session(engine) as session:
+        results = import_stories(session, args.path, batch_size=args.batch_size, resume=not args.restart)
+    print(", ".join(f"{name}={count}" for name, count in results.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Collect orphaned generated media
+
+Indexes every /static URL the database references and reports (default),
+quarantines or deletes generated audio/video/images nothing points at,
+plus stale files in static/audio/temp. Quarantined files keep their
+relative path under MEDIA_GC_QUARANTINE_DIR and can be put back with
+--restore.
+
+Usage (from backend/):
+    python scripts/media_gc.py                       # dry-run report
+    python scripts/media_gc.py --mode quarantine     # move orphans aside
+    python scripts/media_gc.py --mode delete --min-age-hours 48
+    python scripts/media_gc.py --restore             # undo quarantine
+"""
+
+import argparse
+import json
+import sys
+sys.path.insert(0, '.')
+
+from sqlmodel import Session
+from app.db import engine, create_db_and_tables
+from app.services.media_gc import MediaGC, MODES, MODE_DRY_RUN
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=MODES, default=MODE_DRY_RUN)
+    parser.add_argument("--static-dir", default="static")
+    parser.add_argument("--min-age-hours", type=float, default=None, help="Keep unreferenced files younger than this")
+    parser.add_argument("--temp-hours", type=float, default=None, help="Remove temp files older than this")
+    parser.add_argument("--restore", action="store_true", help="Move every quarantined file back")
+    parser.add_argument("--list", type=int, default=50, help="Paths to list in the report")
+    args = parser.parse_args()
+
+    gc = MediaGC(static_dir=args.static_dir, min_age_hours=args.min_age_hours, temp_hours=args.temp_hours,
+                 mode=args.mode)
+    if args.restore:
+        print(f"Restored {gc.restore()} files from {gc.quarantine_dir}")
+        return
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        report = gc.collect(session)
+    print(json.dumps(report.as_dict(list_limit=args.list), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Precompress text assets under static/
+
+Writes a .gz (and, if the optional `brotli` package is installed, a .br)
+next to every JSON/text asset served from /static, so MediaFiles can send
+the compressed bytes straight from disk to clients that accept them.
+Already-compressed media (MP3/MP4/JPG/PNG) is skipped. Only files whose
+variant is missing or older than the source are rewritten; safe to re-run.
+
+Usage (from backend/):
+    python scripts/precompress_static.py [--static-dir static]
+"""
+
+import argparse
+import gzip
+import importlib.util
+import os
+import sys
+sys.path.insert(0, '.')
+
+from app.media import COMPRESSIBLE_SUFFIXES
+
+# Smaller than this, compression saves less than the headers it adds
+MIN_SIZE = 256
+
+
+def _write_if_stale(source: str, target: str, compress) -> bool:
+    if os.path.exists(target) and os.stat(target).st_mtime >= os.stat(source).st_mtime:
+        return False
+    with open(source, "rb") as f:
+        data = compress(f.read())
+    tmp = target + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--static-dir", default="static")
+    args = parser.parse_args()
+
+    encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if importlib.util.find_spec("brotli") is not None:
+        import brotli
+        encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+    else:
+        print("brotli not installed, writing .gz only")
+
+    written = skipped = 0
+    for root, _, files in os.walk(args.static_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_SUFFIXES or os.path.getsize(path) < MIN_SIZE:
+                continue
+            for extension, compress in encoders:
+                if _write_if_stale(path, path + extension, compress):
+                    written += 1
+                else:
+                    skipped += 1
+    print(f"Wrote {written} compressed variants, {skipped} already current")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Pre-warm the Rishi LLM Response Cache
+
+Runs the glossary and dharma-dilemma generators over every scene's raw text
+so readers get cached answers from the first visit. Scenes already cached
+under the current prompt versions are skipped by the cache itself, so the
+script is cheap to re-run after adding content or bumping a prompt version.
+
+Usage (from backend/, with LLM_API_KEY and LLM_API_BASE_URL set):
+    python scripts/prewarm_rishi_cache.py [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+sys.path.insert(0, '.')
+
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from sqlmodel import Session, select
+from app.db import engine
+from app.models import Scene
+from app.services import rishi_service
+from app.services.llm_cache import llm_cache
+
+
+async def prewarm(concurrency: int):
+    if not (rishi_service.LLM_API_KEY and rishi_service.LLM_API_BASE_URL):
+        print("LLM not configured (LLM_API_KEY / LLM_API_BASE_URL); nothing to pre-warm.")
+        return
+
+    with Session(engine) as session:
+        texts = session.exec(select(Scene.raw_text).where(Scene.raw_text != "")).all()
+    texts = list(dict.fromkeys(texts))
+    print(f"Pre-warming glossary + dilemma for {len(texts)} scenes...")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    start = time.perf_counter()
+
+    async def warm(text: str):
+        nonlocal done
+        async with semaphore:
+            await asyncio.gather(
+                rishi_service.explain_term_glossary(text),
+                rishi_service.generate_dharma_dilemma(text)
+            )
+        done += 1
+        if done % 25 == 0 or done == len(texts):
+            print(f"  {done}/{len(texts)} scenes ({time.perf_counter() - start:.1f}s)")
+
+    await rishi_service.start_llm_client()
+    try:
+        await asyncio.gather(*(warm(text) for text in texts))
+    finally:
+        await rishi_service.close_llm_client()
+
+    print(f"Done. Cache: {llm_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(prewarm(args.concurrency))
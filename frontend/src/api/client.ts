@@ -177,6 +177,15 @@ export interface Story {
     chapters?: Chapter[]
 }
 
+export interface Job {
+    id: number
+    kind: string
+    target_id: number
+    status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+    result?: Record<string, any> | null
+    error?: string | null
+}
+
 export interface SceneCompleteResponse {
     xp_earned: number
     total_xp: number
@@ -271,8 +280,40 @@ export const getScene = async (sceneId: number): Promise<Scene> => {
     }
 }
 
+// ==================== JOBS API ====================
+
+const JOB_POLL_INTERVAL_MS = 2000
+const FINAL_JOB_STATUSES = ['succeeded', 'failed', 'cancelled']
+
+export const getJob = async (jobId: number): Promise<Job> => {
+    const res = await api.get(`/jobs/${jobId}`)
+    return res.data
+}
+
+/**
+ * Poll a background job until it succeeds (resolves with the job)
+ * or fails / is cancelled (rejects with the job's error)
+ */
+export const waitForJob = async (jobId: number, intervalMs: number = JOB_POLL_INTERVAL_MS): Promise<Job> => {
+    let job = await getJob(jobId)
+    while (!FINAL_JOB_STATUSES.includes(job.status)) {
+        await new Promise(resolve => setTimeout(resolve, intervalMs))
+        job = await getJob(jobId)
+    }
+    if (job.status !== 'succeeded') {
+        throw new Error(job.error || `Job ${job.status}`)
+    }
+    return job
+}
+
 export const generateSceneContent = async (sceneId: number): Promise<Scene> => {
-    const response = await api.post(`/scenes/${sceneId}/generate`)
+    // Queued as a background job (202); poll it instead of holding the request open
+    const response = await api.post(`/scenes/${sceneId}/generate`, null, { params: { background: true } })
+    if (response.status === 202) {
+        await waitForJob(response.data.id)
+        const scene = await getScene(sceneId)
+        return { ...scene, is_completed: false }
+    }
     const data = response.data
     return {
         ...data,